@@ -0,0 +1,1189 @@
+"""
+Benchmark Aplikasi Booking Meeting Room
+Penulis: kunz
+Deskripsi:
+Mengukur hot path aplikasi (main_v4) secara offline dengan data booking
+sintetis, tanpa koneksi Supabase.
+
+Jalankan:
+    python benchmark.py                      # semua benchmark
+    python benchmark.py events --sizes 1000 10000 100000
+    python benchmark.py startup
+    python benchmark.py pages --save hasil.json
+    python benchmark.py --baseline hasil.json  # gagal bila ada regresi
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import re
+from bisect import bisect_left, bisect_right, insort
+from concurrent.futures import ThreadPoolExecutor
+import sys
+import tracemalloc
+import tempfile
+from datetime import date, datetime, time, timedelta, timezone
+from pathlib import Path
+from time import perf_counter, process_time, sleep
+from typing import Callable
+from unittest.mock import patch
+
+import pandas as pd
+import supabase
+from streamlit.testing.v1 import AppTest
+
+# Streamlit bare mode mencatat warning di setiap pemanggilan st.*
+logging.disable(logging.WARNING)
+
+import booking_data as data
+import main_v4 as app
+
+ROOMS = [room.nama for room in app.DEFAULT_ROOMS]
+SUBDIRS = ["Keuangan", "Operasional", "Teknologi", "SDM", "Hukum"]
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 1. DATA SINTETIS & UTILITAS
+# ──────────────────────────────────────────────────────────────────────────────
+def synthetic_bookings(n: int, seed: int = 42, start: date | None = None) -> list[dict]:
+    """Buat n baris booking mirip result.data, tersebar di jam kerja 08–18."""
+    rng = random.Random(seed)
+    start = start or date.today() - timedelta(days=365)
+    rows = []
+    for i in range(1, n + 1):
+        begin = rng.randrange(8 * 4, 17 * 4)  # slot 15 menit
+        length = rng.randint(2, 8)
+        end = min(begin + length, 18 * 4)
+        rows.append(
+            {
+                "id": i,
+                "nama": f"Pemesan {i}",
+                "subdir": rng.choice(SUBDIRS),
+                "floor": "19",
+                "ruang_meeting": rng.choice(ROOMS),
+                "tanggal_booking": str(start + timedelta(days=rng.randrange(730))),
+                "waktu_mulai": f"{begin // 4:02d}:{begin % 4 * 15:02d}:00",
+                "waktu_selesai": f"{end // 4:02d}:{end % 4 * 15:02d}:00",
+                "keterangan": "Rapat koordinasi mingguan",
+            }
+        )
+    return rows
+
+def best_of(fn: Callable[[], object], repeat: int = 3) -> float:
+    """Waktu tercepat (detik) dari beberapa kali pemanggilan fn."""
+    timings = []
+    for _ in range(repeat):
+        t0 = perf_counter()
+        fn()
+        timings.append(perf_counter() - t0)
+    return min(timings)
+
+# Waktu utama tiap benchmark {benchmark: {kasus: ms}} untuk --save / --baseline
+RESULTS: dict[str, dict[str, float]] = {}
+
+def record(bench: str, case: str, ms: float) -> None:
+    RESULTS.setdefault(bench, {})[case] = round(ms, 3)
+
+def print_table(title: str, header: list[str], rows: list[list[object]]) -> None:
+    print(f"\n## {title}")
+    widths = [max(len(str(c)) for c in col) for col in zip(header, *rows)]
+    for line in [header, *rows]:
+        print("  ".join(str(c).rjust(w) for c, w in zip(line, widths)))
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 2. SUPABASE LOKAL (PENGGANTI CLIENT)
+# ──────────────────────────────────────────────────────────────────────────────
+class FakeResult:
+    def __init__(self, data, count: int | None = None) -> None:
+        self.data = data
+        self.count = count
+
+def _coerce(sample, value):
+    """Samakan tipe nilai filter (string dari URL PostgREST) dengan kolom baris."""
+    if isinstance(sample, bool) or sample is None or isinstance(value, type(sample)):
+        return value
+    return type(sample)(value)
+
+COMPARE: dict[str, Callable[[object, object], bool]] = {
+    "eq": lambda a, b: str(a) == str(b),
+    "neq": lambda a, b: str(a) != str(b),
+    "gt": lambda a, b: a > b,
+    "gte": lambda a, b: a >= b,
+    "lt": lambda a, b: a < b,
+    "lte": lambda a, b: a <= b,
+}
+
+def _split_top(expr: str) -> list[str]:
+    """Pisah "a,b,and(c,d)" di koma tingkat atas (di luar kurung & kutip)."""
+    parts, buf, depth, quoted, escaped = [], [], 0, False, False
+    for ch in expr:
+        if escaped:
+            escaped = False
+        elif ch == "\\" and quoted:
+            escaped = True
+        elif ch == '"':
+            quoted = not quoted
+        elif not quoted and ch in "()":
+            depth += 1 if ch == "(" else -1
+        elif not quoted and depth == 0 and ch == ",":
+            parts.append("".join(buf))
+            buf = []
+            continue
+        buf.append(ch)
+    parts.append("".join(buf))
+    return parts
+
+def parse_logic(term: str) -> Callable[[dict], bool]:
+    """Subset sintaks or=(...) PostgREST: col.op.nilai, and(...), or(...)."""
+    for logic, combine in (("and(", all), ("or(", any)):
+        if term.startswith(logic):
+            subs = [parse_logic(t) for t in _split_top(term[len(logic):-1])]
+            return lambda r: combine(f(r) for f in subs)
+    column, op, value = term.split(".", 2)
+    if value.startswith('"'):
+        value = value[1:-1].replace('\\"', '"').replace("\\\\", "\\")
+    compare = COMPARE[op]
+    return lambda r: compare(r[column], _coerce(r[column], value))
+
+class FakeTable:
+    """Baris satu tabel + index per tanggal_booking (pengganti index di Postgres)."""
+
+    def __init__(self, rows: list[dict]) -> None:
+        self.rows: list[dict] = []
+        self.by_day: dict[str, list[dict]] = {}
+        self.days: list[str] = []
+        for row in rows:
+            self.add(row)
+
+    def add(self, row: dict) -> None:
+        self.rows.append(row)
+        day = row.get("tanggal_booking")
+        if day is not None:
+            if day not in self.by_day:
+                self.by_day[day] = []
+                insort(self.days, day)
+            self.by_day[day].append(row)
+
+    def remove(self, doomed: list[dict]) -> None:
+        ids = {id(r) for r in doomed}
+        self.rows = [r for r in self.rows if id(r) not in ids]
+        for row in doomed:
+            day_rows = self.by_day.get(row.get("tanggal_booking"))
+            if day_rows is not None:
+                day_rows[:] = [r for r in day_rows if id(r) not in ids]
+
+    def candidates(self, filters: list[tuple[str, str, object]]) -> list[dict]:
+        """Baris kandidat lewat index tanggal bila ada filter tanggal_booking."""
+        lo, hi = None, None
+        for column, op, value in filters:
+            if column != "tanggal_booking":
+                continue
+            if op == "eq":
+                return self.by_day.get(str(value), [])
+            if op in ("gt", "gte"):
+                lo = (bisect_left if op == "gte" else bisect_right)(self.days, str(value))
+            elif op in ("lt", "lte"):
+                hi = (bisect_left if op == "lt" else bisect_right)(self.days, str(value))
+        if lo is None and hi is None:
+            return self.rows
+        return [r for day in self.days[lo:hi] for r in self.by_day[day]]
+
+class FakeQuery:
+    """Subset query builder postgrest yang dipakai aplikasi, atas tabel in-memory."""
+
+    def __init__(self, client: "FakeSupabase", name: str) -> None:
+        self._client = client
+        self._name = name
+        self._table = client.tables.setdefault(name, FakeTable([]))
+        self._filters: list[tuple[str, str, object]] = []
+        self._predicates: list[Callable[[dict], bool]] = []
+        self._order: list[tuple[str, bool]] = []
+        self._offset = 0
+        self._limit: int | None = None
+        self._count = False
+        self._action = "select"
+        self._payload: list[dict] = []
+
+    def select(self, *_columns: str, count: str | None = None) -> "FakeQuery":
+        self._count = count is not None
+        return self
+
+    def insert(self, rows: dict | list[dict]) -> "FakeQuery":
+        self._action = "insert"
+        self._payload = rows if isinstance(rows, list) else [rows]
+        return self
+
+    def delete(self) -> "FakeQuery":
+        self._action = "delete"
+        return self
+
+    def _filter(self, column: str, op: str, value) -> "FakeQuery":
+        compare = COMPARE[op]
+        self._filters.append((column, op, value))
+        self._predicates.append(lambda r: compare(r[column], _coerce(r[column], value)))
+        return self
+
+    def eq(self, column: str, value) -> "FakeQuery":
+        return self._filter(column, "eq", value)
+
+    def neq(self, column: str, value) -> "FakeQuery":
+        return self._filter(column, "neq", value)
+
+    def gt(self, column: str, value) -> "FakeQuery":
+        return self._filter(column, "gt", value)
+
+    def gte(self, column: str, value) -> "FakeQuery":
+        return self._filter(column, "gte", value)
+
+    def lt(self, column: str, value) -> "FakeQuery":
+        return self._filter(column, "lt", value)
+
+    def lte(self, column: str, value) -> "FakeQuery":
+        return self._filter(column, "lte", value)
+
+    def in_(self, column: str, values: list) -> "FakeQuery":
+        wanted = {str(v) for v in values}
+        self._predicates.append(lambda r: str(r[column]) in wanted)
+        return self
+
+    def ilike(self, column: str, pattern: str) -> "FakeQuery":
+        regex = re.compile(
+            "".join(".*" if ch == "%" else "." if ch == "_" else re.escape(ch) for ch in pattern),
+            re.IGNORECASE | re.DOTALL,
+        )
+        self._predicates.append(lambda r: regex.fullmatch(str(r[column] or "")) is not None)
+        return self
+
+    def or_(self, filters: str) -> "FakeQuery":
+        self._predicates.append(parse_logic(f"or({filters})"))
+        return self
+
+    def order(self, column: str, desc: bool = False) -> "FakeQuery":
+        self._order.append((column, desc))
+        return self
+
+    def limit(self, count: int) -> "FakeQuery":
+        self._limit = count
+        return self
+
+    def range(self, start: int, end: int) -> "FakeQuery":
+        self._offset, self._limit = start, end - start + 1
+        return self
+
+    def execute(self) -> FakeResult:
+        self._client.round_trip()
+        if self._action == "insert":
+            return FakeResult([self._client.insert_row(self._name, row) for row in self._payload])
+        rows = [
+            r for r in self._table.candidates(self._filters)
+            if all(f(r) for f in self._predicates)
+        ]
+        if self._action == "delete":
+            self._client.delete_rows(self._name, rows)
+            return FakeResult(rows)
+        for column, desc in reversed(self._order):
+            rows.sort(key=lambda r: r[column], reverse=desc)
+        count = len(rows) if self._count else None
+        # Seperti max-rows PostgREST: baris di luar batas dibuang tanpa error
+        limit = self._client.max_rows if self._limit is None else min(self._limit, self._client.max_rows)
+        return FakeResult(rows[self._offset:self._offset + limit], count)
+
+class FakeRpc:
+    def __init__(self, client: "FakeSupabase", fn: str, params: dict) -> None:
+        self._client = client
+        self._fn = fn
+        self._params = params
+
+    def execute(self) -> FakeResult:
+        self._client.round_trip()
+        return FakeResult(getattr(self._client, f"rpc_{self._fn}")(**self._params))
+
+# db-max-rows bawaan Supabase
+FAKE_MAX_ROWS = 1000
+
+# updated_at baris awal: jauh sebelum cursor overlap replika
+SEED_UPDATED_AT = "2020-01-01T00:00:00.000000+00:00"
+
+class FakeSupabase:
+    """
+    Pengganti Client Supabase: tabel in-memory + latensi jaringan tiruan.
+    RPC di sql/*.sql ditiru dengan semantik yang sama (cek bentrok per ruang
+    & tanggal lalu insert), dan booking_daily_rollup dipelihara seperti
+    trigger-nya.
+    """
+
+    def __init__(self, rows: list[dict] | None = None, latency: float = 0.0) -> None:
+        self.latency = latency
+        self.queries = 0
+        self.max_rows = FAKE_MAX_ROWS
+        self.tables: dict[str, FakeTable] = {
+            "rooms": FakeTable([]),
+            "booking_daily_rollup": FakeTable([]),
+            "booking_deletions": FakeTable([]),
+        }
+        self.tables["bookings"] = FakeTable([])
+        self._next_id = 1
+        self.idempotency: dict[str, dict] = {}
+        for row in rows or []:
+            self.insert_row("bookings", {"updated_at": SEED_UPDATED_AT, **row})
+
+    @property
+    def rows(self) -> list[dict]:
+        return self.tables["bookings"].rows
+
+    def round_trip(self) -> None:
+        self.queries += 1
+        if self.latency:
+            sleep(self.latency)
+
+    def table(self, name: str) -> FakeQuery:
+        return FakeQuery(self, name)
+
+    def rpc(self, fn: str, params: dict | None = None) -> FakeRpc:
+        return FakeRpc(self, fn, params or {})
+
+    # ── Tulis + pemeliharaan rollup & sql/010 ──────────────────────────────
+    @staticmethod
+    def _now() -> str:
+        return datetime.now(timezone.utc).isoformat(timespec="microseconds")
+
+    def insert_row(self, name: str, row: dict) -> dict:
+        row = dict(row)
+        if name == "bookings":
+            row.setdefault("id", self._next_id)
+            row.setdefault("updated_at", self._now())
+            self._next_id = max(self._next_id, row["id"]) + 1
+        self.tables[name].add(row)
+        if name == "bookings":
+            self._refresh_rollup(row["ruang_meeting"], row["tanggal_booking"])
+        return row
+
+    def delete_rows(self, name: str, rows: list[dict], tombstone: bool = True) -> None:
+        self.tables[name].remove(rows)
+        if name == "bookings":
+            for key in {(r["ruang_meeting"], r["tanggal_booking"]) for r in rows}:
+                self._refresh_rollup(*key)
+            if tombstone:
+                for row in rows:
+                    self.tables["booking_deletions"].add(
+                        {
+                            "id": row["id"],
+                            "ruang_meeting": row["ruang_meeting"],
+                            "tanggal_booking": row["tanggal_booking"],
+                            "deleted_at": self._now(),
+                        }
+                    )
+
+    def _refresh_rollup(self, room: str, day: str) -> None:
+        rollups = self.tables["booking_daily_rollup"]
+        rollups.remove([r for r in rollups.by_day.get(day, []) if r["ruang_meeting"] == room])
+        same = self._room_day(room, day)
+        if same:
+            rollups.add(
+                {
+                    "tanggal_booking": day,
+                    "ruang_meeting": room,
+                    "booking_count": len(same),
+                    "booked_minutes": sum(_minutes(r["waktu_selesai"]) - _minutes(r["waktu_mulai"]) for r in same),
+                    "first_start": min(r["waktu_mulai"] for r in same),
+                    "last_end": max(r["waktu_selesai"] for r in same),
+                }
+            )
+
+    def _room_day(self, room: str, day: str) -> list[dict]:
+        return [r for r in self.tables["bookings"].by_day.get(day, []) if r["ruang_meeting"] == room]
+
+    def _conflict(self, booking: dict, exclude_id: int | None = None) -> dict | None:
+        for row in self._room_day(booking["ruang_meeting"], booking["tanggal_booking"]):
+            if (
+                row["id"] != exclude_id
+                and row["waktu_mulai"] < booking["waktu_selesai"]
+                and row["waktu_selesai"] > booking["waktu_mulai"]
+            ):
+                return {k: row[k] for k in ("id", "nama", "waktu_mulai", "waktu_selesai")}
+        return None
+
+    # ── RPC (lihat sql/002–004) ─────────────────────────────────────────────
+    def rpc_book_if_free(self, **params) -> dict:
+        booking = {k.removeprefix("p_"): v for k, v in params.items()}
+        if booking["waktu_mulai"] >= booking["waktu_selesai"]:
+            return {"status": "invalid", "message": "Waktu selesai harus lebih besar dari waktu mulai"}
+        key = booking.get("idempotency_key")
+        if key in self.idempotency:
+            return {"status": "booked", "booking": self.idempotency[key], "replayed": True}
+        conflict = self._conflict(booking)
+        if conflict:
+            return {"status": "conflict", "conflict": conflict}
+        row = self.insert_row("bookings", booking)
+        if key:
+            self.idempotency[key] = row
+        return {"status": "booked", "booking": row}
+
+    def rpc_book_many_if_free(self, p_bookings: list[dict]) -> dict:
+        booked, conflicts, invalid = [], [], []
+        for booking in p_bookings:
+            if booking["waktu_mulai"] >= booking["waktu_selesai"]:
+                invalid.append({"booking": booking, "message": "Waktu selesai harus lebih besar dari waktu mulai"})
+                continue
+            conflict = self._conflict(booking)
+            if conflict:
+                conflicts.append({"booking": booking, "conflict": conflict})
+            else:
+                booked.append(self.insert_row("bookings", booking))
+        return {"booked": booked, "conflicts": conflicts, "invalid": invalid}
+
+    def rpc_move_bookings(self, p_ids: list[int], p_room: str | None = None, p_shift_days: int = 0) -> dict:
+        wanted = set(p_ids)
+        rows = sorted(
+            (r for r in self.rows if r["id"] in wanted),
+            key=lambda r: (r["tanggal_booking"], r["waktu_mulai"]),
+            reverse=p_shift_days > 0,
+        )
+        moved, conflicts = [], []
+        for row in rows:
+            target = {
+                **row,
+                "ruang_meeting": p_room or row["ruang_meeting"],
+                "tanggal_booking": str(date.fromisoformat(row["tanggal_booking"]) + timedelta(days=p_shift_days)),
+                "updated_at": self._now(),
+            }
+            conflict = self._conflict(target, exclude_id=row["id"])
+            if conflict:
+                conflicts.append({"booking": row, "conflict": conflict})
+                continue
+            # UPDATE di Postgres: tanpa tombstone, updated_at baru
+            self.delete_rows("bookings", [row], tombstone=False)
+            moved.append({"from": row, "to": self.insert_row("bookings", target)})
+        return {"moved": moved, "conflicts": conflicts}
+
+class FakeAsyncBuilder:
+    """Builder query async di atas builder FakeSupabase; execute() di thread pool."""
+
+    def __init__(self, builder) -> None:
+        self._builder = builder
+
+    def __getattr__(self, name: str):
+        method = getattr(self._builder, name)
+        return lambda *args, **kwargs: FakeAsyncBuilder(method(*args, **kwargs))
+
+    async def execute(self) -> FakeResult:
+        return await asyncio.to_thread(self._builder.execute)
+
+class FakeAsyncSupabase:
+    """Pengganti AsyncClient (hasil acreate_client) yang membaca FakeSupabase yang sama."""
+
+    def __init__(self, fake: FakeSupabase) -> None:
+        self._fake = fake
+
+    def table(self, name: str) -> FakeAsyncBuilder:
+        return FakeAsyncBuilder(self._fake.table(name))
+
+    def rpc(self, fn: str, params: dict | None = None) -> FakeAsyncBuilder:
+        return FakeAsyncBuilder(self._fake.rpc(fn, params))
+
+def fake_acreate_client(fake: FakeSupabase):
+    async def acreate_client(_url: str, _key: str) -> FakeAsyncSupabase:
+        return FakeAsyncSupabase(fake)
+    return acreate_client
+
+class FlakyRpc(FakeRpc):
+    """RPC yang gagal selama gangguan; lost_response: dijalankan di server tapi respons hilang."""
+
+    def execute(self) -> FakeResult:
+        client = self._client
+        down = perf_counter() < client.down_until
+        if down and not client.lost_response:
+            client.round_trip()
+            raise ConnectionError("upstream tidak terjangkau")
+        result = super().execute()
+        if down:
+            raise TimeoutError("respons hilang setelah commit")
+        return result
+
+class FlakySupabase(FakeSupabase):
+    """FakeSupabase dengan jendela gangguan (perf_counter() < down_until)."""
+
+    def __init__(self, rows: list[dict] | None = None, latency: float = 0.0, lost_response: bool = False) -> None:
+        super().__init__(rows, latency)
+        self.down_until = 0.0
+        self.lost_response = lost_response
+
+    def rpc(self, fn: str, params: dict | None = None) -> FakeRpc:
+        return FlakyRpc(self, fn, params or {})
+
+def _minutes(hms: str) -> int:
+    return int(hms[:2]) * 60 + int(hms[3:5])
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 3. STARTUP CLIENT
+# ──────────────────────────────────────────────────────────────────────────────
+FAKE_SECRETS = {"supabase": {"url": "https://lokal.supabase.co", "key": "k" * 120}}
+
+def bench_startup(_sizes: list[int]) -> None:
+    """Waktu sampai init_supabase() kembali vs sampai health check selesai."""
+    table = []
+    for latency in (0.05, 0.2, 1.0):
+        app._create_supabase.clear()
+        app.get_supabase_health.clear()
+        fake = FakeSupabase(latency=latency)
+        with patch.object(app.st, "secrets", FAKE_SECRETS), patch.object(
+            app, "create_client", lambda _url, _key: fake
+        ):
+            t0 = perf_counter()
+            app.init_supabase()
+            ready = perf_counter() - t0
+            app.get_supabase_health().wait()
+            healthy = perf_counter() - t0
+        record("startup", f"init_supabase@{latency * 1e3:.0f}ms", ready * 1e3)
+        table.append([f"{latency * 1e3:.0f}", f"{ready * 1e3:.2f}", f"{healthy * 1e3:.1f}"])
+    print_table(
+        "Startup client Supabase (ms)",
+        ["latensi", "init_supabase (render)", "health check selesai"],
+        table,
+    )
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 4. KONVERSI EVENT KALENDER
+# ──────────────────────────────────────────────────────────────────────────────
+def _events_iterrows(rows: list[dict]) -> list[dict]:
+    """Implementasi lama (DataFrame + iterrows) sebagai pembanding."""
+    df = pd.DataFrame(rows)
+    events = []
+    for _, row in df.iterrows():
+        color = "#FF6B6B" if row["ruang_meeting"] == "Breakout Traction" else "#4ECDC4"
+        events.append(
+            {
+                "id": row["id"],
+                "title": f"{row['nama']} - {row['ruang_meeting']}",
+                "start": f"{row['tanggal_booking']}T{row['waktu_mulai']}",
+                "end": f"{row['tanggal_booking']}T{row['waktu_selesai']}",
+                "color": color,
+                "extendedProps": {
+                    "nama": row["nama"],
+                    "subdir": row["subdir"],
+                    "floor": row["floor"],
+                    "ruang_meeting": row["ruang_meeting"],
+                    "keterangan": row["keterangan"],
+                },
+            }
+        )
+    return events
+
+def traced_mb(build: Callable[[], object]) -> tuple[object, float]:
+    """(hasil build, MB yang masih dialokasikan hasil itu)."""
+    tracemalloc.start()
+    result = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size / 2**20
+
+def bench_events(sizes: list[int]) -> None:
+    """
+    Konversi ke event (iterrows lama vs build_calendar_events dari
+    BookingRecord) dan memori cache: dict result.data vs BookingRecord.
+    """
+    catalog = app.RoomCatalog(app.DEFAULT_ROOMS)
+    table = []
+    for n in sizes:
+        rows = synthetic_bookings(n)
+        payload = json.dumps(rows)
+        # Dict baru hasil decode JSON, seperti result.data dari jaringan
+        decoded, dict_mb = traced_mb(lambda: json.loads(payload))
+        records, record_mb = traced_mb(lambda: [data.BookingRecord.from_row(row) for row in json.loads(payload)])
+        legacy = best_of(lambda: _events_iterrows(rows), repeat=1 if n >= 100_000 else 3)
+        batched = best_of(lambda: app.build_calendar_events(records, catalog.colors, catalog.css_classes))
+        record("events", f"build_calendar_events@{n}", batched * 1e3)
+        record("events", f"record_mb@{n}", record_mb)
+        table.append(
+            [
+                f"{n:,}",
+                f"{legacy * 1e3:.1f}",
+                f"{batched * 1e3:.1f}",
+                f"{legacy / batched:.0f}x",
+                f"{dict_mb:.1f}",
+                f"{record_mb:.1f}",
+            ]
+        )
+        del decoded
+    print_table(
+        "Konversi booking → event kalender (ms) & memori cache (MB)",
+        ["booking", "iterrows", "build_calendar_events", "speedup", "dict", "BookingRecord"],
+        table,
+    )
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 5. REALTIME (CHANGE FEED LOKAL)
+# ──────────────────────────────────────────────────────────────────────────────
+def bench_realtime(sizes: list[int]) -> None:
+    """Waktu listener menerapkan n event INSERT + n DELETE ke cache bersama."""
+    table = []
+    for n in sizes:
+        rows = synthetic_bookings(n, start=date(2030, 1, 1))
+        cache = data.BookingCache(ttl=3600, max_partitions=n + 1000)
+        cache.put_days(date(2030, 1, 1), date(2032, 1, 1), [])
+        hub = data.BookingChangeHub(cache)
+        feed = data.LocalChangeFeed()
+        listener = data.RealtimeListener(hub, feed).start()
+
+        t0 = perf_counter()
+        for row in rows:
+            feed.publish({"type": "INSERT", "record": row})
+        feed.join()
+        inserted = perf_counter() - t0
+        visible = len(cache.get_window(date(2030, 1, 1), date(2032, 1, 1)))
+
+        t0 = perf_counter()
+        for row in rows:
+            feed.publish({"type": "DELETE", "old_record": row})
+        feed.join()
+        deleted = perf_counter() - t0
+        listener.stop()
+
+        assert visible == n and hub.version == 2 * n
+        record("realtime", f"insert@{n}", inserted * 1e3)
+        record("realtime", f"delete@{n}", deleted * 1e3)
+        table.append(
+            [f"{n:,}", f"{inserted * 1e3:.1f}", f"{deleted * 1e3:.1f}", f"{n / inserted:,.0f}"]
+        )
+    print_table(
+        "Change feed → cache bersama (ms)",
+        ["event", "INSERT", "DELETE", "event/detik"],
+        table,
+    )
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 6. GRID KETERSEDIAAN RUANG
+# ──────────────────────────────────────────────────────────────────────────────
+GRID_ROOMS = 200
+
+def bench_grid(sizes: list[int]) -> None:
+    """Satu hari, GRID_ROOMS ruang: bitmap okupansi + render HTML grid."""
+    day = date(2030, 1, 1)
+    rooms = [app.Room(f"Ruang {i:03d}", str(10 + i // 20)) for i in range(GRID_ROOMS)]
+    catalog = app.RoomCatalog(rooms)
+    table = []
+    for n in sizes:
+        rows = synthetic_bookings(n, start=day)
+        for i, row in enumerate(rows):
+            row["tanggal_booking"] = str(day)
+            row["ruang_meeting"] = rooms[i % GRID_ROOMS].nama
+        fake = FakeSupabase(rows)
+
+        def build() -> str:
+            repo = data.BookingRepository(data.SupabaseBackend(fake))
+            occupancy = app.room_occupancy(repo, catalog, day)
+            return app.render_availability_grid(
+                catalog.rooms, occupancy, catalog.day_start, catalog.day_end
+            )
+
+        fake.queries = 0
+        elapsed = best_of(build)
+        html_kb = len(build()) / 1024
+        record("grid", f"render@{n}", elapsed * 1e3)
+        table.append(
+            [f"{n:,}", f"{elapsed * 1e3:.1f}", str(fake.queries // 4), f"{html_kb:.0f}"]
+        )
+    print_table(
+        f"Grid ketersediaan {GRID_ROOMS} ruang × slot {app.GRID_SLOT_MINUTES} menit (ms)",
+        ["booking/hari", "bitmap + render", "query/render", "HTML (KB)"],
+        table,
+    )
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 7. CEK BENTROK
+# ──────────────────────────────────────────────────────────────────────────────
+CONFLICT_CHECKS = 500
+
+def sqlite_backend(rows: list[dict], path: str) -> "data.SqliteBackend":
+    """SqliteBackend di file sementara berisi rows."""
+    backend = data.SqliteBackend(path)
+    with backend._transaction() as conn:
+        conn.executemany(
+            f"insert into bookings (id, {', '.join(data.BOOKING_FIELDS)}) "
+            f"values (?, {', '.join('?' * len(data.BOOKING_FIELDS))})",
+            [[row["id"], *(row.get(col) for col in data.BOOKING_FIELDS)] for row in rows],
+        )
+    return backend
+
+def bench_conflict(sizes: list[int]) -> None:
+    """
+    validate_booking_conflict lewat BookingRepository: cache kosong
+    (1 query/cek) vs cache hangat, untuk backend Supabase (palsu) dan SQLite.
+    """
+    table = []
+    for n in sizes:
+        rows = synthetic_bookings(n)
+        fake = FakeSupabase(rows)
+        rng = random.Random(n)
+        probes = []
+        for _ in range(CONFLICT_CHECKS):
+            row = rng.choice(rows)
+            begin = rng.randrange(8 * 4, 17 * 4)
+            probes.append(
+                (
+                    date.fromisoformat(row["tanggal_booking"]),
+                    time(begin // 4, begin % 4 * 15),
+                    time(begin // 4 + 1, begin % 4 * 15),
+                    row["ruang_meeting"],
+                )
+            )
+        with tempfile.TemporaryDirectory() as tmp:
+            backends = [
+                ("supabase", data.SupabaseBackend(fake)),
+                ("sqlite", sqlite_backend(rows, str(Path(tmp) / "bookings.db"))),
+            ]
+            for name, backend in backends:
+                cache = data.BookingCache(ttl=3600)
+                repo = data.BookingRepository(backend, cache)
+
+                def cold() -> None:
+                    for probe in probes:
+                        cache.clear()
+                        app.validate_booking_conflict(repo, *probe)
+
+                def warm() -> None:
+                    for probe in probes:
+                        app.validate_booking_conflict(repo, *probe)
+
+                cold_s = best_of(cold)
+                warm()  # isi cache untuk semua (ruang, tanggal) yang dicek
+                fake.queries = 0
+                warm_s = best_of(warm)
+                per_cold, per_warm = cold_s / CONFLICT_CHECKS * 1e6, warm_s / CONFLICT_CHECKS * 1e6
+                suffix = "" if name == "supabase" else f"-{name}"
+                record("conflict", f"cold{suffix}@{n}", cold_s / CONFLICT_CHECKS * 1e3)
+                record("conflict", f"warm{suffix}@{n}", warm_s / CONFLICT_CHECKS * 1e3)
+                table.append([f"{n:,}", name, f"{per_cold:.1f}", f"{per_warm:.1f}", str(fake.queries)])
+    print_table(
+        f"validate_booking_conflict, {CONFLICT_CHECKS} cek (µs/cek)",
+        ["booking", "backend", "cache kosong", "cache hangat", "query (hangat)"],
+        table,
+    )
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 8. BACA PARALEL (PREFETCH ASYNC)
+# ──────────────────────────────────────────────────────────────────────────────
+def bench_prefetch(sizes: list[int]) -> None:
+    """
+    Tiga baca independen satu rerun (katalog ruang, booking seminggu, rollup
+    sebulan): berurutan vs BookingRepository.prefetch, per latensi jaringan.
+    """
+    table = []
+    for n in sizes:
+        rows = synthetic_bookings(n, start=date.today() - timedelta(days=30))
+        for latency in (0.05, 0.2):
+            fake = FakeSupabase(rows, latency=latency)
+            today = date.today()
+            week = (today - timedelta(days=today.weekday()), today + timedelta(days=7 - today.weekday()))
+            month = (today.replace(day=1), today.replace(day=1) + timedelta(days=42))
+
+            def rerun(concurrent: bool) -> None:
+                backend = data.SupabaseBackend(fake, FAKE_SECRETS["supabase"]["url"], FAKE_SECRETS["supabase"]["key"])
+                repo = data.BookingRepository(backend, data.BookingCache(ttl=3600))
+                with data.track_rerun("bench", data.MetricsStore()):
+                    if concurrent:
+                        repo.prefetch(
+                            repo.plan_rooms(),
+                            repo.plan_bookings_window(*week),
+                            repo.plan_rollups_window(*month),
+                        )
+                    repo.rooms()
+                    repo.bookings_window(*week)
+                    repo.rollups_window(*month)
+
+            with patch.object(data, "acreate_client", fake_acreate_client(fake)):
+                serial_s = best_of(lambda: rerun(False))
+                concurrent_s = best_of(lambda: rerun(True))
+            record("prefetch", f"serial@{n}/{latency * 1e3:.0f}ms", serial_s * 1e3)
+            record("prefetch", f"concurrent@{n}/{latency * 1e3:.0f}ms", concurrent_s * 1e3)
+            table.append(
+                [f"{n:,}", f"{latency * 1e3:.0f}", f"{serial_s * 1e3:.0f}", f"{concurrent_s * 1e3:.0f}"]
+            )
+    print_table(
+        "Rerun dengan 3 baca independen (ms)",
+        ["booking", "latensi", "berurutan", "prefetch async"],
+        table,
+    )
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 9. ANTREAN TULIS (UPSTREAM GANGGUAN)
+# ──────────────────────────────────────────────────────────────────────────────
+QUEUE_WRITES = 50
+QUEUE_OUTAGE_SECONDS = 1.0
+QUEUE_RETRY_SECONDS = 0.05   # jeda submit ulang pengguna / base backoff antrean
+
+def _queue_bookings() -> list[dict]:
+    today = date.today()
+    return [
+        {
+            "nama": f"Pemesan {i}",
+            "subdir": SUBDIRS[i % len(SUBDIRS)],
+            "floor": "1",
+            "ruang_meeting": ROOMS[i % len(ROOMS)],
+            "tanggal_booking": str(today + timedelta(days=i // len(ROOMS))),
+            "waktu_mulai": "09:00:00",
+            "waktu_selesai": "10:00:00",
+            "keterangan": "Rapat antrean benchmark",
+        }
+        for i in range(QUEUE_WRITES)
+    ]
+
+def _resubmit(repo: "data.BookingRepository", bookings: list[dict]) -> list[str]:
+    """Perilaku lama: gagal → pengguna submit ulang tanpa key sampai ada jawaban."""
+    statuses = [None] * len(bookings)
+    while None in statuses:
+        for i, booking in enumerate(bookings):
+            if statuses[i] is None:
+                try:
+                    statuses[i] = repo.book_if_free(booking)["status"]
+                except Exception:
+                    pass
+        sleep(QUEUE_RETRY_SECONDS)
+    return statuses
+
+def _queued(repo: "data.BookingRepository", bookings: list[dict], path: str) -> list[str]:
+    write_queue = data.WriteQueue(repo, path).start()
+    nonce = str(app.uuid.uuid4())
+    keys = [data.WriteQueue.key_for(nonce, booking) for booking in bookings]
+    for key, booking in zip(keys, bookings):
+        write_queue.enqueue(key, booking)
+    try:
+        return [write_queue.wait(key, 600)["status"] for key in keys]
+    finally:
+        write_queue.stop()
+
+def bench_writequeue(_sizes: list[int]) -> None:
+    """
+    QUEUE_WRITES booking saat Supabase terganggu QUEUE_OUTAGE_SECONDS:
+    submit ulang manual vs WriteQueue (idempotency key + backoff). Dihitung
+    panggilan ke upstream, booking tersimpan, dan jawaban "bentrok" palsu
+    (booking yang sebenarnya sudah tersimpan oleh percobaan sebelumnya).
+    """
+    table = []
+    bookings = _queue_bookings()
+    for lost_response in (False, True):
+        for name in ("submit ulang", "antrean"):
+            fake = FlakySupabase(lost_response=lost_response)
+            repo = data.BookingRepository(data.SupabaseBackend(fake), data.BookingCache(ttl=3600))
+            fake.down_until = perf_counter() + QUEUE_OUTAGE_SECONDS
+            t0 = perf_counter()
+            with tempfile.TemporaryDirectory() as tmp, patch.object(
+                data, "WRITE_QUEUE_RETRY_BASE_SECONDS", QUEUE_RETRY_SECONDS
+            ):
+                if name == "antrean":
+                    statuses = _queued(repo, bookings, str(Path(tmp) / "queue.db"))
+                else:
+                    statuses = _resubmit(repo, bookings)
+            elapsed = perf_counter() - t0
+            mode = "respons hilang" if lost_response else "tak terjangkau"
+            record("writequeue", f"{name}/{mode}", elapsed * 1e3)
+            table.append(
+                [
+                    mode,
+                    name,
+                    fake.queries,
+                    len(fake.rows),
+                    statuses.count("conflict"),
+                    f"{elapsed:.2f}",
+                ]
+            )
+    print_table(
+        f"{QUEUE_WRITES} booking, gangguan {QUEUE_OUTAGE_SECONDS:.0f} s",
+        ["gangguan", "cara", "panggilan upstream", "tersimpan", "bentrok palsu", "selesai (s)"],
+        table,
+    )
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 10. REPLIKA BACA SQLITE
+# ──────────────────────────────────────────────────────────────────────────────
+REPLICA_LATENCY = 0.02
+REPLICA_PROBES = 50
+REPLICA_CHANGES = 20
+
+def bench_replica(sizes: list[int]) -> None:
+    """
+    Mode replika: sinkron penuh awal, tarikan inkremental setelah
+    REPLICA_CHANGES perubahan, lalu cek bentrok & baca seminggu dengan cache
+    kosong (latensi jaringan REPLICA_LATENCY) — Supabase langsung vs replika.
+    """
+    table = []
+    for n in sizes:
+        rows = synthetic_bookings(n)
+        fake = FakeSupabase(rows, latency=REPLICA_LATENCY)
+        rng = random.Random(n)
+        probes = [
+            (
+                date.fromisoformat(row["tanggal_booking"]),
+                time(10, 0),
+                time(11, 0),
+                row["ruang_meeting"],
+            )
+            for row in rng.sample(rows, REPLICA_PROBES)
+        ]
+        week_start = date.fromisoformat(rows[len(rows) // 2]["tanggal_booking"])
+
+        with tempfile.TemporaryDirectory() as tmp:
+            upstream = data.SupabaseBackend(fake)
+            local = data.SqliteReplica(str(Path(tmp) / "replica.db"))
+            hub = data.BookingChangeHub(data.BookingCache(ttl=3600))
+            feed = data.ReplicaSyncFeed(upstream, local)
+
+            t0 = perf_counter()
+            feed.pull(hub)
+            full_s = perf_counter() - t0
+
+            for row in rng.sample(fake.rows, REPLICA_CHANGES // 2):
+                fake.delete_rows("bookings", [row])
+            for i in range(REPLICA_CHANGES // 2):
+                fake.insert_row("bookings", {**rows[i], "id": fake._next_id, "tanggal_booking": "2099-01-01"})
+            version = hub.version
+            t0 = perf_counter()
+            feed.pull(hub)
+            incremental_s = perf_counter() - t0
+            assert local._rows("select count(*) as n from bookings")[0]["n"] == len(fake.rows), "replika tidak sinkron"
+            assert hub.version - version == REPLICA_CHANGES, "event hub tidak sesuai perubahan"
+
+            timings = {}
+            for name, backend in (("supabase", upstream), ("replika", data.ReplicaBackend(upstream, local))):
+                cache = data.BookingCache(ttl=3600)
+                repo = data.BookingRepository(backend, cache)
+
+                def checks() -> None:
+                    for probe in probes:
+                        cache.clear()
+                        app.validate_booking_conflict(repo, *probe)
+
+                def week() -> None:
+                    cache.clear()
+                    repo.bookings_window(week_start, week_start + timedelta(days=7))
+
+                timings[name] = (best_of(checks) / REPLICA_PROBES, best_of(week))
+
+        record("replica", f"sync-full@{n}", full_s * 1e3)
+        record("replica", f"sync-incremental@{n}", incremental_s * 1e3)
+        for name, (check_s, week_s) in timings.items():
+            record("replica", f"check-{name}@{n}", check_s * 1e3)
+            record("replica", f"week-{name}@{n}", week_s * 1e3)
+        table.append(
+            [
+                f"{n:,}",
+                f"{full_s * 1e3:.0f}",
+                f"{incremental_s * 1e3:.0f}",
+                f"{timings['supabase'][0] * 1e6:,.0f}",
+                f"{timings['replika'][0] * 1e6:,.0f}",
+                f"{timings['supabase'][1] * 1e3:.1f}",
+                f"{timings['replika'][1] * 1e3:.1f}",
+            ]
+        )
+    print_table(
+        f"Replika baca, latensi {REPLICA_LATENCY * 1e3:.0f} ms, cache kosong",
+        [
+            "booking",
+            "sinkron awal (ms)",
+            f"inkremental {REPLICA_CHANGES} (ms)",
+            "cek bentrok supabase (µs)",
+            "cek bentrok replika (µs)",
+            "minggu supabase (ms)",
+            "minggu replika (ms)",
+        ],
+        table,
+    )
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 11. LOGIN ADMIN (BURST)
+# ──────────────────────────────────────────────────────────────────────────────
+LOGIN_BURST = 40
+LOGIN_BCRYPT_ROUNDS = 10
+TOKEN_CHECKS = 10_000
+
+LOGIN_THREADS = 8
+
+def _cpu_per_attempt(attempts: list[Callable[[], object]], threads: int = 1) -> tuple[float, float]:
+    """(ms CPU proses per percobaan, ms wall total); threads > 1 = percobaan bersamaan."""
+    cpu0, wall0 = process_time(), perf_counter()
+    if threads == 1:
+        for attempt in attempts:
+            attempt()
+    else:
+        with ThreadPoolExecutor(threads) as pool:
+            list(pool.map(lambda attempt: attempt(), attempts))
+    return (process_time() - cpu0) / len(attempts) * 1e3, (perf_counter() - wall0) * 1e3
+
+def bench_login(_sizes: list[int]) -> None:
+    """
+    LOGIN_BURST percobaan login dengan password salah (bcrypt cost
+    LOGIN_BCRYPT_ROUNDS): bcrypt setiap percobaan (lama) vs LoginThrottle,
+    dari satu klien dan dari klien berbeda; plus cek token sesi per rerun.
+    """
+    config = {
+        "username": "admin",
+        "password_hash": app.bcrypt.hashpw(b"rahasia", app.bcrypt.gensalt(LOGIN_BCRYPT_ROUNDS)).decode(),
+        "session_secret": "rahasia-sesi-benchmark",
+    }
+
+    def legacy() -> bool:
+        return app.bcrypt.checkpw(b"salah", config["password_hash"].encode())
+
+    def throttled(client: str) -> Callable[[], object]:
+        return lambda: app.check_admin_login(throttle, config, client, "admin", "salah")
+
+    cases = {}
+    cases["bcrypt tiap percobaan"] = _cpu_per_attempt([legacy] * LOGIN_BURST)
+    throttle = app.LoginThrottle()
+    cases["throttle, 1 klien"] = _cpu_per_attempt([throttled("10.0.0.1")] * LOGIN_BURST)
+    throttle = app.LoginThrottle()
+    cases[f"throttle, {LOGIN_BURST} klien"] = _cpu_per_attempt(
+        [throttled(f"10.0.1.{i}") for i in range(LOGIN_BURST)]
+    )
+    cases[f"bcrypt tiap percobaan, {LOGIN_THREADS} thread"] = _cpu_per_attempt([legacy] * LOGIN_BURST, LOGIN_THREADS)
+    throttle = app.LoginThrottle()
+    cases[f"throttle, {LOGIN_BURST} klien, {LOGIN_THREADS} thread"] = _cpu_per_attempt(
+        [throttled(f"10.0.2.{i}") for i in range(LOGIN_BURST)], LOGIN_THREADS
+    )
+    token = app.sign_admin_token(config, "admin")
+    assert app.verify_admin_token(config, token) == "admin", "token tidak terverifikasi"
+    cases["token sesi (rerun/tab baru)"] = _cpu_per_attempt(
+        [lambda: app.verify_admin_token(config, token)] * TOKEN_CHECKS
+    )
+
+    table = []
+    for name, (cpu_ms, wall_ms) in cases.items():
+        attempts = TOKEN_CHECKS if name.startswith("token") else LOGIN_BURST
+        record("login", name, cpu_ms)
+        table.append([name, f"{cpu_ms:.3f}", f"{wall_ms:.0f}", f"{cpu_ms * attempts / wall_ms:.1f}"])
+    print_table(
+        f"{LOGIN_BURST} login gagal, bcrypt cost {LOGIN_BCRYPT_ROUNDS}",
+        ["cara", "CPU/percobaan (ms)", "total wall (ms)", "core terpakai"],
+        table,
+    )
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 12. HALAMAN END-TO-END (AppTest)
+# ──────────────────────────────────────────────────────────────────────────────
+APP_PATH = str(Path(__file__).with_name("main_v4.py"))
+PAGE_RUNS = 3
+
+def _timed_run(at: AppTest, fake: FakeSupabase, action: Callable[[], AppTest] | None = None) -> tuple[float, int]:
+    """(ms, query) untuk satu rerun skrip; gagal keras bila halaman menampilkan error."""
+    queries = fake.queries
+    t0 = perf_counter()
+    (action or at.run)()
+    elapsed = (perf_counter() - t0) * 1e3
+    if at.exception or at.error:
+        raise RuntimeError(f"halaman {at.session_state['page']} error: {at.exception or at.error}")
+    return elapsed, fake.queries - queries
+
+def bench_pages(sizes: list[int]) -> None:
+    """
+    main_v4.py dijalankan lewat streamlit AppTest dengan client dari
+    init_supabase diganti FakeSupabase: render penuh tiap halaman, termasuk
+    serialisasi ke frontend. "pertama" = cache kosong, "ulang" = rerun
+    berikutnya (terbaik dari PAGE_RUNS).
+    """
+    table = []
+    for n in sizes:
+        fake = FakeSupabase(synthetic_bookings(n, start=date.today() - timedelta(days=365)))
+        app.st.cache_resource.clear()
+        app.st.cache_data.clear()
+        with patch.object(supabase, "create_client", lambda _url, _key: fake), patch.object(
+            data, "acreate_client", fake_acreate_client(fake)
+        ), tempfile.TemporaryDirectory() as queue_dir:
+            at = AppTest.from_file(APP_PATH, default_timeout=300)
+            at.secrets["supabase"] = FAKE_SECRETS["supabase"]
+            at.secrets["write_queue"] = {"path": str(Path(queue_dir) / "queue.db")}
+
+            def page(name: str, **state) -> tuple[float, float, int]:
+                at.session_state["page"] = name
+                for key, value in state.items():
+                    at.session_state[key] = value
+                first, queries = _timed_run(at, fake)
+                again = min(_timed_run(at, fake)[0] for _ in range(PAGE_RUNS))
+                return first, again, queries
+
+            cases = {
+                "form": page("form"),
+                "kalender minggu": page("list", calendar_view="timeGridWeek", calendar_anchor=date.today()),
+                "kalender bulan": page("list", calendar_view="dayGridMonth", calendar_anchor=date.today()),
+                "admin": page("admin", admin_authenticated=True),
+            }
+
+            # Submit form sampai halaman kalender selesai dirender
+            submits = []
+            for i in range(PAGE_RUNS):
+                at.session_state["page"] = "form"
+                at.run()
+                at.text_input[0].input("Pemesan Benchmark")
+                at.text_input[1].input("Teknologi")
+                at.text_area[0].input("Rapat koordinasi benchmark")
+                at.date_input[1].set_value(date.today() + timedelta(days=800 + i))
+                submit = next(b for b in at.button if b.label == "💾 Simpan Booking")
+                submits.append(_timed_run(at, fake, submit.click().run))
+                assert at.session_state["page"] == "list", "submit tidak berhasil"
+            cases["submit form"] = (submits[0][0], min(ms for ms, _ in submits), submits[0][1])
+
+        for case, (first, again, queries) in cases.items():
+            record("pages", f"{case}@{n}", again)
+            table.append([f"{n:,}", case, f"{first:.0f}", f"{again:.0f}", str(queries)])
+    print_table(
+        "Halaman end-to-end via AppTest (ms)",
+        ["booking", "halaman", "pertama", "ulang", "query (pertama)"],
+        table,
+    )
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 13. MAIN
+# ──────────────────────────────────────────────────────────────────────────────
+BENCHMARKS: dict[str, Callable[[list[int]], None]] = {
+    "startup": bench_startup,
+    "events": bench_events,
+    "realtime": bench_realtime,
+    "grid": bench_grid,
+    "conflict": bench_conflict,
+    "prefetch": bench_prefetch,
+    "writequeue": bench_writequeue,
+    "replica": bench_replica,
+    "login": bench_login,
+    "pages": bench_pages,
+}
+
+def compare_baseline(path: str, tolerance: float) -> list[str]:
+    """Kasus yang lebih lambat dari baseline lebih dari `tolerance` (mis. 0.25 = 25%)."""
+    baseline = json.loads(Path(path).read_text())["results"]
+    regressions = []
+    for bench, cases in RESULTS.items():
+        for case, ms in cases.items():
+            before = baseline.get(bench, {}).get(case)
+            if before and ms > before * (1 + tolerance):
+                regressions.append(f"{bench}/{case}: {before:.3f} → {ms:.3f} ms")
+    return regressions
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("names", nargs="*", help=f"pilihan: {', '.join(BENCHMARKS)}")
+    parser.add_argument("--sizes", nargs="+", type=int, default=[1_000, 10_000, 100_000])
+    parser.add_argument("--save", metavar="JSON", help="simpan hasil untuk dibandingkan nanti")
+    parser.add_argument("--baseline", metavar="JSON", help="bandingkan dengan hasil --save sebelumnya")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="batas regresi (default 0.25)")
+    args = parser.parse_args()
+    unknown = set(args.names) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"benchmark tidak dikenal: {', '.join(sorted(unknown))}")
+    for name in args.names or BENCHMARKS:
+        BENCHMARKS[name](args.sizes)
+
+    if args.save:
+        Path(args.save).write_text(
+            json.dumps({"date": str(date.today()), "sizes": args.sizes, "results": RESULTS}, indent=2)
+        )
+        print(f"\nHasil disimpan ke {args.save}")
+    if args.baseline:
+        regressions = compare_baseline(args.baseline, args.tolerance)
+        if regressions:
+            print(f"\n## Regresi (> {args.tolerance:.0%} lebih lambat dari {args.baseline})")
+            print("\n".join(regressions))
+            sys.exit(1)
+        print(f"\nTidak ada regresi dibanding {args.baseline}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,2121 @@
+"""
+Lapisan data aplikasi booking meeting room (dipakai main_v4.py):
+instrumentasi per rerun, cache booking bersama, change feed realtime,
+backend Supabase / SQLite / replika baca, BookingRepository, dan antrean
+tulis booking. Modul ini tidak bergantung pada Streamlit; instance bersama
+per proses (st.cache_resource) dibuat di main_v4.py.
+"""
+
+import asyncio
+import itertools
+import json
+import logging
+import queue
+import random
+import sqlite3
+import sys
+import threading
+import uuid
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from datetime import date, datetime, time, timedelta, timezone
+from time import monotonic, perf_counter
+from typing import Iterator, Tuple
+
+import httpx
+from postgrest.exceptions import APIError
+from supabase import Client, acreate_client
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 1. INSTRUMENTASI (TIMER PER RERUN)
+# ──────────────────────────────────────────────────────────────────────────────
+METRICS_HISTORY = 2000   # rerun terakhir yang disimpan per proses
+# Ukuran byte (JSON) query & payload hanya diukur di 1 dari N rerun, atau di
+# setiap rerun bila logger "bbt.metrics" di level DEBUG: serialisasi ulang
+# setiap hasil query terlalu mahal untuk hot path
+METRICS_BYTES_SAMPLE_EVERY = 20
+metrics_log = logging.getLogger("bbt.metrics")
+_rerun_counter = itertools.count()
+
+class MetricsStore:
+    """
+    Rekaman rerun terakhir seluruh sesi dalam proses (ring buffer). Setiap
+    rekaman juga dikirim ke logger "bbt.metrics" sebagai satu baris JSON;
+    aktifkan level INFO untuk mengekspornya ke pipeline log.
+    """
+
+    def __init__(self, maxlen: int = METRICS_HISTORY) -> None:
+        self._records: deque[dict] = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+
+    def add(self, record: dict) -> None:
+        with self._lock:
+            self._records.append(record)
+        if metrics_log.isEnabledFor(logging.INFO):
+            metrics_log.info(json.dumps(record, default=str))
+
+    def records(self) -> list[dict]:
+        with self._lock:
+            return list(self._records)
+
+# Rekaman rerun yang sedang berjalan; setiap sesi dijalankan di thread skripnya sendiri
+_current = threading.local()
+
+def _current_record() -> dict | None:
+    return getattr(_current, "record", None)
+
+@contextmanager
+def track_rerun(page: str, store: MetricsStore):
+    """
+    Bungkus satu rerun: total waktu, tahap, query & payload, lalu simpan ke
+    `store`. Jumlah baris/item selalu dicatat; "bytes" dan "payload_bytes"
+    hanya di rerun sampel (None di rerun lain).
+    """
+    sampled = (
+        next(_rerun_counter) % METRICS_BYTES_SAMPLE_EVERY == 0
+        or metrics_log.isEnabledFor(logging.DEBUG)
+    )
+    record = {
+        "ts": datetime.now().isoformat(timespec="seconds"),
+        "page": page,
+        "stages": {},
+        "queries": 0,
+        "query_ms": 0.0,
+        "rows": 0,
+        "bytes": 0 if sampled else None,
+        "payload": {},
+        "payload_bytes": {} if sampled else None,
+    }
+    _current.record = record
+    _current.reads = {}
+    _current.warnings = set()
+    t0 = perf_counter()
+    try:
+        yield record
+    finally:
+        # st.rerun()/st.stop() juga lewat sini; rerun terpotong tetap tercatat
+        record["total_ms"] = (perf_counter() - t0) * 1e3
+        _current.record = None
+        _current.reads = None
+        _current.warnings = None
+        store.add(record)
+
+@contextmanager
+def stage(name: str):
+    """Timer satu tahap; bisa dipakai sebagai `with stage(...)` atau dekorator."""
+    t0 = perf_counter()
+    try:
+        yield
+    finally:
+        record = _current_record()
+        if record is not None:
+            stages = record["stages"]
+            stages[name] = stages.get(name, 0.0) + (perf_counter() - t0) * 1e3
+
+def _count(data) -> int:
+    return len(data) if isinstance(data, list) else 1
+
+def record_payload(name: str, data) -> None:
+    """Catat jumlah item (dan di rerun sampel, byte JSON) data yang dikirim ke komponen/browser."""
+    record = _current_record()
+    if record is not None:
+        record["payload"][name] = _count(data)
+        if record["payload_bytes"] is not None:
+            record["payload_bytes"][name] = len(json.dumps(data, default=str))
+
+def record_query(label: str, elapsed_ms: float, data) -> None:
+    """Catat satu round trip ke backend data (dipanggil BookingRepository)."""
+    record = _current_record()
+    if record is not None:
+        record["queries"] += 1
+        record["query_ms"] += elapsed_ms
+        record["rows"] += _count(data)
+        if record["bytes"] is not None:
+            record["bytes"] += len(json.dumps(data, default=str))
+        key = f"query:{label}"
+        record["stages"][key] = record["stages"].get(key, 0.0) + elapsed_ms
+
+def rerun_reads() -> dict | None:
+    """Memo baca untuk rerun yang sedang berjalan (None di luar rerun)."""
+    return getattr(_current, "reads", None)
+
+def rerun_warnings() -> set | None:
+    """Peringatan yang sudah ditampilkan di rerun yang sedang berjalan (None di luar rerun)."""
+    return getattr(_current, "warnings", None)
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 2. CACHE BOOKING (DIBAGI SEMUA SESI)
+# ──────────────────────────────────────────────────────────────────────────────
+BOOKING_CACHE_TTL_SECONDS = 60
+BOOKING_CACHE_MAX_PARTITIONS = 5000
+
+def parse_time(value: str) -> time:
+    """Parse kolom waktu Supabase ("HH:MM:SS")."""
+    return time.fromisoformat(value)
+
+def time_minutes(value: time) -> int:
+    """Menit sejak 00:00."""
+    return value.hour * 60 + value.minute
+
+def minutes_mask(first_minute: int, last_minute: int, slot_minutes: int) -> int:
+    """Bitmask slot [first_minute, last_minute): bit i = slot ke-i sejak 00:00, slot terpotong ikut terisi."""
+    first = first_minute // slot_minutes
+    last = -(-last_minute // slot_minutes)
+    return ((1 << (last - first)) - 1) << first if last > first else 0
+
+def slot_mask(start: time, end: time, slot_minutes: int) -> int:
+    return minutes_mask(time_minutes(start), time_minutes(end), slot_minutes)
+
+# "HH:MM:SS" untuk setiap menit dalam sehari, dibuat sekali
+CLOCK = [f"{m // 60:02d}:{m % 60:02d}:00" for m in range(24 * 60 + 1)]
+
+def _clock_time(minutes: int) -> time:
+    return time(minutes // 60, minutes % 60)
+
+def _category(value):
+    """
+    Nilai kolom kategori (ruang, subdir, lantai) di-intern: semua record
+    berbagi satu objek string per nilai unik. Di record ber-__slots__ setiap
+    kolom hanyalah pointer, jadi kode integer tidak lebih hemat: kode > 256
+    justru membuat objek int per record (100 ribu record dengan 400 subdir:
+    ~18,7 MB vs ~17,6 MB), dan setiap baca r.room di hot path event/grid
+    perlu lookup tabel kode. Kode baru menguntungkan di tata letak kolom
+    (array), sedangkan partisi cache per (ruang, tanggal) hanya berisi
+    sedikit baris.
+    """
+    return sys.intern(value) if isinstance(value, str) else value
+
+class BookingRecord:
+    """
+    Satu booking dalam bentuk ringkas untuk cache bersama: tanpa __dict__,
+    ruang/subdir/lantai berupa string ter-intern (lihat _category), tanggal
+    sebagai ordinal dan waktu sebagai menit sejak 00:00. record["kolom"]
+    mengembalikan nilai seperti baris result.data ("YYYY-MM-DD", "HH:MM:SS")
+    untuk kode yang membaca dict.
+    """
+
+    __slots__ = ("id", "nama", "keterangan", "room", "subdir", "floor", "day", "start", "end")
+
+    def __init__(
+        self,
+        id: int,
+        nama: str,
+        keterangan: str,
+        room: str,
+        subdir: str | None,
+        floor: str | None,
+        day: int,
+        start: int,
+        end: int,
+    ) -> None:
+        self.id = id
+        self.nama = nama
+        self.keterangan = keterangan
+        self.room = room
+        self.subdir = subdir
+        self.floor = floor
+        self.day = day
+        self.start = start
+        self.end = end
+
+    @classmethod
+    def from_row(cls, row: "dict | BookingRecord") -> "BookingRecord":
+        """Record dari baris result.data (record dikembalikan apa adanya)."""
+        if isinstance(row, BookingRecord):
+            return row
+        start, end = row["waktu_mulai"], row["waktu_selesai"]
+        return cls(
+            row["id"],
+            sys.intern(row["nama"]),  # nama pemesan sering berulang
+            row.get("keterangan") or "",
+            _category(row["ruang_meeting"]),
+            _category(row.get("subdir")),
+            _category(row.get("floor")),
+            date.fromisoformat(row["tanggal_booking"]).toordinal(),
+            int(start[:2]) * 60 + int(start[3:5]),
+            int(end[:2]) * 60 + int(end[3:5]),
+        )
+
+    @property
+    def booking_date(self) -> date:
+        return date.fromordinal(self.day)
+
+    def __getitem__(self, key: str):
+        return _RECORD_COLUMNS[key](self)
+
+    def get(self, key: str, default=None):
+        getter = _RECORD_COLUMNS.get(key)
+        return default if getter is None else getter(self)
+
+    def to_dict(self) -> dict:
+        return {key: getter(self) for key, getter in _RECORD_COLUMNS.items()}
+
+    def __repr__(self) -> str:
+        return f"BookingRecord({self.to_dict()!r})"
+
+_RECORD_COLUMNS = {
+    "id": lambda r: r.id,
+    "nama": lambda r: r.nama,
+    "subdir": lambda r: r.subdir,
+    "floor": lambda r: r.floor,
+    "ruang_meeting": lambda r: r.room,
+    "tanggal_booking": lambda r: date.fromordinal(r.day).isoformat(),
+    "waktu_mulai": lambda r: CLOCK[r.start],
+    "waktu_selesai": lambda r: CLOCK[r.end],
+    "keterangan": lambda r: r.keterangan,
+}
+
+class RoomDayIndex:
+    """
+    Indeks interval booking (BookingRecord) untuk satu (ruang, tanggal),
+    terurut berdasarkan menit mulai. `_max_end[i]` menyimpan menit selesai
+    terbesar di antara interval 0..i sehingga cek overlap cukup satu bisect
+    (O(log n)). Indeks bersifat immutable: insert/delete menghasilkan indeks
+    baru, aman dibaca lintas thread.
+    """
+
+    __slots__ = ("bookings", "_starts", "_max_end", "_max_end_pos", "_occupancy")
+
+    def __init__(self, bookings: list[BookingRecord]) -> None:
+        self.bookings = sorted(bookings, key=lambda b: b.start)
+        self._starts = [b.start for b in self.bookings]
+        self._max_end: list[int] = []
+        self._max_end_pos: list[int] = []
+        for pos, booking in enumerate(self.bookings):
+            if not self._max_end or booking.end > self._max_end[-1]:
+                self._max_end.append(booking.end)
+                self._max_end_pos.append(pos)
+            else:
+                self._max_end.append(self._max_end[-1])
+                self._max_end_pos.append(self._max_end_pos[-1])
+        self._occupancy: dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.bookings)
+
+    def intervals(self) -> list[Tuple[time, time, BookingRecord]]:
+        """(mulai, selesai, booking) terurut berdasarkan waktu mulai."""
+        return [(_clock_time(b.start), _clock_time(b.end), b) for b in self.bookings]
+
+    def find_overlap(
+        self, start: time, end: time, exclude_id: int | None = None
+    ) -> Tuple[time, time, BookingRecord] | None:
+        """Interval pertama yang beririsan dengan [start, end), atau None."""
+        start_m, end_m = time_minutes(start), time_minutes(end)
+        upto = bisect_left(self._starts, end_m)  # kandidat: mulai < end
+        if upto == 0 or self._max_end[upto - 1] <= start_m:
+            return None
+        found = self.bookings[self._max_end_pos[upto - 1]]
+        if exclude_id is not None and found.id == exclude_id:
+            # Jarang: interval terpanjang adalah booking yang sedang diedit
+            found = next(
+                (b for b in self.bookings[:upto] if b.end > start_m and b.id != exclude_id), None
+            )
+            if found is None:
+                return None
+        return _clock_time(found.start), _clock_time(found.end), found
+
+    def free_intervals(self, open_time: time, close_time: time) -> list[Tuple[time, time]]:
+        """Celah kosong di antara booking dalam jam [open_time, close_time)."""
+        free = []
+        cursor, close = time_minutes(open_time), time_minutes(close_time)
+        for booking in self.bookings:
+            if booking.start >= close:
+                break
+            if booking.start > cursor:
+                free.append((_clock_time(cursor), _clock_time(booking.start)))
+            cursor = max(cursor, booking.end)
+        if cursor < close:
+            free.append((_clock_time(cursor), close_time))
+        return free
+
+    def occupancy(self, slot_minutes: int) -> int:
+        """Bitmap okupansi harian per slot_minutes menit, dihitung sekali per indeks."""
+        bits = self._occupancy.get(slot_minutes)
+        if bits is None:
+            bits = 0
+            for booking in self.bookings:
+                bits |= minutes_mask(booking.start, booking.end, slot_minutes)
+            self._occupancy[slot_minutes] = bits
+        return bits
+
+    def with_booking(self, booking: "dict | BookingRecord") -> "RoomDayIndex":
+        return RoomDayIndex([*self.bookings, BookingRecord.from_row(booking)])
+
+    def without_booking(self, booking_id: int) -> "RoomDayIndex":
+        return RoomDayIndex([b for b in self.bookings if b.id != booking_id])
+
+EMPTY_ROOM_DAY = RoomDayIndex([])
+
+class BookingCache:
+    """
+    Cache booking per proses, dipartisi per (ruang, tanggal).
+    Setiap partisi punya TTL; jumlah partisi dibatasi dengan eviction LRU.
+    Tanggal yang sudah dimuat untuk semua ruang dicatat di `_full_days`
+    sehingga ruang tanpa partisi pada tanggal itu berarti kosong.
+    Isi partisi berupa RoomDayIndex berisi BookingRecord (bukan dict
+    result.data) yang diperbarui langsung saat insert/delete.
+    """
+
+    def __init__(
+        self,
+        ttl: float = BOOKING_CACHE_TTL_SECONDS,
+        max_partitions: int = BOOKING_CACHE_MAX_PARTITIONS,
+    ) -> None:
+        self.ttl = ttl
+        self.max_partitions = max_partitions
+        self._lock = threading.Lock()
+        # Dipegang selama query pengisian agar sesi lain menunggu hasil yang sama
+        self.fill_lock = threading.Lock()
+        self._partitions: OrderedDict[Tuple[str, date], Tuple[float, RoomDayIndex]] = OrderedDict()
+        self._by_date: dict[date, set[str]] = {}
+        self._full_days: dict[date, float] = {}
+        # Rollup harian ikut di-invalidasi setiap perubahan booking
+        self.rollups = DailyRollupCache(ttl)
+
+    def _fresh(self, loaded_at: float) -> bool:
+        return monotonic() - loaded_at < self.ttl
+
+    def _drop(self, key: Tuple[str, date]) -> None:
+        room, day = key
+        self._partitions.pop(key, None)
+        self._full_days.pop(day, None)
+        rooms = self._by_date.get(day)
+        if rooms is not None:
+            rooms.discard(room)
+            if not rooms:
+                del self._by_date[day]
+
+    def _store(self, key: Tuple[str, date], index: RoomDayIndex, loaded_at: float) -> None:
+        self._partitions[key] = (loaded_at, index)
+        self._partitions.move_to_end(key)
+        self._by_date.setdefault(key[1], set()).add(key[0])
+        while len(self._partitions) > self.max_partitions:
+            self._drop(next(iter(self._partitions)))
+
+    def _get_index(self, room: str, day: date) -> RoomDayIndex | None:
+        entry = self._partitions.get((room, day))
+        if entry is not None and self._fresh(entry[0]):
+            self._partitions.move_to_end((room, day))
+            return entry[1]
+        loaded_at = self._full_days.get(day)
+        if loaded_at is not None and self._fresh(loaded_at):
+            return EMPTY_ROOM_DAY
+        return None
+
+    def get_index(self, room: str, day: date) -> RoomDayIndex | None:
+        """Indeks interval satu ruang pada satu tanggal, atau None bila belum/tidak lagi di-cache."""
+        with self._lock:
+            return self._get_index(room, day)
+
+    def get_room_day(self, room: str, day: date) -> list[BookingRecord] | None:
+        """Booking satu ruang pada satu tanggal, atau None bila belum/tidak lagi di-cache."""
+        index = self.get_index(room, day)
+        return None if index is None else index.bookings
+
+    def _missing_days(self, start: date, end: date) -> list[date]:
+        days = (start + timedelta(days=i) for i in range((end - start).days))
+        return [
+            d for d in days
+            if not (d in self._full_days and self._fresh(self._full_days[d]))
+        ]
+
+    def missing_days(self, start: date, end: date) -> list[date]:
+        """Tanggal dalam [start, end) yang belum dimuat untuk semua ruang."""
+        with self._lock:
+            return self._missing_days(start, end)
+
+    def get_window(self, start: date, end: date) -> list[BookingRecord] | None:
+        """Semua booking dalam [start, end), atau None bila ada tanggal yang belum di-cache."""
+        rows: list[BookingRecord] = []
+        with self._lock:
+            if self._missing_days(start, end):
+                return None
+            for i in range((end - start).days):
+                day = start + timedelta(days=i)
+                for room in self._by_date.get(day, ()):
+                    self._partitions.move_to_end((room, day))
+                    rows.extend(self._partitions[(room, day)][1].bookings)
+        return rows
+
+    def put_room_day(self, room: str, day: date, rows: list[dict]) -> RoomDayIndex:
+        index = RoomDayIndex([BookingRecord.from_row(row) for row in rows])
+        with self._lock:
+            self._store((room, day), index, monotonic())
+        return index
+
+    def put_days(self, start: date, end: date, rows: list[dict]) -> None:
+        """Simpan hasil query semua ruang untuk rentang [start, end)."""
+        grouped: dict[Tuple[str, date], list[BookingRecord]] = {}
+        for row in rows:
+            record = BookingRecord.from_row(row)
+            grouped.setdefault((record.room, record.booking_date), []).append(record)
+        now = monotonic()
+        with self._lock:
+            for i in range((end - start).days):
+                day = start + timedelta(days=i)
+                for room in list(self._by_date.get(day, ())):
+                    self._drop((room, day))
+                # Ditandai sebelum partisi disimpan: bila eviction LRU membuang
+                # partisi rentang ini, _drop ikut mencabut tanda tanggalnya
+                self._full_days[day] = now
+            for key, room_rows in grouped.items():
+                self._store(key, RoomDayIndex(room_rows), now)
+
+    def _replace(self, room: str, day: date, update) -> None:
+        key = (room, day)
+        entry = self._partitions.get(key)
+        if entry is not None:
+            self._partitions[key] = (entry[0], update(entry[1]))
+        elif day in self._full_days:
+            # Ruang belum punya partisi di tanggal yang sudah dimuat penuh
+            self._store(key, update(EMPTY_ROOM_DAY), self._full_days[day])
+
+    def apply_insert(self, booking: dict) -> None:
+        """Tambahkan booking baru ke partisinya (bila sedang di-cache); idempoten per id."""
+        record = BookingRecord.from_row(booking)
+        day = record.booking_date
+        with self._lock:
+            self._replace(
+                record.room,
+                day,
+                lambda idx: idx.without_booking(record.id).with_booking(record),
+            )
+        self.rollups.invalidate(day)
+
+    def apply_delete(self, room: str, day: date, booking_id: int) -> None:
+        """Hapus booking dari partisinya (bila sedang di-cache)."""
+        with self._lock:
+            self._replace(room, day, lambda idx: idx.without_booking(booking_id))
+        self.rollups.invalidate(day)
+
+    def invalidate(self, room: str, day: date) -> None:
+        """Buang partisi (ruang, tanggal) setelah insert/delete."""
+        with self._lock:
+            self._drop((room, day))
+        self.rollups.invalidate(day)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._partitions.clear()
+            self._by_date.clear()
+            self._full_days.clear()
+        self.rollups.clear()
+
+class DailyRollupCache:
+    """
+    Rollup harian per (ruang, tanggal) dari tabel booking_daily_rollup
+    (sql/008), di-cache per tanggal dengan TTL. Isinya dipelihara trigger di
+    database; di sini tanggal yang berubah cukup dibuang agar dimuat ulang.
+    """
+
+    def __init__(self, ttl: float = BOOKING_CACHE_TTL_SECONDS) -> None:
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self.fill_lock = threading.Lock()
+        self._days: dict[date, Tuple[float, list[dict]]] = {}
+
+    def _fresh(self, loaded_at: float) -> bool:
+        return monotonic() - loaded_at < self.ttl
+
+    def missing_days(self, start: date, end: date) -> list[date]:
+        with self._lock:
+            days = (start + timedelta(days=i) for i in range((end - start).days))
+            return [d for d in days if not (d in self._days and self._fresh(self._days[d][0]))]
+
+    def get_window(self, start: date, end: date) -> list[dict] | None:
+        """Rollup semua ruang dalam [start, end), atau None bila ada tanggal yang belum di-cache."""
+        rows: list[dict] = []
+        with self._lock:
+            for i in range((end - start).days):
+                entry = self._days.get(start + timedelta(days=i))
+                if entry is None or not self._fresh(entry[0]):
+                    return None
+                rows.extend(entry[1])
+        return rows
+
+    def put_days(self, start: date, end: date, rows: list[dict]) -> None:
+        grouped: dict[date, list[dict]] = {}
+        for row in rows:
+            grouped.setdefault(date.fromisoformat(row["tanggal_booking"]), []).append(row)
+        now = monotonic()
+        with self._lock:
+            for day in [d for d, (loaded_at, _) in self._days.items() if not self._fresh(loaded_at)]:
+                del self._days[day]
+            for i in range((end - start).days):
+                day = start + timedelta(days=i)
+                self._days[day] = (now, grouped.get(day, []))
+
+    def invalidate(self, day: date) -> None:
+        with self._lock:
+            self._days.pop(day, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._days.clear()
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 3. REALTIME – PUSH PERUBAHAN BOOKING
+# ──────────────────────────────────────────────────────────────────────────────
+REALTIME_RETRY_BASE_SECONDS = 1    # backoff sambung ulang Supabase Realtime
+REALTIME_RETRY_MAX_SECONDS = 60
+
+class BookingChangeHub:
+    """
+    Menerapkan event perubahan booking (INSERT/UPDATE/DELETE) ke cache
+    bersama. `version` naik di setiap event; sesi cukup membandingkan versi
+    ini (di memori) untuk tahu kapan kalender perlu dirender ulang.
+    """
+
+    def __init__(self, cache: BookingCache) -> None:
+        self.cache = cache
+        self.version = 0
+        self.connected = False
+        self._lock = threading.Lock()
+
+    def apply(self, change: dict) -> None:
+        """Terapkan satu event format postgres_changes (type, record, old_record)."""
+        kind = change.get("type")
+        record = change.get("record") or {}
+        old = change.get("old_record") or {}
+        if kind in ("UPDATE", "DELETE"):
+            if old.get("ruang_meeting") and old.get("tanggal_booking"):
+                self.cache.apply_delete(
+                    old["ruang_meeting"], date.fromisoformat(old["tanggal_booking"]), old["id"]
+                )
+            else:
+                # Tanpa REPLICA IDENTITY FULL hanya id yang dikirim
+                self.cache.clear()
+        if kind in ("INSERT", "UPDATE") and record:
+            self.cache.apply_insert(record)
+        with self._lock:
+            self.version += 1
+
+    def reset(self) -> None:
+        """Kosongkan cache bersama (mis. setelah sinkron penuh replika) dan naikkan versi."""
+        self.cache.clear()
+        with self._lock:
+            self.version += 1
+
+class LocalChangeFeed:
+    """Change feed lokal pengganti Supabase Realtime (pengujian & benchmark)."""
+
+    def __init__(self) -> None:
+        self._queue: queue.Queue[dict] = queue.Queue()
+
+    def publish(self, change: dict) -> None:
+        self._queue.put(change)
+
+    def run(self, hub: BookingChangeHub, stop: threading.Event) -> None:
+        hub.connected = True
+        while not stop.is_set():
+            try:
+                change = self._queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            hub.apply(change)
+            self._queue.task_done()
+        hub.connected = False
+
+    def join(self) -> None:
+        """Tunggu sampai semua event yang sudah dipublish diterapkan."""
+        self._queue.join()
+
+class SupabaseRealtimeFeed:
+    """
+    Change feed dari Supabase Realtime (postgres_changes tabel bookings).
+    Bila koneksi/channel putus, hub.connected = False dan feed menyambung
+    ulang dengan backoff eksponensial (+jitter); setelah tersambung lagi
+    cache bersama dikosongkan karena event selama putus tidak pernah diterima.
+    """
+
+    def __init__(self, url: str, key: str) -> None:
+        self.url = url
+        self.key = key
+        self.last_error: str | None = None
+
+    def run(self, hub: BookingChangeHub, stop: threading.Event) -> None:
+        asyncio.run(self._listen(hub, stop))
+
+    async def _listen(self, hub: BookingChangeHub, stop: threading.Event) -> None:
+        failures = 0
+        while not stop.is_set():
+            started = monotonic()
+            try:
+                await self._session(hub, stop, reconnect=failures > 0)
+            except Exception as err:
+                self.last_error = str(err)
+                logging.getLogger(__name__).warning("Realtime terputus: %s", err)
+            hub.connected = False
+            if stop.is_set():
+                break
+            # Sesi yang sempat berjalan lama dianggap sehat: backoff mulai dari awal
+            if monotonic() - started > REALTIME_RETRY_MAX_SECONDS:
+                failures = 0
+            delay = min(REALTIME_RETRY_MAX_SECONDS, REALTIME_RETRY_BASE_SECONDS * 2 ** failures)
+            failures += 1
+            await asyncio.to_thread(stop.wait, delay * random.uniform(0.5, 1.0))
+
+    async def _session(self, hub: BookingChangeHub, stop: threading.Event, reconnect: bool) -> None:
+        """Satu koneksi + subscribe; kembali (atau raise) saat channel tidak lagi aktif."""
+        client = await acreate_client(self.url, self.key)
+        down = asyncio.Event()
+
+        def on_state(state, err) -> None:
+            if state == "SUBSCRIBED":
+                hub.connected, self.last_error = True, None
+                if reconnect:
+                    hub.reset()
+            else:
+                hub.connected = False
+                self.last_error = str(err or state)
+                down.set()
+
+        try:
+            channel = client.channel("bookings-changes")
+            channel.on_postgres_changes(
+                "*", schema="public", table="bookings", callback=lambda p: hub.apply(p["data"])
+            )
+            await channel.subscribe(on_state)
+            while not stop.is_set() and not down.is_set():
+                if hub.connected and not client.realtime.is_connected:
+                    raise ConnectionError("socket realtime tertutup")
+                await asyncio.sleep(1)
+        finally:
+            hub.connected = False
+            try:
+                await client.remove_all_channels()
+            except Exception:
+                pass
+
+class RealtimeListener:
+    """Satu thread listener per proses server yang menjalankan sebuah change feed."""
+
+    def __init__(self, hub: BookingChangeHub, feed) -> None:
+        self.hub = hub
+        self.feed = feed
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=feed.run, args=(hub, self._stop), name="booking-realtime", daemon=True
+        )
+
+    def start(self) -> "RealtimeListener":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join(timeout=5)
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 4. BACKEND & REPOSITORY BOOKING (AKSES DATA)
+# ──────────────────────────────────────────────────────────────────────────────
+# Batas max-rows PostgREST (bawaan Supabase 1000): baris di luar batas
+# dibuang tanpa error, jadi baca yang bisa melebihinya diambil per halaman
+BOOKING_PAGE_ROWS = 1000
+ROLLUP_PAGE_ROWS = 1000
+ROOM_COLUMNS = "nama,floor,capacity,color,jam_buka,jam_tutup"
+ROOM_CATALOG_TTL_SECONDS = 600   # umur katalog ruang (get_room_catalog di main_v4.py)
+QUERY_TIMEOUT_SECONDS = 10
+
+class AsyncRunner:
+    """
+    Event loop asyncio di satu thread background, dipakai bersama semua
+    sesi. Script Streamlit (sinkron) menyerahkan coroutine lalu menunggu
+    hasilnya; bila script berhenti lebih dulu (rerun/stop), coroutine
+    dibatalkan.
+    """
+
+    def __init__(self) -> None:
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name="bbt-async-io", daemon=True)
+        self._thread.start()
+
+    def run(self, coro, timeout: float):
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        try:
+            return future.result(timeout)
+        except BaseException:
+            future.cancel()
+            raise
+
+_async_runner: AsyncRunner | None = None
+_async_runner_lock = threading.Lock()
+
+def get_async_runner() -> AsyncRunner:
+    """AsyncRunner tunggal per proses, dibuat saat pertama dipakai."""
+    global _async_runner
+    with _async_runner_lock:
+        if _async_runner is None:
+            _async_runner = AsyncRunner()
+        return _async_runner
+
+class BookingBackend(ABC):
+    """
+    Operasi data mentah tanpa cache. Setiap method = satu round trip ke
+    penyimpanan; semantiknya mengikuti fungsi di sql/*.sql.
+    """
+
+    name = "backend"
+
+    @abstractmethod
+    def ping(self) -> None:
+        ...
+
+    @abstractmethod
+    def select_range(self, start: date, end: date) -> list[dict]:
+        """Semua booking dengan tanggal dalam [start, end)."""
+
+    @abstractmethod
+    def select_room_day(self, room: str, day: date) -> list[dict]:
+        ...
+
+    @abstractmethod
+    def select_rollups(self, start: date, end: date) -> list[dict]:
+        """Baris booking_daily_rollup (sql/008) dalam [start, end)."""
+
+    @abstractmethod
+    def select_rooms(self) -> list[dict]:
+        ...
+
+    @abstractmethod
+    def select_page(
+        self,
+        columns: list[str],
+        filters: dict,
+        sort_col: str,
+        desc: bool,
+        cursor: Tuple[object, int] | None,
+        limit: int,
+    ) -> Tuple[list[dict], int | None]:
+        """Satu halaman keyset (nilai kolom urut, id) + perkiraan total baris."""
+
+    @abstractmethod
+    def select_after_id(self, columns: list[str], last_id: int, limit: int) -> list[dict]:
+        ...
+
+    @abstractmethod
+    def book_if_free(self, booking: dict) -> dict:
+        ...
+
+    @abstractmethod
+    def book_many_if_free(self, bookings: list[dict]) -> dict:
+        ...
+
+    @abstractmethod
+    def delete(self, ids: list[int]) -> list[dict]:
+        ...
+
+    @abstractmethod
+    def move(self, ids: list[int], room: str | None, shift_days: int) -> dict:
+        ...
+
+    @abstractmethod
+    def utilization(self, start: date, end: date) -> dict:
+        ...
+
+    async def aread(self, op: str, *args):
+        """
+        Versi async operasi baca `op`. Bawaan: method sinkron dijalankan di
+        thread pool sehingga beberapa baca tetap bisa berjalan bersamaan.
+        """
+        return await asyncio.to_thread(getattr(self, op), *args)
+
+class UpstreamBackend(BookingBackend):
+    """
+    Backend yang bisa menjadi upstream replika baca (mode [database]
+    replica): selain operasi biasa, menyediakan perubahan inkremental dari
+    updated_at dan tombstone booking_deletions (sql/010).
+    """
+
+    @abstractmethod
+    def select_changed(self, after: Tuple[str, int] | None, limit: int) -> list[dict]:
+        """Booking dengan (updated_at, id) > after, urut (updated_at, id)."""
+
+    @abstractmethod
+    def select_deleted(self, after: Tuple[str, int] | None, limit: int) -> list[dict]:
+        """Tombstone booking_deletions dengan (deleted_at, id) > after."""
+
+def _pgrst_value(value) -> str:
+    """Kutip nilai untuk filter or=(...) PostgREST (aman untuk koma/kurung)."""
+    text = str(value).replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{text}"'
+
+class SupabaseBackend(UpstreamBackend):
+    """
+    Backend PostgREST/RPC Supabase. Query baca dibangun oleh builder yang
+    sama untuk client sinkron dan client async (aread); client async dibuat
+    di event loop AsyncRunner saat pertama dipakai.
+    """
+
+    name = "supabase"
+
+    def __init__(self, client: Client, url: str | None = None, key: str | None = None) -> None:
+        self.client = client
+        self.url, self.key = url, key
+        self._aclient = None
+        self._aclient_lock: asyncio.Lock | None = None
+
+    # ── Builder query (client sinkron maupun async) ────────────────────────
+    @staticmethod
+    def _range_query(client, start: date, end: date, last_id: int):
+        # Keyset per id: insert/delete di antara halaman tidak menggeser baris lain
+        return (
+            client.table("bookings")
+            .select("*")
+            .gte("tanggal_booking", str(start))
+            .lt("tanggal_booking", str(end))
+            .gt("id", last_id)
+            .order("id")
+            .limit(BOOKING_PAGE_ROWS)
+        )
+
+    @staticmethod
+    def _room_day_query(client, room: str, day: date):
+        return (
+            client.table("bookings")
+            .select("*")
+            .eq("tanggal_booking", str(day))
+            .eq("ruang_meeting", room)
+        )
+
+    @staticmethod
+    def _rollups_query(client, start: date, end: date, offset: int):
+        return (
+            client.table("booking_daily_rollup")
+            .select("*")
+            .gte("tanggal_booking", str(start))
+            .lt("tanggal_booking", str(end))
+            .order("tanggal_booking")
+            .order("ruang_meeting")
+            .range(offset, offset + ROLLUP_PAGE_ROWS - 1)
+        )
+
+    @staticmethod
+    def _rooms_query(client):
+        return client.table("rooms").select(ROOM_COLUMNS).eq("aktif", True)
+
+    @staticmethod
+    def _page_query(client, columns, filters, sort_col, desc, cursor, limit):
+        query = client.table("bookings").select(",".join(columns), count="estimated")
+        if filters.get("room"):
+            query = query.eq("ruang_meeting", filters["room"])
+        if filters.get("start"):
+            query = query.gte("tanggal_booking", str(filters["start"]))
+        if filters.get("end"):
+            query = query.lte("tanggal_booking", str(filters["end"]))
+        if filters.get("name"):
+            query = query.ilike("nama", f"%{filters['name']}%")
+
+        if cursor is not None:
+            value, last_id = cursor
+            op = "lt" if desc else "gt"
+            if sort_col == "id":
+                query = getattr(query, op)("id", last_id)
+            else:
+                query = query.or_(
+                    f"{sort_col}.{op}.{_pgrst_value(value)},"
+                    f"and({sort_col}.eq.{_pgrst_value(value)},id.{op}.{last_id})"
+                )
+
+        query = query.order(sort_col, desc=desc)
+        if sort_col != "id":
+            query = query.order("id", desc=desc)
+        return query.limit(limit)
+
+    @staticmethod
+    def _utilization_query(client, start: date, end: date):
+        return client.rpc("booking_utilization", {"p_start": str(start), "p_end": str(end)})
+
+    # ── Baca sinkron ──────────────────────────────────────────────────────
+    def ping(self) -> None:
+        self.client.table("bookings").select("id").limit(1).execute()
+
+    def select_range(self, start: date, end: date) -> list[dict]:
+        # Per halaman: hasil ini menandai tanggalnya "dimuat penuh" di BookingCache
+        fetched: list[dict] = []
+        while True:
+            last_id = fetched[-1]["id"] if fetched else 0
+            page = self._range_query(self.client, start, end, last_id).execute().data
+            fetched.extend(page)
+            if len(page) < BOOKING_PAGE_ROWS:
+                return fetched
+
+    def select_room_day(self, room: str, day: date) -> list[dict]:
+        return self._room_day_query(self.client, room, day).execute().data
+
+    def select_rollups(self, start: date, end: date) -> list[dict]:
+        # Per halaman: satu bulan bisa melebihi batas baris PostgREST bila ruangnya banyak
+        fetched: list[dict] = []
+        while True:
+            page = self._rollups_query(self.client, start, end, len(fetched)).execute().data
+            fetched.extend(page)
+            if len(page) < ROLLUP_PAGE_ROWS:
+                return fetched
+
+    def select_rooms(self) -> list[dict]:
+        return self._rooms_query(self.client).execute().data
+
+    def select_page(self, columns, filters, sort_col, desc, cursor, limit):
+        result = self._page_query(self.client, columns, filters, sort_col, desc, cursor, limit).execute()
+        return result.data, result.count
+
+    def select_after_id(self, columns: list[str], last_id: int, limit: int) -> list[dict]:
+        return (
+            self.client.table("bookings")
+            .select(",".join(columns))
+            .gt("id", last_id)
+            .order("id", desc=False)
+            .limit(limit)
+            .execute()
+            .data
+        )
+
+    def _keyset_after(self, table: str, column: str, after: Tuple[str, int] | None, limit: int) -> list[dict]:
+        query = self.client.table(table).select("*")
+        if after is not None:
+            value, last_id = after
+            query = query.or_(
+                f"{column}.gt.{_pgrst_value(value)},and({column}.eq.{_pgrst_value(value)},id.gt.{last_id})"
+            )
+        return query.order(column).order("id").limit(limit).execute().data
+
+    def select_changed(self, after: Tuple[str, int] | None, limit: int) -> list[dict]:
+        return self._keyset_after("bookings", "updated_at", after, limit)
+
+    def select_deleted(self, after: Tuple[str, int] | None, limit: int) -> list[dict]:
+        return self._keyset_after("booking_deletions", "deleted_at", after, limit)
+
+    def utilization(self, start: date, end: date) -> dict:
+        return self._utilization_query(self.client, start, end).execute().data
+
+    # ── Baca async ─────────────────────────────────────────────────────────
+    async def _async_client(self):
+        if self._aclient_lock is None:
+            self._aclient_lock = asyncio.Lock()
+        async with self._aclient_lock:
+            if self._aclient is None:
+                self._aclient = await acreate_client(self.url, self.key)
+        return self._aclient
+
+    async def aread(self, op: str, *args):
+        if self.url is None:
+            return await super().aread(op, *args)
+        client = await self._async_client()
+        if op == "select_range":
+            fetched: list[dict] = []
+            while True:
+                last_id = fetched[-1]["id"] if fetched else 0
+                page = (await self._range_query(client, *args, last_id).execute()).data
+                fetched.extend(page)
+                if len(page) < BOOKING_PAGE_ROWS:
+                    return fetched
+        if op == "select_rollups":
+            fetched: list[dict] = []
+            while True:
+                page = (await self._rollups_query(client, *args, len(fetched)).execute()).data
+                fetched.extend(page)
+                if len(page) < ROLLUP_PAGE_ROWS:
+                    return fetched
+        if op == "select_page":
+            result = await self._page_query(client, *args).execute()
+            return result.data, result.count
+        builder = {
+            "select_room_day": self._room_day_query,
+            "select_rooms": self._rooms_query,
+            "utilization": self._utilization_query,
+        }.get(op)
+        if builder is None:
+            return await super().aread(op, *args)
+        return (await builder(client, *args).execute()).data
+
+    # ── Tulis ──────────────────────────────────────────────────────────────
+    def book_if_free(self, booking: dict) -> dict:
+        return self.client.rpc(
+            "book_if_free", {f"p_{col}": value for col, value in booking.items()}
+        ).execute().data
+
+    def book_many_if_free(self, bookings: list[dict]) -> dict:
+        return self.client.rpc("book_many_if_free", {"p_bookings": bookings}).execute().data
+
+    def delete(self, ids: list[int]) -> list[dict]:
+        return self.client.table("bookings").delete().in_("id", ids).execute().data
+
+    def move(self, ids: list[int], room: str | None, shift_days: int) -> dict:
+        return self.client.rpc(
+            "move_bookings", {"p_ids": ids, "p_room": room, "p_shift_days": shift_days}
+        ).execute().data
+
+SQLITE_SCHEMA = """
+create table if not exists bookings (
+    id              integer primary key autoincrement,
+    created_at      text not null default (strftime('%Y-%m-%dT%H:%M:%fZ', 'now')),
+    nama            text not null,
+    subdir          text,
+    floor           text,
+    ruang_meeting   text not null,
+    tanggal_booking text not null,   -- YYYY-MM-DD
+    waktu_mulai     text not null,   -- HH:MM:SS
+    waktu_selesai   text not null,
+    keterangan      text,
+    idempotency_key text,            -- sql/009
+    updated_at      text default (strftime('%Y-%m-%dT%H:%M:%fZ', 'now'))   -- sql/010
+);
+create index if not exists bookings_ruang_tanggal_idx on bookings (ruang_meeting, tanggal_booking);
+create index if not exists bookings_tanggal_idx on bookings (tanggal_booking);
+create table if not exists rooms (
+    nama      text primary key,
+    floor     text not null,
+    capacity  integer,
+    color     text,
+    jam_buka  text,
+    jam_tutup text,
+    aktif     integer not null default 1
+);
+"""
+BOOKING_FIELDS = [
+    "nama", "subdir", "floor", "ruang_meeting", "tanggal_booking",
+    "waktu_mulai", "waktu_selesai", "keterangan", "idempotency_key",
+]
+SQLITE_COLUMNS = {"id", "created_at", "updated_at", *BOOKING_FIELDS}
+# Kolom yang ditambahkan setelah skema awal (file SQLite versi lama dimigrasi)
+SQLITE_ADDED_COLUMNS = {"idempotency_key": "text", "updated_at": "text"}
+# Setara trigger updated_at di sql/010; baris dari replika membawa updated_at sendiri
+SQLITE_TOUCH_TRIGGER = """
+create trigger if not exists bookings_touch_updated_at
+after update on bookings
+when new.updated_at is old.updated_at
+begin
+    update bookings set updated_at = strftime('%Y-%m-%dT%H:%M:%fZ', 'now') where id = new.id;
+end;
+"""
+# Menit sejak 00:00 dari kolom waktu "HH:MM:SS"
+_SQLITE_MINUTES = "(cast(substr({0}, 1, 2) as integer) * 60 + cast(substr({0}, 4, 2) as integer))"
+
+class SqliteBackend(BookingBackend):
+    """
+    Backend SQL lokal (SQLite) dengan skema & semantik RPC yang sama:
+    cek bentrok + insert dijalankan dalam satu transaksi `begin immediate`
+    sehingga penulis lain menunggu, setara advisory lock di sql/002.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        with self._connect() as conn:
+            conn.execute("pragma journal_mode = wal")
+            conn.executescript(SQLITE_SCHEMA)
+            columns = {row["name"] for row in conn.execute("pragma table_info(bookings)")}
+            for column, kind in SQLITE_ADDED_COLUMNS.items():
+                if column not in columns:
+                    conn.execute(f"alter table bookings add column {column} {kind}")
+            conn.execute(
+                "create unique index if not exists bookings_idempotency_key_idx on bookings (idempotency_key)"
+            )
+            conn.executescript(SQLITE_TOUCH_TRIGGER)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _transaction(self):
+        with self._connect() as conn:
+            conn.execute("begin immediate")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("rollback")
+                raise
+            conn.execute("commit")
+
+    def _rows(self, sql: str, params=()) -> list[dict]:
+        with self._connect() as conn:
+            return [dict(row) for row in conn.execute(sql, params)]
+
+    @staticmethod
+    def _columns(columns: list[str]) -> str:
+        unknown = set(columns) - SQLITE_COLUMNS
+        if unknown:
+            raise ValueError(f"Kolom tidak dikenal: {', '.join(sorted(unknown))}")
+        return ", ".join(columns)
+
+    def ping(self) -> None:
+        self._rows("select 1")
+
+    def select_range(self, start: date, end: date) -> list[dict]:
+        return self._rows(
+            "select * from bookings where tanggal_booking >= ? and tanggal_booking < ?",
+            (str(start), str(end)),
+        )
+
+    def select_room_day(self, room: str, day: date) -> list[dict]:
+        return self._rows(
+            "select * from bookings where ruang_meeting = ? and tanggal_booking = ?",
+            (room, str(day)),
+        )
+
+    def select_rollups(self, start: date, end: date) -> list[dict]:
+        minutes = f"{_SQLITE_MINUTES.format('waktu_selesai')} - {_SQLITE_MINUTES.format('waktu_mulai')}"
+        return self._rows(
+            f"""
+            select tanggal_booking, ruang_meeting,
+                   count(*) as booking_count, sum({minutes}) as booked_minutes,
+                   min(waktu_mulai) as first_start, max(waktu_selesai) as last_end
+              from bookings
+             where tanggal_booking >= ? and tanggal_booking < ?
+             group by tanggal_booking, ruang_meeting
+             order by tanggal_booking, ruang_meeting
+            """,
+            (str(start), str(end)),
+        )
+
+    def select_rooms(self) -> list[dict]:
+        return self._rows(f"select {ROOM_COLUMNS} from rooms where aktif = 1")
+
+    def select_page(self, columns, filters, sort_col, desc, cursor, limit):
+        self._columns([sort_col])
+        where, params = ["1 = 1"], []
+        if filters.get("room"):
+            where.append("ruang_meeting = ?")
+            params.append(filters["room"])
+        if filters.get("start"):
+            where.append("tanggal_booking >= ?")
+            params.append(str(filters["start"]))
+        if filters.get("end"):
+            where.append("tanggal_booking <= ?")
+            params.append(str(filters["end"]))
+        if filters.get("name"):
+            where.append("nama like ?")  # LIKE SQLite tidak peka huruf besar/kecil (ASCII)
+            params.append(f"%{filters['name']}%")
+        filtered = " and ".join(where)
+        count_params = list(params)
+
+        if cursor is not None:
+            value, last_id = cursor
+            op = "<" if desc else ">"
+            if sort_col == "id":
+                where.append(f"id {op} ?")
+                params.append(last_id)
+            else:
+                where.append(f"({sort_col} {op} ? or ({sort_col} = ? and id {op} ?))")
+                params += [value, value, last_id]
+
+        direction = "desc" if desc else "asc"
+        order = f"{sort_col} {direction}" + (f", id {direction}" if sort_col != "id" else "")
+        with self._connect() as conn:
+            rows = [
+                dict(row)
+                for row in conn.execute(
+                    f"select {self._columns(columns)} from bookings "
+                    f"where {' and '.join(where)} order by {order} limit ?",
+                    [*params, limit],
+                )
+            ]
+            count = conn.execute(
+                f"select count(*) from bookings where {filtered}", count_params
+            ).fetchone()[0]
+        return rows, count
+
+    def select_after_id(self, columns: list[str], last_id: int, limit: int) -> list[dict]:
+        return self._rows(
+            f"select {self._columns(columns)} from bookings where id > ? order by id limit ?",
+            (last_id, limit),
+        )
+
+    @staticmethod
+    def _conflict(conn, booking: dict, exclude_id: int | None = None) -> dict | None:
+        row = conn.execute(
+            """
+            select id, nama, waktu_mulai, waktu_selesai from bookings
+             where ruang_meeting = ? and tanggal_booking = ?
+               and waktu_mulai < ? and waktu_selesai > ? and id is not ?
+             order by waktu_mulai limit 1
+            """,
+            (
+                booking["ruang_meeting"],
+                booking["tanggal_booking"],
+                booking["waktu_selesai"],
+                booking["waktu_mulai"],
+                exclude_id,
+            ),
+        ).fetchone()
+        return dict(row) if row else None
+
+    @staticmethod
+    def _insert(conn, booking: dict) -> dict:
+        row = conn.execute(
+            f"insert into bookings ({', '.join(BOOKING_FIELDS)}) "
+            f"values ({', '.join('?' * len(BOOKING_FIELDS))}) returning *",
+            [booking.get(col) for col in BOOKING_FIELDS],
+        ).fetchone()
+        return dict(row)
+
+    def book_if_free(self, booking: dict) -> dict:
+        if booking["waktu_mulai"] >= booking["waktu_selesai"]:
+            return {"status": "invalid", "message": "Waktu selesai harus lebih besar dari waktu mulai"}
+        with self._transaction() as conn:
+            key = booking.get("idempotency_key")
+            if key:
+                row = conn.execute("select * from bookings where idempotency_key = ?", (key,)).fetchone()
+                if row:
+                    return {"status": "booked", "booking": dict(row), "replayed": True}
+            conflict = self._conflict(conn, booking)
+            if conflict:
+                return {"status": "conflict", "conflict": conflict}
+            return {"status": "booked", "booking": self._insert(conn, booking)}
+
+    def book_many_if_free(self, bookings: list[dict]) -> dict:
+        booked, conflicts, invalid = [], [], []
+        with self._transaction() as conn:
+            for booking in bookings:
+                if booking["waktu_mulai"] >= booking["waktu_selesai"]:
+                    invalid.append(
+                        {"booking": booking, "message": "Waktu selesai harus lebih besar dari waktu mulai"}
+                    )
+                    continue
+                conflict = self._conflict(conn, booking)
+                if conflict:
+                    conflicts.append({"booking": booking, "conflict": conflict})
+                else:
+                    booked.append(self._insert(conn, booking))
+        return {"booked": booked, "conflicts": conflicts, "invalid": invalid}
+
+    def delete(self, ids: list[int]) -> list[dict]:
+        with self._transaction() as conn:
+            return [
+                dict(row)
+                for row in conn.execute(
+                    f"delete from bookings where id in ({', '.join('?' * len(ids))}) returning *",
+                    ids,
+                )
+            ]
+
+    def move(self, ids: list[int], room: str | None, shift_days: int) -> dict:
+        moved, conflicts = [], []
+        with self._transaction() as conn:
+            rows = [
+                dict(row)
+                for row in conn.execute(
+                    f"select * from bookings where id in ({', '.join('?' * len(ids))})", ids
+                )
+            ]
+            # Searah pergeseran agar satu seri tidak bentrok dengan dirinya sendiri (sql/004)
+            rows.sort(key=lambda r: r["waktu_mulai"])
+            rows.sort(key=lambda r: r["tanggal_booking"], reverse=shift_days > 0)
+            for row in rows:
+                target = {
+                    **row,
+                    "ruang_meeting": room or row["ruang_meeting"],
+                    "tanggal_booking": str(date.fromisoformat(row["tanggal_booking"]) + timedelta(days=shift_days)),
+                }
+                conflict = self._conflict(conn, target, exclude_id=row["id"])
+                if conflict:
+                    conflicts.append({"booking": row, "conflict": conflict})
+                    continue
+                updated = conn.execute(
+                    "update bookings set ruang_meeting = ?, tanggal_booking = ? where id = ? returning *",
+                    (target["ruang_meeting"], target["tanggal_booking"], row["id"]),
+                ).fetchone()
+                moved.append({"from": row, "to": dict(updated)})
+        return {"moved": moved, "conflicts": conflicts}
+
+    def utilization(self, start: date, end: date) -> dict:
+        start_min = _SQLITE_MINUTES.format("waktu_mulai")
+        end_min = _SQLITE_MINUTES.format("waktu_selesai")
+        period = f"""
+            with periode as (
+                select ruang_meeting,
+                       coalesce(nullif(subdir, ''), '(tanpa subdir)') as subdir,
+                       tanggal_booking,
+                       {start_min} as mulai,
+                       {end_min} as selesai
+                  from bookings
+                 where tanggal_booking >= ? and tanggal_booking < ?
+                   and waktu_selesai > waktu_mulai
+            ), jam(jam) as (
+                select 0 union all select jam + 1 from jam where jam < 23
+            )
+        """
+        params = (str(start), str(end))
+        return {
+            "per_room_week": self._rows(
+                period + """
+                select ruang_meeting,
+                       date(tanggal_booking, '-6 days', 'weekday 1') as minggu,
+                       count(*) as booking, sum(selesai - mulai) as menit
+                  from periode group by 1, 2 order by 1, 2
+                """,
+                params,
+            ),
+            "per_hour": self._rows(
+                period + """
+                select (cast(strftime('%w', p.tanggal_booking) as integer) + 6) % 7 + 1 as hari,
+                       j.jam,
+                       sum(min(p.selesai, j.jam * 60 + 60) - max(p.mulai, j.jam * 60)) as menit
+                  from periode p
+                  join jam j on j.jam * 60 < p.selesai and j.jam * 60 + 60 > p.mulai
+                 group by 1, 2 order by 1, 2
+                """,
+                params,
+            ),
+            "per_subdir": self._rows(
+                period + """
+                select subdir, count(*) as booking, sum(selesai - mulai) as menit
+                  from periode group by 1 order by menit desc
+                """,
+                params,
+            ),
+        }
+
+REPLICA_SYNC_SECONDS = 5
+REPLICA_PAGE_ROWS = 1000
+# updated_at = awal transaksi, jadi transaksi yang commit belakangan bisa
+# muncul di belakang cursor. Cursor yang disimpan hanya maju sampai baris
+# yang lebih tua dari overlap ini; baris lebih baru dibaca ulang (idempoten)
+REPLICA_SYNC_OVERLAP_SECONDS = 30
+REPLICA_TOMBSTONE_DAYS = 30   # retensi booking_deletions di sql/010
+
+class SqliteReplica(SqliteBackend):
+    """
+    Salinan lokal tabel bookings untuk mode replika baca. Selain skema
+    SqliteBackend, menyimpan cursor sinkron per sumber (bookings /
+    booking_deletions) di tabel replica_state. Koneksi dipertahankan per
+    thread agar page cache SQLite tetap hangat di antara baca.
+    """
+
+    name = "replica"
+
+    def __init__(self, path: str) -> None:
+        self._local = threading.local()
+        super().__init__(path)
+        with self._connect() as conn:
+            conn.execute("create table if not exists replica_state (name text primary key, value text not null)")
+        self._ready = self.state("synced_at") is not None
+
+    @contextmanager
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+        yield conn
+
+    def state(self, name: str) -> str | None:
+        rows = self._rows("select value from replica_state where name = ?", (name,))
+        return rows[0]["value"] if rows else None
+
+    def cursor(self, source: str) -> Tuple[str, int] | None:
+        value = self.state(f"cursor:{source}")
+        return None if value is None else tuple(json.loads(value))
+
+    @property
+    def ready(self) -> bool:
+        """True setelah sinkron penuh pertama selesai (bertahan setelah restart)."""
+        return self._ready
+
+    def stale(self, max_age: timedelta) -> bool:
+        synced_at = self.state("synced_at")
+        return synced_at is not None and datetime.now().timestamp() - float(synced_at) > max_age.total_seconds()
+
+    def reset(self) -> None:
+        self._ready = False
+        with self._transaction() as conn:
+            conn.execute("delete from bookings")
+            conn.execute("delete from replica_state")
+
+    def save_sync(self, cursors: dict[str, Tuple[str, int] | None]) -> None:
+        with self._transaction() as conn:
+            for source, cursor in cursors.items():
+                if cursor is not None:
+                    conn.execute(
+                        "insert or replace into replica_state values (?, ?)", (f"cursor:{source}", json.dumps(cursor))
+                    )
+            conn.execute(
+                "insert or replace into replica_state values ('synced_at', ?)", (str(datetime.now().timestamp()),)
+            )
+        self._ready = True
+
+    def apply_rows(self, rows: list[dict]) -> list[Tuple[dict | None, dict]]:
+        """Upsert baris upstream; (lama, baru) hanya untuk baris yang benar-benar berubah."""
+        changed = []
+        with self._transaction() as conn:
+            for row in rows:
+                old = conn.execute("select * from bookings where id = ?", (row["id"],)).fetchone()
+                if old is not None and old["updated_at"] == row.get("updated_at"):
+                    continue
+                columns = [col for col in row if col in SQLITE_COLUMNS]
+                conn.execute(
+                    f"insert into bookings ({', '.join(columns)}) values ({', '.join('?' * len(columns))}) "
+                    f"on conflict (id) do update set "
+                    + ", ".join(f"{col} = excluded.{col}" for col in columns if col != "id"),
+                    [row[col] for col in columns],
+                )
+                changed.append((dict(old) if old is not None else None, row))
+        return changed
+
+    def apply_deletes(self, ids: list[int]) -> list[dict]:
+        """Hapus id yang masih ada; kembalikan baris yang terhapus."""
+        if not ids:
+            return []
+        with self._transaction() as conn:
+            return [
+                dict(row)
+                for row in conn.execute(
+                    f"delete from bookings where id in ({', '.join('?' * len(ids))}) returning *", ids
+                )
+            ]
+
+class ReplicaBackend(BookingBackend):
+    """
+    Mode replika baca: semua baca booking dari SqliteReplica lokal (diisi
+    ReplicaSyncFeed), tulis tetap ke upstream lalu hasilnya langsung
+    diterapkan ke replika agar terbaca tanpa menunggu tarikan berikutnya.
+    Sebelum sinkron penuh pertama selesai, baca diteruskan ke upstream.
+    Katalog ruang dan ping selalu ke upstream.
+    """
+
+    name = "replica"
+
+    def __init__(self, upstream: UpstreamBackend, local: SqliteReplica) -> None:
+        if not isinstance(upstream, UpstreamBackend):
+            raise TypeError(f"Backend {upstream.name} tidak bisa menjadi upstream replika")
+        self.upstream = upstream
+        self.local = local
+
+    def _reader(self) -> BookingBackend:
+        return self.local if self.local.ready else self.upstream
+
+    def ping(self) -> None:
+        self.upstream.ping()
+
+    def select_range(self, start: date, end: date) -> list[dict]:
+        return self._reader().select_range(start, end)
+
+    def select_room_day(self, room: str, day: date) -> list[dict]:
+        return self._reader().select_room_day(room, day)
+
+    def select_rollups(self, start: date, end: date) -> list[dict]:
+        return self._reader().select_rollups(start, end)
+
+    def select_rooms(self) -> list[dict]:
+        return self.upstream.select_rooms()
+
+    def select_page(self, columns, filters, sort_col, desc, cursor, limit):
+        return self._reader().select_page(columns, filters, sort_col, desc, cursor, limit)
+
+    def select_after_id(self, columns: list[str], last_id: int, limit: int) -> list[dict]:
+        return self._reader().select_after_id(columns, last_id, limit)
+
+    def utilization(self, start: date, end: date) -> dict:
+        return self._reader().utilization(start, end)
+
+    async def aread(self, op: str, *args):
+        if op == "select_rooms" or not self.local.ready:
+            return await self.upstream.aread(op, *args)
+        return await self.local.aread(op, *args)
+
+    def book_if_free(self, booking: dict) -> dict:
+        outcome = self.upstream.book_if_free(booking)
+        if outcome["status"] == "booked":
+            self.local.apply_rows([outcome["booking"]])
+        return outcome
+
+    def book_many_if_free(self, bookings: list[dict]) -> dict:
+        outcome = self.upstream.book_many_if_free(bookings)
+        self.local.apply_rows(outcome["booked"])
+        return outcome
+
+    def delete(self, ids: list[int]) -> list[dict]:
+        deleted = self.upstream.delete(ids)
+        self.local.apply_deletes([row["id"] for row in deleted])
+        return deleted
+
+    def move(self, ids: list[int], room: str | None, shift_days: int) -> dict:
+        outcome = self.upstream.move(ids, room, shift_days)
+        self.local.apply_rows([item["to"] for item in outcome["moved"]])
+        return outcome
+
+class ReplicaSyncFeed:
+    """
+    Change feed dari tarikan inkremental upstream → SqliteReplica, setiap
+    REPLICA_SYNC_SECONDS (dijalankan RealtimeListener). Baris berubah
+    ditarik per (updated_at, id), hapus dari tombstone booking_deletions;
+    yang benar-benar berubah di replika diteruskan ke hub sebagai event
+    INSERT/UPDATE/DELETE sehingga cache bersama & kalender ikut diperbarui.
+    """
+
+    def __init__(self, upstream: UpstreamBackend, local: SqliteReplica, interval: float = REPLICA_SYNC_SECONDS) -> None:
+        if not isinstance(upstream, UpstreamBackend):
+            raise TypeError(f"Backend {upstream.name} tidak bisa menjadi upstream replika")
+        self.upstream = upstream
+        self.local = local
+        self.interval = interval
+        self.last_error: str | None = None
+
+    def _pull(self, source: str, select, apply) -> Tuple[str, int] | None:
+        """Tarik semua baris setelah cursor tersimpan; kembalikan cursor aman yang baru."""
+        column = "updated_at" if source == "bookings" else "deleted_at"
+        after = cursor = self.local.cursor(source)
+        horizon = datetime.now(timezone.utc) - timedelta(seconds=REPLICA_SYNC_OVERLAP_SECONDS)
+        while True:
+            rows = select(after, REPLICA_PAGE_ROWS)
+            if rows:
+                apply(rows)
+                after = (rows[-1][column], rows[-1]["id"])
+                settled = [
+                    row for row in rows
+                    if datetime.fromisoformat(row[column].replace("Z", "+00:00")) <= horizon
+                ]
+                if settled:
+                    cursor = (settled[-1][column], settled[-1]["id"])
+            if len(rows) < REPLICA_PAGE_ROWS:
+                return cursor
+
+    def pull(self, hub: BookingChangeHub) -> None:
+        """Satu putaran sinkron; sinkron penuh bila replika baru atau tertinggal dari retensi tombstone."""
+        full = not self.local.ready or self.local.stale(timedelta(days=REPLICA_TOMBSTONE_DAYS))
+        if full:
+            self.local.reset()
+
+        def apply_rows(rows: list[dict]) -> None:
+            for old, new in self.local.apply_rows(rows):
+                if not full:
+                    hub.apply({"type": "UPDATE" if old else "INSERT", "record": new, "old_record": old})
+
+        def apply_deletes(rows: list[dict]) -> None:
+            for old in self.local.apply_deletes([row["id"] for row in rows]):
+                if not full:
+                    hub.apply({"type": "DELETE", "old_record": old})
+
+        # Tombstone diterapkan setelah bookings: id tidak dipakai ulang, jadi
+        # baris yang dihapus di antara kedua tarikan langsung ikut terhapus
+        changed = self._pull("bookings", self.upstream.select_changed, apply_rows)
+        deleted = self._pull("booking_deletions", self.upstream.select_deleted, apply_deletes)
+        self.local.save_sync({"booking_deletions": deleted, "bookings": changed})
+        if full:
+            hub.reset()
+
+    def run(self, hub: BookingChangeHub, stop: threading.Event) -> None:
+        while not stop.is_set():
+            try:
+                self.pull(hub)
+                hub.connected, self.last_error = True, None
+            except Exception as err:
+                hub.connected, self.last_error = False, str(err)
+                logging.getLogger(__name__).warning("Sinkron replika gagal: %s", err)
+            stop.wait(self.interval)
+
+class BookingRepository:
+    """
+    Satu pintu akses data booking di atas sebuah BookingBackend:
+    - baca lewat cache (BookingCache & rollup-nya); aplikasi memberikan
+      cache bersama proses, tanpa argumen dibuat cache baru;
+    - baca yang sama dalam satu rerun digabung jadi satu round trip;
+    - tulis memperbarui cache dari baris yang dikembalikan backend;
+    - setiap round trip dicatat di instrumentasi rerun.
+    """
+
+    def __init__(self, backend: BookingBackend, cache: BookingCache | None = None) -> None:
+        self.backend = backend
+        self.cache = cache if cache is not None else BookingCache()
+        self.rooms_loaded_at: float | None = None
+
+    # ── Round trip ─────────────────────────────────────────────────────────
+    def _call(self, op: str, *args):
+        t0 = perf_counter()
+        data = getattr(self.backend, op)(*args)
+        record_query(f"{self.backend.name}:{op}", (perf_counter() - t0) * 1e3, data)
+        return data
+
+    def _read(self, op: str, *args):
+        """Baca backend; panggilan identik dalam rerun yang sama memakai hasil pertama."""
+        reads = rerun_reads()
+        if reads is None:
+            return self._call(op, *args)
+        key = (op, repr(args))
+        if key not in reads:
+            reads[key] = self._call(op, *args)
+        result = reads[key]
+        if isinstance(result, BaseException):
+            raise result  # error dari prefetch, tidak diulang di rerun yang sama
+        return result
+
+    def prefetch(self, *reads: tuple | None, timeout: float = QUERY_TIMEOUT_SECONDS) -> None:
+        """
+        Jalankan beberapa baca independen (op, *args) bersamaan lewat
+        backend.aread, masing-masing dengan batas waktu `timeout`. Hasil (atau
+        error-nya) disimpan di memo rerun sehingga pemanggilan sinkron
+        berikutnya dengan argumen sama tidak query lagi; latensi = query
+        paling lambat, bukan jumlah semuanya. Tanpa rerun aktif: no-op.
+        Prefetch hanya optimasi: bila runner gagal (mis. timeout), error
+        dicatat di log dan baca sinkron berikutnya query sendiri.
+        """
+        memo = rerun_reads()
+        if memo is None:
+            return
+        todo = [read for read in reads if read and (read[0], repr(read[1:])) not in memo]
+        if not todo:
+            return
+
+        async def one(op: str, *args):
+            t0 = perf_counter()
+            try:
+                data = await asyncio.wait_for(self.backend.aread(op, *args), timeout)
+            except asyncio.TimeoutError:
+                data = TimeoutError(f"Query {op} melebihi {timeout:g} detik")
+            except Exception as err:
+                data = err
+            return (perf_counter() - t0) * 1e3, data
+
+        async def gather():
+            return await asyncio.gather(*(one(*read) for read in todo))
+
+        with stage("prefetch"):
+            try:
+                results = get_async_runner().run(gather(), timeout + 1)
+            except Exception as err:
+                logging.getLogger(__name__).warning("Prefetch gagal: %s", err)
+                return
+        for (op, *args), (elapsed_ms, data) in zip(todo, results):
+            failed = isinstance(data, BaseException)
+            record_query(f"{self.backend.name}:{op}", elapsed_ms, [] if failed else data)
+            memo[(op, repr(tuple(args)))] = data
+
+    def plan_bookings_window(self, start: date, end: date) -> tuple | None:
+        """Baca yang akan dibutuhkan bookings_window(start, end), atau None bila cache cukup."""
+        missing = self.cache.missing_days(start, end)
+        if not missing:
+            return None
+        return ("select_range", missing[0], missing[-1] + timedelta(days=1))
+
+    def plan_rollups_window(self, start: date, end: date) -> tuple | None:
+        missing = self.cache.rollups.missing_days(start, end)
+        if not missing:
+            return None
+        return ("select_rollups", missing[0], missing[-1] + timedelta(days=1))
+
+    def plan_rooms(self) -> tuple | None:
+        """("select_rooms",) bila katalog ruang (get_room_catalog) kemungkinan sudah kedaluwarsa."""
+        loaded_at = self.rooms_loaded_at
+        if loaded_at is not None and monotonic() - loaded_at < ROOM_CATALOG_TTL_SECONDS:
+            return None
+        return ("select_rooms",)
+
+    def _write(self, op: str, *args):
+        reads = rerun_reads()
+        if reads:
+            reads.clear()
+        return self._call(op, *args)
+
+    # ── Baca ───────────────────────────────────────────────────────────────
+    def bookings_window(self, start: date, end: date) -> list[dict]:
+        """
+        Pastikan semua tanggal [start, end) ada di cache, lalu kembalikan isinya.
+        Hanya tanggal yang belum/tidak lagi di-cache yang di-query, dalam satu
+        query rentang.
+        """
+        cache = self.cache
+        rows = cache.get_window(start, end)
+        if rows is not None:
+            return rows
+        with cache.fill_lock:
+            # Sesi lain mungkin sudah mengisi selama kita menunggu lock
+            missing = cache.missing_days(start, end)
+            if missing:
+                fill_start, fill_end = missing[0], missing[-1] + timedelta(days=1)
+                cache.put_days(fill_start, fill_end, self._read("select_range", fill_start, fill_end))
+            rows = cache.get_window(start, end)
+            if rows is None:
+                # Rentang lebih besar dari kapasitas cache: baca langsung tanpa menyimpan
+                rows = [BookingRecord.from_row(row) for row in self._read("select_range", start, end)]
+            return rows
+
+    def room_day_index(self, room: str, day: date) -> RoomDayIndex:
+        """Indeks interval satu ruang pada satu tanggal (dari cache atau satu query)."""
+        index = self.cache.get_index(room, day)
+        if index is None:
+            index = self.cache.put_room_day(room, day, self._read("select_room_day", room, day))
+        return index
+
+    def find_conflict(
+        self, room: str, day: date, start: time, end: time, exclude_id: int | None = None
+    ) -> Tuple[time, time, dict] | None:
+        """Booking pertama di ruang & tanggal itu yang overlap [start, end)."""
+        return self.room_day_index(room, day).find_overlap(start, end, exclude_id=exclude_id)
+
+    def rollups_window(self, start: date, end: date) -> list[dict]:
+        """Rollup harian semua ruang dalam [start, end); hanya tanggal yang belum di-cache yang di-query."""
+        rollups = self.cache.rollups
+        rows = rollups.get_window(start, end)
+        if rows is not None:
+            return rows
+        with rollups.fill_lock:
+            missing = rollups.missing_days(start, end)
+            if missing:
+                fill_start, fill_end = missing[0], missing[-1] + timedelta(days=1)
+                rollups.put_days(fill_start, fill_end, self._read("select_rollups", fill_start, fill_end))
+            return rollups.get_window(start, end) or []
+
+    def rooms(self) -> list[dict]:
+        rows = self._read("select_rooms")
+        self.rooms_loaded_at = monotonic()
+        return rows
+
+    def page(self, columns, filters, sort_col, desc, cursor, limit) -> Tuple[list[dict], int | None]:
+        return self._read("select_page", columns, filters, sort_col, desc, cursor, limit)
+
+    def iter_all(self, columns: list[str], page_rows: int) -> Iterator[list[dict]]:
+        """Seluruh booking per halaman dengan keyset pagination (id > id terakhir)."""
+        last_id = 0
+        while True:
+            page = self._call("select_after_id", columns, last_id, page_rows)
+            if not page:
+                return
+            yield page
+            if len(page) < page_rows:
+                return
+            last_id = page[-1]["id"]
+
+    def utilization(self, start: date, end: date) -> dict:
+        return self._read("utilization", start, end)
+
+    # ── Tulis ──────────────────────────────────────────────────────────────
+    def book_if_free(self, booking: dict) -> dict:
+        """
+        Cek bentrok + insert atomik di backend. Hasil terstruktur:
+        {"status": "booked", "booking": {...}}, {"status": "conflict", "conflict": {...}}
+        atau {"status": "invalid", "message": "..."}.
+        """
+        outcome = self._write("book_if_free", booking)
+        if outcome["status"] == "booked":
+            self.cache.apply_insert(outcome["booking"])
+        elif outcome["status"] == "conflict":
+            # Cache lokal belum tahu booking yang bentrok
+            self.cache.invalidate(booking["ruang_meeting"], date.fromisoformat(booking["tanggal_booking"]))
+        return outcome
+
+    def book_many_if_free(self, bookings: list[dict]) -> dict:
+        """
+        Cek bentrok + bulk insert: {"booked": [...], "conflicts": [{"booking",
+        "conflict"}], "invalid": [{"booking", "message"}]}.
+        """
+        outcome = self._write("book_many_if_free", bookings)
+        for row in outcome["booked"]:
+            self.cache.apply_insert(row)
+        for item in outcome["conflicts"]:
+            self.cache.invalidate(
+                item["booking"]["ruang_meeting"], date.fromisoformat(item["booking"]["tanggal_booking"])
+            )
+        return outcome
+
+    def delete(self, ids: list[int]) -> list[dict]:
+        """Hapus banyak booking sekaligus; cache diperbarui dari baris terhapus."""
+        deleted = self._write("delete", ids)
+        for row in deleted:
+            self.cache.apply_delete(
+                row["ruang_meeting"], date.fromisoformat(row["tanggal_booking"]), row["id"]
+            )
+        return deleted
+
+    def move(self, ids: list[int], room: str | None, shift_days: int) -> dict:
+        """Pindah ruang / geser tanggal (sql/004): {"moved": [...], "conflicts": [...]}."""
+        outcome = self._write("move", ids, room, shift_days)
+        for item in outcome["moved"]:
+            old = item["from"]
+            self.cache.apply_delete(
+                old["ruang_meeting"], date.fromisoformat(old["tanggal_booking"]), old["id"]
+            )
+            self.cache.apply_insert(item["to"])
+        return outcome
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 5. ANTREAN TULIS BOOKING (TAHAN GANGGUAN)
+# ──────────────────────────────────────────────────────────────────────────────
+WRITE_QUEUE_RETRY_BASE_SECONDS = 2
+WRITE_QUEUE_RETRY_MAX_SECONDS = 300
+WRITE_QUEUE_MAX_ATTEMPTS = 20
+WRITE_QUEUE_DONE = ("booked", "conflict", "invalid", "failed")
+
+WRITE_QUEUE_SCHEMA = """
+create table if not exists pending_writes (
+    key         text primary key,   -- idempotency key (sql/009)
+    payload     text not null,      -- booking (JSON)
+    status      text not null,      -- pending | sending | booked | conflict | invalid | failed
+    attempts    integer not null default 0,
+    next_try_at real not null,      -- epoch detik
+    last_error  text,
+    result      text,               -- hasil book_if_free (JSON)
+    created_at  real not null
+);
+create index if not exists pending_writes_due_idx on pending_writes (status, next_try_at);
+"""
+
+# Kode error PostgREST/Postgres yang bersifat sementara: koneksi ke database
+# (PGRST000-003, kelas 08), sumber daya/shutdown (53, 57), serialisasi/deadlock
+WRITE_QUEUE_TRANSIENT_CODES = ("PGRST000", "PGRST001", "PGRST002", "PGRST003", "40001", "40P01")
+WRITE_QUEUE_TRANSIENT_CLASSES = ("08", "53", "57")
+
+def is_transient_write_error(err: Exception) -> bool:
+    """
+    True bila kiriman layak diulang: gangguan jaringan, timeout, HTTP 5xx/429,
+    atau error Postgres sementara. Error permanen (4xx, constraint, validasi,
+    payload tidak valid) tidak akan berhasil walau diulang.
+    """
+    if isinstance(err, APIError):
+        if isinstance(err.code, int):
+            # Body bukan JSON (mis. gateway): code berisi status HTTP
+            return err.code >= 500 or err.code == 429
+        code = str(err.code or "")
+        return code in WRITE_QUEUE_TRANSIENT_CODES or code[:2] in WRITE_QUEUE_TRANSIENT_CLASSES
+    if isinstance(err, httpx.HTTPStatusError):
+        status = err.response.status_code
+        return status >= 500 or status == 429
+    if isinstance(err, sqlite3.OperationalError):
+        return True  # mis. database is locked
+    return isinstance(err, (httpx.TransportError, TimeoutError, ConnectionError, OSError))
+
+class WriteQueue:
+    """
+    Antrean tulis booking di SQLite lokal, tetap ada walau proses restart.
+    Setiap booking membawa idempotency key yang sama di setiap percobaan
+    (sql/009) sehingga retry tidak pernah menghasilkan booking ganda.
+
+    Percobaan pertama dikirim langsung oleh sesi yang submit (submit),
+    sehingga booking dari banyak sesi tidak antre di belakang satu worker.
+    Satu worker per proses mengirim ulang sisanya berurutan dengan backoff
+    eksponensial + jitter. Bila satu kiriman gagal karena gangguan upstream
+    (is_transient_write_error), seluruh antrean (termasuk submit baru)
+    menunggu backoff itu, sehingga gangguan Supabase tidak berubah menjadi
+    badai retry. Error permanen langsung menandai entri itu `failed` tanpa
+    menahan entri lain.
+    """
+
+    def __init__(self, repo: BookingRepository, path: str) -> None:
+        self.repo = repo
+        self.path = path
+        self._wake = threading.Event()
+        self._changed = threading.Condition()
+        self._thread: threading.Thread | None = None
+        self._resume_at = 0.0
+        self._stopping = False
+        with self._connect() as conn:
+            conn.executescript(WRITE_QUEUE_SCHEMA)
+            # Kiriman yang terputus saat proses mati dicoba lagi
+            conn.execute("update pending_writes set status = 'pending' where status = 'sending'")
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def key_for(nonce: str, booking: dict) -> str:
+        """Key deterministik: submit ulang isi form yang sama memakai key yang sama."""
+        return str(uuid.uuid5(uuid.UUID(nonce), json.dumps(booking, sort_keys=True)))
+
+    def enqueue(self, key: str, booking: dict) -> None:
+        """Masukkan booking ke antrean (lihat _store) lalu bangunkan worker."""
+        self._store(key, booking)
+        self._wake.set()
+
+    def submit(self, key: str, booking: dict, timeout: float) -> dict | None:
+        """
+        Simpan booking di antrean lalu kirim langsung dari thread pemanggil,
+        kecuali upstream sedang dalam backoff. Gagal sementara (atau entri
+        sedang dikirim thread lain): diserahkan ke worker dan ditunggu sampai
+        `timeout`. Mengembalikan entri terakhir seperti wait().
+        """
+        self._store(key, booking)
+        if datetime.now().timestamp() >= self._resume_at:
+            self._send_safely(key)
+        self._wake.set()
+        return self.wait(key, timeout)
+
+    def _store(self, key: str, booking: dict) -> None:
+        """
+        Tulis entri pending. Key yang sudah selesai dengan conflict/invalid/
+        failed dipasang ulang (belum ada baris di server); key yang masih
+        antre atau sudah booked dibiarkan.
+        """
+        now = datetime.now().timestamp()
+        with self._connect() as conn:
+            conn.execute(
+                """
+                insert into pending_writes (key, payload, status, next_try_at, created_at)
+                values (?, ?, 'pending', ?, ?)
+                on conflict (key) do update
+                   set status = 'pending', attempts = 0, next_try_at = excluded.next_try_at,
+                       last_error = null, result = null
+                 where pending_writes.status in ('conflict', 'invalid', 'failed')
+                """,
+                (key, json.dumps(booking), now, now),
+            )
+
+    @staticmethod
+    def _entry(row) -> dict | None:
+        if row is None:
+            return None
+        entry = dict(row)
+        entry["payload"] = json.loads(entry["payload"])
+        entry["result"] = json.loads(entry["result"]) if entry["result"] else None
+        return entry
+
+    def get(self, key: str) -> dict | None:
+        with self._connect() as conn:
+            return self._entry(conn.execute("select * from pending_writes where key = ?", (key,)).fetchone())
+
+    def wait(self, key: str, timeout: float) -> dict | None:
+        """Tunggu sampai key selesai (status akhir) atau timeout; kembalikan entri terakhir."""
+        deadline = monotonic() + timeout
+        with self._changed:
+            while True:
+                entry = self.get(key)
+                remaining = deadline - monotonic()
+                if entry is None or entry["status"] in WRITE_QUEUE_DONE or remaining <= 0:
+                    return entry
+                self._changed.wait(remaining)
+
+    def pending_count(self) -> int:
+        with self._connect() as conn:
+            return conn.execute(
+                "select count(*) from pending_writes where status in ('pending', 'sending')"
+            ).fetchone()[0]
+
+    # ── Worker ─────────────────────────────────────────────────────────────
+    def start(self) -> "WriteQueue":
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="booking-write-queue", daemon=True)
+            self._stopping = False
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Hentikan worker (antrean tetap di file, dilanjutkan saat start berikutnya)."""
+        self._stopping = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stopping:
+            try:
+                self._run_once()
+            except Exception:
+                # Worker tunggal proses ini: error tak terduga (mis. file antrean
+                # terkunci/rusak) dicatat lalu dicoba lagi, bukan mematikan thread
+                logging.getLogger(__name__).exception("Worker antrean tulis error")
+                self._wake.wait(WRITE_QUEUE_RETRY_BASE_SECONDS)
+
+    def _run_once(self) -> None:
+        self._wake.clear()
+        now = datetime.now().timestamp()
+        if now < self._resume_at:
+            # Upstream baru saja gagal: seluruh antrean ikut menunggu backoff
+            self._wake.wait(self._resume_at - now)
+            return
+        with self._connect() as conn:
+            due = [
+                row["key"]
+                for row in conn.execute(
+                    """
+                    select key from pending_writes
+                     where status = 'pending' and next_try_at <= ?
+                     order by created_at limit 50
+                    """,
+                    (now,),
+                )
+            ]
+            upcoming = conn.execute(
+                "select min(next_try_at) from pending_writes where status = 'pending' and next_try_at > ?",
+                (now,),
+            ).fetchone()[0]
+        for key in due:
+            if self._stopping or not self._send_safely(key):
+                break  # gangguan upstream: sisa batch menunggu _resume_at
+        if due:
+            return
+        timeout = None if upcoming is None else max(0.0, upcoming - now)
+        self._wake.wait(timeout)
+
+    def _send_safely(self, key: str) -> bool:
+        """_send; error tak terduga (di luar kiriman itu sendiri) menjadwalkan ulang entri."""
+        try:
+            return self._send(key)
+        except Exception as err:
+            logging.getLogger(__name__).exception("Booking antrean %s gagal diproses", key)
+            self._retry_later(key, err)
+            return True
+
+    def _claim(self, key: str) -> dict | None:
+        """Tandai entri pending sebagai `sending` secara atomik; None bila sudah diambil/selesai."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "update pending_writes set status = 'sending' where key = ? and status = 'pending' returning *",
+                (key,),
+            ).fetchone()
+        return self._entry(row)
+
+    def _retry_later(self, key: str, err: Exception) -> None:
+        """Kembalikan entri ke pending dengan jeda backoff (gagal permanen setelah batas percobaan)."""
+        entry = self.get(key)
+        if entry is None or entry["status"] in WRITE_QUEUE_DONE:
+            return
+        attempts = entry["attempts"] + 1
+        if attempts >= WRITE_QUEUE_MAX_ATTEMPTS:
+            self._update(key, status="failed", attempts=attempts, last_error=str(err))
+            return
+        delay = min(WRITE_QUEUE_RETRY_MAX_SECONDS, WRITE_QUEUE_RETRY_BASE_SECONDS * 2 ** (attempts - 1))
+        self._update(
+            key,
+            status="pending",
+            attempts=attempts,
+            last_error=str(err),
+            next_try_at=datetime.now().timestamp() + delay,
+        )
+
+    def _send(self, key: str) -> bool:
+        """Kirim satu entri; False bila gagal karena gangguan upstream (dijadwalkan ulang)."""
+        entry = self._claim(key)
+        if entry is None:
+            return True
+        with self._changed:
+            self._changed.notify_all()
+        try:
+            outcome = self.repo.book_if_free({**entry["payload"], "idempotency_key": key})
+        except Exception as err:
+            attempts = entry["attempts"] + 1
+            if not is_transient_write_error(err):
+                logging.getLogger(__name__).warning("Booking antrean %s ditolak: %s", key, err)
+                self._update(key, status="failed", attempts=attempts, last_error=str(err))
+                return True
+            if attempts >= WRITE_QUEUE_MAX_ATTEMPTS:
+                self._update(key, status="failed", attempts=attempts, last_error=str(err))
+            else:
+                delay = min(WRITE_QUEUE_RETRY_MAX_SECONDS, WRITE_QUEUE_RETRY_BASE_SECONDS * 2 ** (attempts - 1))
+                self._resume_at = datetime.now().timestamp() + delay * random.uniform(0.5, 1.0)
+                self._update(
+                    key, status="pending", attempts=attempts, last_error=str(err), next_try_at=self._resume_at
+                )
+            return False
+        self._update(key, status=outcome["status"], attempts=entry["attempts"] + 1, result=json.dumps(outcome))
+        return True
+
+    def _update(self, key: str, **values) -> None:
+        columns = ", ".join(f"{col} = ?" for col in values)
+        with self._connect() as conn:
+            conn.execute(f"update pending_writes set {columns} where key = ?", [*values.values(), key])
+        with self._changed:
+            self._changed.notify_all()
@@ -10,13 +10,57 @@ admin panel, dan validasi lengkap.
 
 import streamlit as st
 import pandas as pd
-from datetime import datetime, date, time
+from datetime import datetime, date, time, timedelta
 import re
 from supabase import create_client, Client
 import bcrypt
-from typing import Tuple
+from typing import BinaryIO, Iterator, Tuple
 import os
 import uuid
+import threading
+import csv
+import io
+import html
+import tempfile
+from collections import OrderedDict
+from dataclasses import dataclass
+from time import monotonic
+import json
+import logging
+import base64
+import hashlib
+import hmac
+import secrets
+import math
+import streamlit.components.v1 as components
+# Lapisan data (cache, backend, repository, antrean tulis); instance bersama
+# per proses dibuat di bawah lewat st.cache_resource
+from booking_data import (
+    CLOCK,
+    ROOM_CATALOG_TTL_SECONDS,
+    WRITE_QUEUE_DONE,
+    BookingCache,
+    BookingChangeHub,
+    BookingRecord,
+    BookingRepository,
+    MetricsStore,
+    RealtimeListener,
+    ReplicaBackend,
+    ReplicaSyncFeed,
+    RoomDayIndex,
+    SqliteBackend,
+    SqliteReplica,
+    SupabaseBackend,
+    SupabaseRealtimeFeed,
+    WriteQueue,
+    parse_time,
+    record_payload,
+    rerun_warnings,
+    slot_mask,
+    stage,
+    time_minutes,
+    track_rerun,
+)
 
 # ──────────────────────────────────────────────────────────────────────────────
 # 1. KONFIGURASI HALAMAN & CSS
@@ -51,6 +95,17 @@ def load_css() -> None:
         .fc-button        {background:#4ECDC4;border-color:#4ECDC4;}
         .fc-button:hover  {background:#45B7AA;border-color:#45B7AA;}
         .fc-today         {background:#FFF3CD !important;}
+
+        /* Grid ketersediaan ruang */
+        .room-grid {display:grid;gap:1px;background:#e0e0e0;border:1px solid #e0e0e0;
+                    border-radius:8px;overflow-x:auto;font-size:12px;}
+        .rg-head   {background:#f8f8f8;color:#666;padding:2px 4px;text-align:left;}
+        .rg-floor  {grid-column:1/-1;background:#f0f0f0;font-weight:600;padding:4px 8px;}
+        .rg-room   {background:#fff;padding:4px 8px;white-space:nowrap;}
+        .rg-cell   {min-height:24px;}
+        .rg-free   {background:#d4f5e2;}
+        .rg-busy   {background:#FF6B6B;}
+        .rg-closed {background:#f4f4f4;}
         </style>
         """,
         unsafe_allow_html=True,
@@ -58,12 +113,77 @@ def load_css() -> None:
 
 load_css()
 
+# ──────────────────────────────────────────────────────────────────────────────
+# 1.1 INSTRUMENTASI (TIMER PER RERUN)
+# ──────────────────────────────────────────────────────────────────────────────
+@st.cache_resource(show_spinner=False)
+def get_metrics_store() -> MetricsStore:
+    return MetricsStore()
+
+def warn_once(message: str) -> None:
+    """st.warning yang hanya tampil sekali per rerun walau dipanggil berulang."""
+    shown = rerun_warnings()
+    if shown is not None:
+        if message in shown:
+            return
+        shown.add(message)
+    st.warning(message)
+
 # ──────────────────────────────────────────────────────────────────────────────
 # 2. INISIALISASI SUPABASE
 # ──────────────────────────────────────────────────────────────────────────────
+SUPABASE_HEALTH_TTL_SECONDS = 300
+
+class SupabaseHealth:
+    """
+    Hasil pengecekan koneksi Supabase. Pengecekan berjalan di thread
+    background sehingga halaman tidak menunggu round trip pertama;
+    hasilnya dipakai ulang sampai SUPABASE_HEALTH_TTL_SECONDS.
+    """
+
+    def __init__(self) -> None:
+        self.status = "pending"  # pending | ok | error
+        self.message = ""
+        self.checked_at: float | None = None
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+    def start(self, supabase: Client) -> None:
+        """Jalankan pengecekan bila belum berjalan dan hasil lama sudah kedaluwarsa."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            if (
+                self.checked_at is not None
+                and monotonic() - self.checked_at < SUPABASE_HEALTH_TTL_SECONDS
+            ):
+                return
+            self._thread = threading.Thread(
+                target=self._probe, args=(supabase,), name="supabase-health", daemon=True
+            )
+            self._thread.start()
+
+    def wait(self, timeout: float | None = None) -> str:
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+        return self.status
+
+    def _probe(self, supabase: Client) -> None:
+        try:
+            supabase.table("bookings").select("id").limit(1).execute()  # quick test
+            self.status, self.message = "ok", ""
+        except Exception as err:
+            self.status, self.message = "error", str(err)
+        self.checked_at = monotonic()
+
 @st.cache_resource(show_spinner=False)
-def init_supabase() -> Client | None:
-    """Membuat koneksi Supabase dan melakukan pengecekan."""
+def get_supabase_health() -> SupabaseHealth:
+    return SupabaseHealth()
+
+@st.cache_resource(show_spinner=False)
+def _create_supabase() -> Client | None:
+    """Membuat client Supabase dari secrets (tanpa round trip jaringan)."""
     try:
         if "supabase" not in st.secrets:
             st.error("⚠️ Konfigurasi Supabase tidak ditemukan dalam secrets")
@@ -78,16 +198,217 @@ def init_supabase() -> Client | None:
             st.error("⚠️ API Key Supabase tidak valid")
             return None
 
-        supabase: Client = create_client(url, key)
-        supabase.table("bookings").select("id").limit(1).execute()  # quick test
-        return supabase
+        return create_client(url, key)
     except Exception as err:
         st.error(f"⚠️ Gagal terhubung ke Supabase: {err}")
         return None
 
+@stage("init_supabase")
+def init_supabase() -> Client | None:
+    """
+    Client Supabase yang dibuat saat pertama dibutuhkan. Pengecekan koneksi
+    dijalankan di background (lihat SupabaseHealth), tidak memblokir render.
+    """
+    supabase = _create_supabase()
+    if supabase is not None:
+        get_supabase_health().start(supabase)
+    return supabase
+
+def show_connection_status() -> None:
+    """Peringatan bila health check background terakhir gagal."""
+    health = get_supabase_health()
+    if health.status == "error":
+        st.warning(f"⚠️ Gagal terhubung ke Supabase: {health.message}")
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 2.1 CACHE BOOKING (DIBAGI SEMUA SESI)
+# ──────────────────────────────────────────────────────────────────────────────
+@st.cache_resource(show_spinner=False)
+def get_booking_cache() -> BookingCache:
+    """Satu instance BookingCache untuk seluruh sesi dalam proses server."""
+    return BookingCache()
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 2.2 REALTIME – PUSH PERUBAHAN BOOKING
+# ──────────────────────────────────────────────────────────────────────────────
+REALTIME_CHECK_SECONDS = 3
+
+@st.cache_resource(show_spinner=False)
+def get_change_hub() -> BookingChangeHub:
+    return BookingChangeHub(get_booking_cache())
+
+def realtime_enabled() -> bool:
+    """Mode langganan aktif bila secrets [supabase] berisi realtime = true."""
+    try:
+        return bool(st.secrets["supabase"].get("realtime", False))
+    except Exception:
+        return False
+
+@st.cache_resource(show_spinner=False)
+def start_realtime_listener() -> RealtimeListener:
+    """Listener Supabase Realtime tunggal untuk seluruh sesi dalam proses."""
+    feed = SupabaseRealtimeFeed(st.secrets["supabase"]["url"], st.secrets["supabase"]["key"])
+    return RealtimeListener(get_change_hub(), feed).start()
+
+@st.fragment(run_every=REALTIME_CHECK_SECONDS)
+def watch_booking_changes() -> None:
+    """Rerun halaman bila hub punya versi baru; hanya cek memori, tanpa query."""
+    version = get_change_hub().version
+    seen = st.session_state.setdefault("seen_change_version", version)
+    if version != seen:
+        st.session_state.seen_change_version = version
+        st.rerun(scope="app")
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 2.3 KATALOG RUANG
+# ──────────────────────────────────────────────────────────────────────────────
+BUSINESS_START = time(8, 0)   # jam buka default ruang
+BUSINESS_END = time(18, 0)    # jam tutup default ruang
+DEFAULT_ROOM_COLOR = "#4ECDC4"
+
+@dataclass(frozen=True)
+class Room:
+    nama: str
+    floor: str
+    color: str = DEFAULT_ROOM_COLOR
+    capacity: int | None = None
+    jam_buka: time = BUSINESS_START
+    jam_tutup: time = BUSINESS_END
+
+# Dipakai bila tabel rooms belum ada / gagal dimuat
+DEFAULT_ROOMS = [
+    Room("Breakout Traction", "19", "#FF6B6B"),
+    Room("Cozy 19.2", "19", "#4ECDC4"),
+]
+
+class RoomCatalog:
+    """Metadata ruang (sql/006_rooms.sql) dengan lookup per nama yang sudah jadi."""
+
+    def __init__(self, rooms: list[Room]) -> None:
+        self.rooms = sorted(rooms, key=lambda r: (r.floor, r.nama))
+        self.names = [r.nama for r in self.rooms]
+        self.by_name = {r.nama: r for r in self.rooms}
+        self.colors = {r.nama: r.color for r in self.rooms}
+        # Kelas CSS per ruang untuk filter kalender di sisi browser
+        self.css_classes = {r.nama: f"room-{i}" for i, r in enumerate(self.rooms)}
+        self.floors = sorted({r.floor for r in self.rooms})
+        # Rentang jam kalender = jam buka paling awal s/d tutup paling akhir
+        self.day_start = min((r.jam_buka for r in self.rooms), default=BUSINESS_START)
+        self.day_end = max((r.jam_tutup for r in self.rooms), default=BUSINESS_END)
+
+    def label(self, name: str) -> str:
+        room = self.by_name.get(name)
+        if room is None:
+            return name
+        capacity = f", {room.capacity} org" if room.capacity else ""
+        return f"{room.nama} (Lt. {room.floor}{capacity})"
+
+@st.cache_resource(ttl=ROOM_CATALOG_TTL_SECONDS, show_spinner=False)
+def _load_room_catalog(_repo: "BookingRepository") -> RoomCatalog:
+    """Katalog ruang aktif, dimuat sekali per TTL; error tidak di-cache."""
+    rooms = [
+        Room(
+            nama=row["nama"],
+            floor=str(row["floor"]),
+            color=row.get("color") or DEFAULT_ROOM_COLOR,
+            capacity=row.get("capacity"),
+            jam_buka=parse_time(row["jam_buka"]) if row.get("jam_buka") else BUSINESS_START,
+            jam_tutup=parse_time(row["jam_tutup"]) if row.get("jam_tutup") else BUSINESS_END,
+        )
+        for row in _repo.rooms()
+    ]
+    return RoomCatalog(rooms or DEFAULT_ROOMS)
+
+def get_room_catalog(repo: "BookingRepository") -> RoomCatalog:
+    """
+    Katalog ruang untuk seluruh sesi. Bila tabel rooms gagal dimuat (termasuk
+    timeout prefetch), DEFAULT_ROOMS dipakai untuk rerun ini saja dengan
+    peringatan; rerun berikutnya mencoba memuat lagi.
+    """
+    try:
+        return _load_room_catalog(repo)
+    except Exception as err:
+        logging.getLogger(__name__).warning("Katalog ruang gagal dimuat: %s", err)
+        warn_once("⚠️ Daftar ruang gagal dimuat; sementara memakai daftar ruang bawaan.")
+        return RoomCatalog(DEFAULT_ROOMS)
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 2.4 REPOSITORY BOOKING (AKSES DATA)
+# ──────────────────────────────────────────────────────────────────────────────
+REPLICA_PATH = "replica.db"
+
+@st.cache_resource(show_spinner=False)
+def _supabase_repository(_supabase: Client) -> BookingRepository:
+    config = st.secrets["supabase"]
+    return BookingRepository(SupabaseBackend(_supabase, config["url"], config["key"]))
+
+@st.cache_resource(show_spinner=False)
+def _sqlite_repository(path: str) -> BookingRepository:
+    return BookingRepository(SqliteBackend(path))
+
+@st.cache_resource(show_spinner=False)
+def _replica_repository(_supabase: Client, path: str) -> BookingRepository:
+    """Repository replika baca + satu listener sinkron untuk seluruh sesi dalam proses."""
+    config = st.secrets["supabase"]
+    upstream = SupabaseBackend(_supabase, config["url"], config["key"])
+    local = SqliteReplica(path)
+    RealtimeListener(get_change_hub(), ReplicaSyncFeed(upstream, local)).start()
+    return BookingRepository(ReplicaBackend(upstream, local))
+
+def replica_enabled() -> bool:
+    """Mode replika baca aktif bila secrets [database] berisi replica = true."""
+    try:
+        return bool(st.secrets["database"].get("replica", False))
+    except Exception:
+        return False
+
+def init_repository() -> BookingRepository | None:
+    """
+    Repository sesuai secrets: [database] backend = "sqlite" (path = ...)
+    memakai SQLite lokal, selain itu Supabase dari init_supabase();
+    [database] replica = true (replica_path = ...) melayani baca dari
+    replika SQLite yang disinkron di background.
+    """
+    try:
+        config = dict(st.secrets.get("database", {}))
+    except Exception:
+        config = {}
+    if config.get("backend") == "sqlite":
+        return _sqlite_repository(config.get("path", "bookings.db"))
+    supabase = init_supabase()
+    if supabase is None:
+        return None
+    if config.get("replica"):
+        return _replica_repository(supabase, config.get("replica_path", REPLICA_PATH))
+    return _supabase_repository(supabase)
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 2.5 ANTREAN TULIS BOOKING (TAHAN GANGGUAN)
+# ──────────────────────────────────────────────────────────────────────────────
+WRITE_QUEUE_PATH = "write_queue.db"
+WRITE_QUEUE_SUBMIT_WAIT_SECONDS = 5   # lama form menunggu bila kiriman pertama gagal sementara
+WRITE_QUEUE_CHECK_SECONDS = 3
+
+@st.cache_resource(show_spinner=False)
+def _write_queue(_repo: BookingRepository, path: str) -> WriteQueue:
+    return WriteQueue(_repo, path).start()
+
+def init_write_queue(repo: BookingRepository) -> WriteQueue:
+    """
+    Antrean tulis proses ini; lokasi file dari secrets [write_queue] path.
+    start() menghidupkan ulang worker bila thread-nya sudah mati.
+    """
+    try:
+        path = st.secrets.get("write_queue", {}).get("path", WRITE_QUEUE_PATH)
+    except Exception:
+        path = WRITE_QUEUE_PATH
+    return _write_queue(repo, path).start()
+
 # ──────────────────────────────────────────────────────────────────────────────
 # 3. VALIDASI INPUT
 # ──────────────────────────────────────────────────────────────────────────────
+MIN_FREE_SLOT_MINUTES = 30
+
 def validate_name(name: str) -> Tuple[bool, str]:
     if not name or len(name.strip()) < 2:
         return False, "Nama harus diisi minimal 2 karakter"
@@ -100,45 +421,387 @@ def validate_time_range(start_time: time, end_time: time) -> Tuple[bool, str]:
         return False, "Waktu selesai harus lebih besar dari waktu mulai"
     return True, ""
 
+@stage("cek_bentrok")
 def validate_booking_conflict(
-    supabase: Client,
+    repo: BookingRepository,
     booking_date: date,
     start_time: time,
     end_time: time,
     room: str,
     booking_id: int | None = None,
 ) -> Tuple[bool, str]:
-    """Cek bentrok jadwal di database."""
+    """Cek bentrok jadwal di database (melalui cache booking bersama)."""
     try:
-        query = (
-            supabase.table("bookings")
-            .select("*")
-            .eq("tanggal_booking", str(booking_date))
-            .eq("ruang_meeting", room)
-        )
-        if booking_id:
-            query = query.neq("id", booking_id)
-
-        result = query.execute()
-        for booking in result.data:
-            existing_start = datetime.strptime(booking["waktu_mulai"], "%H:%M:%S").time()
-            existing_end = datetime.strptime(booking["waktu_selesai"], "%H:%M:%S").time()
-            if start_time < existing_end and end_time > existing_start:
-                return (
-                    False,
-                    f"Konflik dengan {booking['nama']} ({existing_start}-{existing_end})",
-                )
+        conflict = repo.find_conflict(room, booking_date, start_time, end_time, booking_id or None)
+        if conflict:
+            existing_start, existing_end, booking = conflict
+            return (
+                False,
+                f"Konflik dengan {booking['nama']} ({existing_start}-{existing_end})",
+            )
         return True, ""
     except Exception:
         return False, "Error saat memeriksa konflik jadwal"
 
+def find_free_slots(
+    repo: BookingRepository,
+    rooms: list[str],
+    start: date,
+    end: date,
+    min_minutes: int = MIN_FREE_SLOT_MINUTES,
+) -> dict[str, dict[date, list[Tuple[time, time]]]]:
+    """
+    Slot kosong per ruang per tanggal dalam [start, end), dibatasi jam buka
+    ruang di katalog. Satu query rentang (lewat cache) lalu gabung interval
+    per ruang.
+    """
+    repo.bookings_window(start, end)
+    catalog = get_room_catalog(repo)
+    slots: dict[str, dict[date, list[Tuple[time, time]]]] = {}
+    for room in rooms:
+        meta = catalog.by_name.get(room) or Room(room, "")
+        per_day = slots.setdefault(room, {})
+        for i in range((end - start).days):
+            day = start + timedelta(days=i)
+            index = repo.room_day_index(room, day)
+            per_day[day] = [
+                (a, b)
+                for a, b in index.free_intervals(meta.jam_buka, meta.jam_tutup)
+                if time_minutes(b) - time_minutes(a) >= min_minutes
+            ]
+    return slots
+
+def format_slots(slots: list[Tuple[time, time]]) -> str:
+    if not slots:
+        return "penuh"
+    return ", ".join(f"{a:%H:%M}–{b:%H:%M}" for a, b in slots)
+
+RECURRENCE_FREQS = {"Tidak berulang": None, "Harian": "DAILY", "Mingguan": "WEEKLY"}
+WEEKDAY_NAMES = ["Senin", "Selasa", "Rabu", "Kamis", "Jumat", "Sabtu", "Minggu"]
+MAX_OCCURRENCES = 200
+
+def expand_recurrence(
+    first: date,
+    until: date,
+    freq: str,
+    interval: int = 1,
+    weekdays: list[int] | None = None,
+) -> list[date]:
+    """
+    Tanggal-tanggal occurrence ala RRULE (FREQ=DAILY|WEEKLY, INTERVAL, BYDAY,
+    UNTIL) mulai dari `first` sampai `until` (inklusif).
+    WEEKLY tanpa weekdays berulang di hari yang sama dengan `first`.
+    Berhenti di MAX_OCCURRENCES + 1 tanggal: hasil lebih panjang dari
+    MAX_OCCURRENCES berarti seri terpotong dan harus ditolak pemanggil.
+    """
+    if freq == "WEEKLY" and not weekdays:
+        weekdays = [first.weekday()]
+    week_start = first - timedelta(days=first.weekday())
+    dates = []
+    day = first
+    while day <= until and len(dates) <= MAX_OCCURRENCES:
+        if freq == "DAILY":
+            step_ok = (day - first).days % interval == 0
+        else:
+            step_ok = ((day - week_start).days // 7) % interval == 0
+        if step_ok and (not weekdays or day.weekday() in weekdays):
+            dates.append(day)
+        day += timedelta(days=1)
+    return dates
+
+def book_recurring(repo: BookingRepository, booking: dict, dates: list[date]) -> dict:
+    """
+    Simpan occurrence booking berulang dalam satu panggilan `book_many_if_free`
+    (lihat sql/003_book_many_if_free.sql): cek bentrok semua occurrence dan
+    bulk insert yang bebas. Mengembalikan {"booked", "conflicts", "invalid"}.
+    """
+    occurrences = [{**booking, "tanggal_booking": str(day)} for day in dates]
+    return repo.book_many_if_free(occurrences)
+
+def conflict_message(conflict: dict | None) -> str:
+    """Pesan error dari data konflik hasil book_if_free."""
+    if not conflict:
+        return "Jadwal bentrok dengan booking lain"
+    return (
+        f"Konflik dengan {conflict['nama']} "
+        f"({conflict['waktu_mulai']}-{conflict['waktu_selesai']})"
+    )
+
 # ──────────────────────────────────────────────────────────────────────────────
 # 4. AUTHENTIKASI ADMIN
 # ──────────────────────────────────────────────────────────────────────────────
+LOGIN_FREE_ATTEMPTS = 3            # gagal berturut-turut sebelum lockout
+LOGIN_LOCKOUT_BASE_SECONDS = 5     # lockout pertama; berlipat dua tiap gagal berikutnya
+LOGIN_LOCKOUT_MAX_SECONDS = 900
+LOGIN_FORGET_SECONDS = 3600        # riwayat gagal klien yang diam selama ini dilupakan
+LOGIN_MAX_CLIENTS = 10_000
+LOGIN_BCRYPT_CONCURRENCY = 1       # bcrypt paralel maksimum per proses
+LOGIN_BUSY_WAIT_SECONDS = 2
+ADMIN_TOKEN_COOKIE = "bbt_admin"
+ADMIN_TOKEN_TTL_SECONDS = 8 * 3600
+
+class LoginThrottle:
+    """
+    Pembatas percobaan login admin per klien (IP), satu per proses. Setelah
+    LOGIN_FREE_ATTEMPTS kali gagal, klien dikunci dengan durasi eksponensial;
+    percobaan selama terkunci ditolak tanpa menjalankan bcrypt. Jumlah
+    bcrypt yang berjalan bersamaan juga dibatasi sehingga burst dari banyak
+    klien tidak menghabiskan semua core.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        # klien → (jumlah gagal, terkunci sampai, gagal terakhir) dalam detik monotonic
+        self._clients: OrderedDict[str, Tuple[int, float, float]] = OrderedDict()
+        self.bcrypt_slots = threading.BoundedSemaphore(LOGIN_BCRYPT_CONCURRENCY)
+
+    def retry_after(self, client: str) -> float:
+        """Sisa detik lockout klien (0 bila boleh mencoba)."""
+        with self._lock:
+            entry = self._clients.get(client)
+        return 0.0 if entry is None else max(0.0, entry[1] - monotonic())
+
+    def attempt(self, client: str) -> Tuple[float, float]:
+        """
+        Periksa lockout dan catat percobaan dalam satu langkah atomik, sebelum
+        bcrypt: (sisa lockout, 0) bila klien masih terkunci, selain itu
+        (0, lockout yang dimulai). Percobaan dihitung gagal sampai success()
+        dipanggil, sehingga percobaan bersamaan dari klien yang sama tidak bisa
+        lolos bersama sebelum kegagalan pertama tercatat.
+        """
+        now = monotonic()
+        with self._lock:
+            entry = self._clients.get(client)
+            if entry is not None and entry[1] > now:
+                return entry[1] - now, 0.0
+            while self._clients:
+                oldest, (_, _, last) = next(iter(self._clients.items()))
+                if now - last < LOGIN_FORGET_SECONDS and len(self._clients) < LOGIN_MAX_CLIENTS:
+                    break
+                del self._clients[oldest]
+            failures = self._clients.pop(client, (0, 0.0, now))[0] + 1
+            lockout = 0.0
+            if failures >= LOGIN_FREE_ATTEMPTS:
+                lockout = min(
+                    LOGIN_LOCKOUT_MAX_SECONDS,
+                    LOGIN_LOCKOUT_BASE_SECONDS * 2 ** (failures - LOGIN_FREE_ATTEMPTS),
+                )
+            self._clients[client] = (failures, now + lockout, now)
+        return 0.0, lockout
+
+    def success(self, client: str) -> None:
+        with self._lock:
+            self._clients.pop(client, None)
+
+@st.cache_resource(show_spinner=False)
+def get_login_throttle() -> LoginThrottle:
+    return LoginThrottle()
+
+def login_client_key() -> str:
+    """
+    IP klien untuk throttle. Bawaan ([admin] trusted_proxy_count = 0): IP
+    koneksi langsung; X-Forwarded-For diabaikan karena bisa diisi bebas
+    oleh klien. Di belakang N reverse proxy tepercaya: entri ke-N dari kanan
+    X-Forwarded-For, yaitu alamat yang dilihat proxy terluar (entri di
+    kirinya berasal dari klien). Fallback: per sesi.
+    """
+    ip = st.context.ip_address  # None bila tidak diketahui
+    proxies = int(_admin_config().get("trusted_proxy_count", 0) or 0)
+    if proxies > 0:
+        hops = [hop.strip() for hop in st.context.headers.get("X-Forwarded-For", "").split(",")]
+        hops = [hop for hop in hops if hop]
+        if len(hops) >= proxies:
+            ip = hops[-proxies]
+    if isinstance(ip, str) and ip:
+        return ip
+    return "sesi:" + st.session_state.setdefault("login_client_id", str(uuid.uuid4()))
+
+def _admin_token_key(config) -> bytes | None:
+    """
+    Kunci HMAC token sesi dari [admin] session_secret. Tanpa secret ini
+    login tidak diingat lintas tab/reload (token tidak dibuat maupun diterima).
+    """
+    secret = config.get("session_secret")
+    if not secret:
+        return None
+    return hashlib.sha256(secret.encode()).digest()
+
+def sign_admin_token(config, username: str, ttl: int = ADMIN_TOKEN_TTL_SECONDS) -> str | None:
+    """
+    Token sesi admin bertanda tangan HMAC dengan nonce acak (untuk dicabut
+    saat logout), atau None bila session_secret belum diatur.
+    """
+    key = _admin_token_key(config)
+    if key is None:
+        return None
+    expires = int(datetime.now().timestamp()) + ttl
+    payload = base64.urlsafe_b64encode(
+        f"{username}|{expires}|{secrets.token_urlsafe(12)}".encode()
+    ).decode().rstrip("=")
+    signature = hmac.new(key, payload.encode(), hashlib.sha256).hexdigest()
+    return f"{payload}.{signature}"
+
+def _admin_token_claims(config, token: str | None) -> Tuple[str, int, str] | None:
+    """(username, kedaluwarsa, nonce) dari token bertanda tangan sah, tanpa cek waktu/pencabutan."""
+    key = _admin_token_key(config)
+    if key is None or not token or "." not in token:
+        return None
+    payload, signature = token.rsplit(".", 1)
+    expected = hmac.new(key, payload.encode(), hashlib.sha256).hexdigest()
+    if not hmac.compare_digest(signature, expected):
+        return None
+    try:
+        username, expires, nonce = (
+            base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)).decode().rsplit("|", 2)
+        )
+        return username, int(expires), nonce
+    except ValueError:
+        return None
+
+def verify_admin_token(
+    config, token: str | None, revoked: "AdminTokenRevocations | None" = None
+) -> str | None:
+    """
+    Username dari token yang sah, belum kedaluwarsa, dan belum dicabut
+    (logout), selain itu None (tanpa bcrypt).
+    """
+    claims = _admin_token_claims(config, token)
+    if claims is None:
+        return None
+    username, expires, nonce = claims
+    if expires < datetime.now().timestamp() or username != config.get("username", "admin"):
+        return None
+    if revoked is not None and revoked.is_revoked(nonce):
+        return None
+    return username
+
+class AdminTokenRevocations:
+    """
+    Nonce token admin yang dicabut saat logout, disimpan sampai token itu
+    kedaluwarsa. Cookie token ditulis lewat JavaScript (lihat
+    _set_admin_cookie) sehingga bisa dibaca script di halaman; pencabutan
+    ini membuat salinan token tidak berlaku lagi setelah logout. Satu per
+    proses: bila aplikasi dijalankan di beberapa proses server, logout
+    hanya berlaku di proses yang menanganinya.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._revoked: dict[str, int] = {}   # nonce → kedaluwarsa token (epoch detik)
+
+    def revoke(self, config, token: str | None) -> None:
+        claims = _admin_token_claims(config, token)
+        if claims is None:
+            return
+        _, expires, nonce = claims
+        now = datetime.now().timestamp()
+        with self._lock:
+            for old in [n for n, until in self._revoked.items() if until < now]:
+                del self._revoked[old]
+            self._revoked[nonce] = expires
+
+    def is_revoked(self, nonce: str) -> bool:
+        with self._lock:
+            return nonce in self._revoked
+
+@st.cache_resource(show_spinner=False)
+def get_admin_token_revocations() -> AdminTokenRevocations:
+    return AdminTokenRevocations()
+
+def check_admin_login(
+    throttle: LoginThrottle, config, client: str, username: str, password: str
+) -> Tuple[str, float]:
+    """
+    Verifikasi login admin: ("ok", 0), ("invalid", lockout yang dimulai),
+    ("locked", sisa detik) tanpa bcrypt, atau ("busy", 0) bila slot bcrypt
+    penuh lebih dari LOGIN_BUSY_WAIT_SECONDS. Lockout diperiksa ulang dan
+    percobaan dicatat (LoginThrottle.attempt) setelah slot bcrypt didapat,
+    karena klien bisa terkunci selama menunggu slot.
+    """
+    wait = throttle.retry_after(client)
+    if wait > 0:
+        return "locked", wait
+    if not throttle.bcrypt_slots.acquire(timeout=LOGIN_BUSY_WAIT_SECONDS):
+        return "busy", 0.0
+    try:
+        wait, lockout = throttle.attempt(client)
+        if wait > 0:
+            return "locked", wait
+        valid = username == config.get("username", "admin") and bcrypt.checkpw(
+            password.encode(), config.get("password_hash", "").encode()
+        )
+    finally:
+        throttle.bcrypt_slots.release()
+    if not valid:
+        return "invalid", lockout
+    throttle.success(client)
+    return "ok", 0.0
+
+def _admin_config():
+    try:
+        return st.secrets.get("admin", {})
+    except Exception:
+        return {}
+
 def admin_authenticated() -> bool:
-    if "admin_authenticated" not in st.session_state:
-        st.session_state.admin_authenticated = False
-    return st.session_state.admin_authenticated
+    """
+    Status login sesi ini. Sesi baru (tab baru / reload) dianggap login bila
+    cookie berisi token sesi admin yang sah; cukup cek HMAC, tanpa bcrypt.
+    Setelah logout, cookie lama sesi ini (st.context.cookies tidak berubah
+    sampai koneksi baru) tidak dipakai lagi, dan sesi lain yang memakai
+    token yang sama ikut keluar di rerun berikutnya.
+    """
+    token = st.session_state.get("admin_token")
+    if st.session_state.get("admin_authenticated"):
+        if token and verify_admin_token(_admin_config(), token, get_admin_token_revocations()) is None:
+            # Dicabut (logout di tab lain) atau kedaluwarsa: kembali ke form login
+            st.session_state.admin_authenticated = False
+            st.session_state.admin_logged_out = True
+            st.session_state.pop("admin_token", None)
+            st.session_state.admin_cookie_clear = True
+            return False
+        return True
+    if st.session_state.get("admin_logged_out"):
+        return False
+    token = st.context.cookies.get(ADMIN_TOKEN_COOKIE)
+    valid = verify_admin_token(_admin_config(), token, get_admin_token_revocations()) is not None
+    st.session_state.admin_authenticated = valid
+    if valid:
+        st.session_state.admin_token = token
+    return valid
+
+def _set_admin_cookie(value: str, max_age: int) -> None:
+    """
+    Tulis cookie token dari browser: script Streamlit tidak bisa mengirim
+    header Set-Cookie, jadi cookie ini tidak bisa HttpOnly dan terbaca oleh
+    script di halaman. Karena itu token dicabut di server saat logout
+    (AdminTokenRevocations) selain cookie-nya dikedaluwarsakan.
+    """
+    components.html(
+        f"<script>window.parent.document.cookie = '{ADMIN_TOKEN_COOKIE}={value}; "
+        f"path=/; max-age={max_age}; SameSite=Strict; Secure';</script>",
+        height=0,
+    )
+
+def store_admin_token() -> None:
+    """
+    Sinkronkan cookie token dengan status login (sekali, setelah rerun
+    berikutnya): tulis token hasil login, atau kedaluwarsakan cookie setelah logout.
+    """
+    token = st.session_state.pop("admin_token_pending", None)
+    if token:
+        _set_admin_cookie(token, ADMIN_TOKEN_TTL_SECONDS)
+    if st.session_state.pop("admin_cookie_clear", False):
+        _set_admin_cookie("", 0)
+
+def admin_logout() -> None:
+    """Akhiri sesi admin: cabut token, hapus status login dan cookie, lalu kembali ke kalender."""
+    get_admin_token_revocations().revoke(_admin_config(), st.session_state.pop("admin_token", None))
+    st.session_state.admin_authenticated = False
+    st.session_state.admin_logged_out = True
+    st.session_state.pop("admin_token_pending", None)
+    st.session_state.admin_cookie_clear = True
+    st.session_state.page = "list"
 
 def admin_login_page() -> None:
     st.subheader("🔐 Admin Login")
@@ -159,22 +822,99 @@ def admin_login_page() -> None:
         submit = st.form_submit_button("Login")
 
         if submit:
-            cfg_admin = st.secrets.get("admin", {})
-            correct_username = cfg_admin.get("username", "admin")
-            correct_pw_hash = cfg_admin.get("password_hash", "")
-            if (
-                username == correct_username
-                and bcrypt.checkpw(password.encode(), correct_pw_hash.encode())
-            ):
+            cfg_admin = _admin_config()
+            status, seconds = check_admin_login(
+                get_login_throttle(), cfg_admin, login_client_key(), username, password
+            )
+            if status == "ok":
                 st.session_state.admin_authenticated = True
+                st.session_state.admin_logged_out = False
+                token = sign_admin_token(cfg_admin, username)
+                if token:
+                    st.session_state.admin_token = token
+                    st.session_state.admin_token_pending = token
+                else:
+                    logging.getLogger(__name__).warning(
+                        "[admin] session_secret belum diatur; login admin tidak diingat lintas tab"
+                    )
                 st.success("Login berhasil!")
                 st.rerun()
+            elif status == "locked":
+                st.error(f"Terlalu banyak percobaan login. Coba lagi dalam {math.ceil(seconds)} detik.")
+            elif status == "busy":
+                st.error("Server sedang sibuk memproses login lain. Coba lagi sebentar.")
             else:
                 st.error("Username atau password salah")
+                if seconds:
+                    st.warning(f"Login dikunci {math.ceil(seconds)} detik karena terlalu banyak percobaan gagal.")
 
 # ──────────────────────────────────────────────────────────────────────────────
 # 5. HALAMAN FORM BOOKING
 # ──────────────────────────────────────────────────────────────────────────────
+def show_slot_suggestions(repo: BookingRepository, room: str, booking_date: date) -> None:
+    """Tampilkan slot kosong ruang yang dipilih dan ruang lain setelah bentrok."""
+    rooms = get_room_catalog(repo).names
+    slots = find_free_slots(repo, rooms, booking_date, booking_date + timedelta(days=1))
+    st.info(
+        f"Slot kosong {room} pada {booking_date:%d-%m-%Y}: "
+        f"{format_slots(slots[room][booking_date])}"
+    )
+    for other in rooms:
+        if other != room and slots[other][booking_date]:
+            st.caption(f"{other}: {format_slots(slots[other][booking_date])}")
+
+def booking_summary(booking: dict) -> str:
+    return (
+        f"{booking['ruang_meeting']} {date.fromisoformat(booking['tanggal_booking']):%d-%m-%Y} "
+        f"{booking['waktu_mulai'][:5]}–{booking['waktu_selesai'][:5]}"
+    )
+
+def write_outcome_notice(entry: dict) -> Tuple[str, str]:
+    """(jenis, pesan) untuk entri antrean yang sudah selesai."""
+    summary = booking_summary(entry["payload"])
+    result = entry["result"] or {}
+    if entry["status"] == "booked":
+        return "success", f"Booking {summary} berhasil disimpan"
+    if entry["status"] == "conflict":
+        return "error", f"Booking {summary} gagal: {conflict_message(result.get('conflict'))}"
+    if entry["status"] == "invalid":
+        return "error", f"Booking {summary} gagal: {result.get('message', 'Booking tidak valid')}"
+    return "error", f"Booking {summary} gagal dikirim setelah {entry['attempts']} percobaan: {entry['last_error']}"
+
+def show_write_notices() -> None:
+    """Tampilkan (sekali) hasil booking antrean yang selesai di rerun sebelumnya."""
+    for kind, message in st.session_state.pop("write_notices", []):
+        getattr(st, kind)(message)
+
+@st.fragment(run_every=WRITE_QUEUE_CHECK_SECONDS)
+def show_pending_writes(write_queue: WriteQueue) -> None:
+    """Status booking sesi ini yang masih di antrean; rerun halaman saat ada yang selesai."""
+    keys = st.session_state.get("my_writes", [])
+    done = []
+    for key in keys:
+        entry = write_queue.get(key)
+        if entry is None:
+            done.append(key)
+        elif entry["status"] in WRITE_QUEUE_DONE:
+            done.append(key)
+            st.session_state.setdefault("write_notices", []).append(write_outcome_notice(entry))
+        else:
+            retry = ""
+            if entry["attempts"]:
+                retry = (
+                    f" · percobaan {entry['attempts']}, dicoba lagi "
+                    f"{datetime.fromtimestamp(entry['next_try_at']):%H:%M:%S}"
+                )
+            st.info(f"⏳ Booking {booking_summary(entry['payload'])} menunggu terkirim{retry}")
+    if done:
+        st.session_state.my_writes = [key for key in keys if key not in done]
+        st.rerun(scope="app")
+
+def pending_writes_panel(repo: BookingRepository) -> None:
+    show_write_notices()
+    if st.session_state.get("my_writes"):
+        show_pending_writes(init_write_queue(repo))
+
 def booking_form_page() -> None:
     st.markdown(
         '<div class="main-header"><h1>📝 Form Booking Meeting Room</h1></div>',
@@ -188,16 +928,43 @@ def booking_form_page() -> None:
             st.session_state.page = "list"
             st.rerun()
 
-    supabase = init_supabase()
-    if not supabase:
+    # Client dibuat tanpa round trip; form tampil tanpa menunggu Supabase
+    repo = init_repository()
+    if not repo:
         st.stop()
+    show_connection_status()
+    pending_writes_panel(repo)
+    catalog = get_room_catalog(repo)
+
+    # Saran slot kosong sebelum mengisi form (query hanya bila diminta)
+    with st.expander("🕒 Cek Slot Kosong"):
+        c1, c2 = st.columns(2)
+        with c1:
+            slot_date = st.date_input("Tanggal", value=date.today(), key="slot_date")
+        with c2:
+            slot_rooms = st.multiselect(
+                "Ruang",
+                catalog.names,
+                default=catalog.names[:10],
+                format_func=catalog.label,
+                key="slot_rooms",
+            )
+        if st.toggle("Tampilkan slot kosong", key="slot_show"):
+            try:
+                slots = find_free_slots(
+                    repo, slot_rooms, slot_date, slot_date + timedelta(days=1)
+                )
+                for room in slot_rooms:
+                    st.write(f"**{room}:** {format_slots(slots[room][slot_date])}")
+            except Exception as err:
+                st.error(f"Gagal memuat slot kosong: {err}")
 
     # Form input
     with st.form("booking_form", clear_on_submit=False):
         nama = st.text_input("Nama Pemesan")
         subdir = st.text_input("Sub Direktorat")
-        floor = st.selectbox("Lantai", ["19"])
-        ruang_meeting = st.selectbox("Ruang Meeting", ["Breakout Traction", "Cozy 19.2"])
+        ruang_meeting = st.selectbox("Ruang Meeting", catalog.names, format_func=catalog.label)
+        floor = catalog.by_name[ruang_meeting].floor if ruang_meeting else ""
         booking_date = st.date_input("Tanggal Booking", value=date.today())
         col1, col2 = st.columns(2)
         with col1:
@@ -206,6 +973,20 @@ def booking_form_page() -> None:
             waktu_selesai = st.time_input("Waktu Selesai", value=time(10, 0))
         keterangan = st.text_area("Keterangan", height=80)
 
+        with st.expander("🔁 Booking Berulang"):
+            freq_label = st.selectbox("Pengulangan", list(RECURRENCE_FREQS))
+            c1, c2 = st.columns(2)
+            with c1:
+                interval = st.number_input("Setiap (hari/minggu)", min_value=1, max_value=12, value=1)
+            with c2:
+                until = st.date_input("Berulang sampai", value=date.today() + timedelta(weeks=12))
+            byday = st.multiselect(
+                "Hanya pada hari",
+                range(7),
+                format_func=lambda i: WEEKDAY_NAMES[i],
+                help="Kosongkan untuk hari yang sama dengan Tanggal Booking (mingguan) atau setiap hari (harian)",
+            )
+
         # Center the submit button using columns
         col1, col2, col3 = st.columns([3, 2, 1])
         with col3:
@@ -220,14 +1001,6 @@ def booking_form_page() -> None:
             st.stop()
 
         valid, msg = validate_time_range(waktu_mulai, waktu_selesai)
-        if not valid:
-            st.error(msg)
-            st.stop()
-
-        valid, msg = validate_booking_conflict(
-            supabase, booking_date, waktu_mulai, waktu_selesai, ruang_meeting
-        )
-
         if not valid:
             st.error(msg)
             st.stop()
@@ -251,30 +1024,298 @@ def booking_form_page() -> None:
                 st.error(err)
             st.stop()
 
+        booking = {
+            "nama": nama,
+            "subdir": subdir,
+            "floor": floor,
+            "ruang_meeting": ruang_meeting,
+            "tanggal_booking": str(booking_date),
+            "waktu_mulai": waktu_mulai.strftime("%H:%M:%S"),
+            "waktu_selesai": waktu_selesai.strftime("%H:%M:%S"),
+            "keterangan": keterangan,
+        }
+
+        freq = RECURRENCE_FREQS[freq_label]
+        if freq:
+            dates = expand_recurrence(booking_date, until, freq, int(interval), byday)
+            if not dates:
+                st.error("Tidak ada tanggal yang cocok dengan pola pengulangan")
+                st.stop()
+            if len(dates) > MAX_OCCURRENCES:
+                st.error(
+                    f"Pengulangan menghasilkan lebih dari {MAX_OCCURRENCES} tanggal "
+                    f"(sampai {dates[MAX_OCCURRENCES - 1]:%d-%m-%Y} sudah {MAX_OCCURRENCES}). "
+                    "Majukan 'Berulang sampai' atau perbesar interval."
+                )
+                st.stop()
+            try:
+                outcome = book_recurring(repo, booking, dates)
+            except Exception as err:
+                st.error(f"Gagal menyimpan booking: {err}")
+                st.stop()
+            skipped = outcome["conflicts"] + outcome.get("invalid", [])
+            if not skipped:
+                st.session_state.page = "list"
+                st.rerun()
+            st.success(f"{len(outcome['booked'])} dari {len(dates)} booking berhasil disimpan")
+            st.warning(f"{len(skipped)} tanggal tidak disimpan:")
+            for item in skipped:
+                day = date.fromisoformat(item["booking"]["tanggal_booking"])
+                reason = item["message"] if "message" in item else conflict_message(item["conflict"])
+                st.write(f"- {day:%d-%m-%Y}: {reason}")
+            st.stop()
+
+        # Booking lewat antrean tulis: key sama untuk isi form yang sama,
+        # sehingga klik ulang / retry tidak pernah membuat booking ganda
+        if "booking_form_nonce" not in st.session_state:
+            st.session_state.booking_form_nonce = str(uuid.uuid4())
         try:
-            supabase.table("bookings").insert(
-                {
-                    "nama": nama,
-                    "subdir": subdir,
-                    "floor": floor,
-                    "ruang_meeting": ruang_meeting,
-                    "tanggal_booking": str(booking_date),
-                    "waktu_mulai": waktu_mulai.strftime("%H:%M:%S"),
-                    "waktu_selesai": waktu_selesai.strftime("%H:%M:%S"),
-                    "keterangan": keterangan,
-                }
-            ).execute()
-            st.success("Booking berhasil disimpan!")
-            st.session_state.page = "list"
-            st.rerun()
+            write_queue = init_write_queue(repo)
+            key = WriteQueue.key_for(st.session_state.booking_form_nonce, booking)
+            entry = write_queue.submit(key, booking, WRITE_QUEUE_SUBMIT_WAIT_SECONDS)
         except Exception as err:
             st.error(f"Gagal menyimpan booking: {err}")
+            st.stop()
+
+        if entry["status"] == "booked":
+            del st.session_state.booking_form_nonce
+            st.session_state.setdefault("write_notices", []).append(write_outcome_notice(entry))
+            st.session_state.page = "list"
+            st.rerun()
+        if entry["status"] == "conflict":
+            st.error(conflict_message(entry["result"].get("conflict")))
+            show_slot_suggestions(repo, ruang_meeting, booking_date)
+            st.stop()
+        if entry["status"] in WRITE_QUEUE_DONE:
+            st.error(write_outcome_notice(entry)[1])
+            st.stop()
+        # Supabase lambat/tidak terjangkau: booking tetap tersimpan di antrean
+        del st.session_state.booking_form_nonce
+        my_writes = st.session_state.setdefault("my_writes", [])
+        if key not in my_writes:
+            my_writes.append(key)
+        st.session_state.setdefault("write_notices", []).append((
+            "warning",
+            "Server belum merespons. Booking disimpan di antrean dan akan "
+            "dikirim otomatis; statusnya tampil di halaman ini dan di kalender.",
+        ))
+        st.rerun()
 
 # ──────────────────────────────────────────────────────────────────────────────
 # 6. HALAMAN LIST BOOKING – CALENDAR VIEW
 # ──────────────────────────────────────────────────────────────────────────────
 from streamlit_calendar import calendar  # import setelah yakin ter-install
 
+CALENDAR_VIEWS = {
+    "Bulan": "dayGridMonth",
+    "Minggu": "timeGridWeek",
+    "Hari": "timeGridDay",
+}
+
+def calendar_window(view: str, anchor: date) -> Tuple[date, date]:
+    """Rentang tanggal [start, end) yang terlihat pada view kalender."""
+    if view == "timeGridDay":
+        return anchor, anchor + timedelta(days=1)
+    if view == "timeGridWeek":
+        start = anchor - timedelta(days=anchor.weekday())
+        return start, start + timedelta(days=7)
+    # dayGridMonth: 6 minggu, dimulai Senin (locale "id")
+    first = anchor.replace(day=1)
+    start = first - timedelta(days=first.weekday())
+    return start, start + timedelta(days=42)
+
+def shift_anchor(view: str, anchor: date, step: int) -> date:
+    """Geser tanggal acuan kalender satu periode maju/mundur."""
+    if view == "timeGridDay":
+        return anchor + timedelta(days=step)
+    if view == "timeGridWeek":
+        return anchor + timedelta(weeks=step)
+    month = anchor.month - 1 + step
+    return date(anchor.year + month // 12, month % 12 + 1, 1)
+
+def _boundary_date(iso: str) -> date:
+    """
+    Tanggal dari batas view FullCalendar (tengah malam lokal browser, dikirim
+    dalam UTC). Dibulatkan ke hari terdekat agar zona waktu ±12 jam aman.
+    """
+    if len(iso) == 10:
+        return date.fromisoformat(iso)
+    moment = datetime.fromisoformat(iso.replace("Z", "+00:00"))
+    return (moment + timedelta(hours=12)).date()
+
+def window_from_dates_set(cal_state: dict) -> Tuple[str, date, date] | None:
+    """Ambil (view, start, end) dari callback datesSet bila komponen melaporkannya."""
+    dates_set = (cal_state or {}).get("datesSet")
+    if not dates_set:
+        return None
+    view = dates_set.get("view", {})
+    start = view.get("activeStart") or dates_set.get("start")
+    end = view.get("activeEnd") or dates_set.get("end")
+    if not (view.get("type") and start and end):
+        return None
+    return view["type"], _boundary_date(start), _boundary_date(end)
+
+ALL_ROOMS = "Semua Ruang"
+
+def build_calendar_events(
+    rows: list[BookingRecord], colors: dict[str, str], classes: dict[str, str] | None = None
+) -> list[dict]:
+    """
+    Konversi BookingRecord ke event FullCalendar, dibangun saat render dan
+    tidak disimpan di session_state. Warna dan kelas CSS dicari sekali per
+    ruang; string tanggal dibuat sekali per tanggal. Detail
+    booking tidak ikut di extendedProps – dibaca dari record saat event diklik.
+    """
+    class_of = (classes or {}).get
+    room_style: dict[str, Tuple[str, list[str]]] = {}
+    day_iso: dict[int, str] = {}
+    events = []
+    for r in rows:
+        style = room_style.get(r.room)
+        if style is None:
+            style = room_style[r.room] = (
+                colors.get(r.room, DEFAULT_ROOM_COLOR),
+                [class_of(r.room, "room-lain")],
+            )
+        day = day_iso.get(r.day)
+        if day is None:
+            day = day_iso[r.day] = date.fromordinal(r.day).isoformat()
+        events.append(
+            {
+                "id": r.id,
+                "title": f"{r.nama} - {r.room}",
+                "start": f"{day}T{CLOCK[r.start]}",
+                "end": f"{day}T{CLOCK[r.end]}",
+                "color": style[0],
+                "classNames": style[1],
+            }
+        )
+    return events
+
+def room_filter_css(catalog: RoomCatalog, room: str) -> str:
+    """
+    CSS yang menyembunyikan event selain ruang terpilih. custom_css diterapkan
+    ulang oleh komponen tanpa remount, dan daftar event diambil dari
+    CalendarEventMemo, jadi ganti filter tidak membangun ulang event.
+    """
+    if room == ALL_ROOMS:
+        return ""
+    keep = catalog.css_classes.get(room, "room-lain")
+    return (
+        f".fc-event:not(.{keep}),"
+        f".fc-daygrid-event-harness:has(> .fc-event:not(.{keep})),"
+        f".fc-timegrid-event-harness:has(> .fc-event:not(.{keep}))"
+        "{display:none !important;}"
+    )
+
+CALENDAR_EVENT_MEMO_ENTRIES = 32
+
+class CalendarEventMemo:
+    """
+    Daftar event kalender yang sudah dibangun, per (jenis tampilan, signature
+    isi window, katalog ruang), dipakai bersama semua sesi. Rerun yang hanya
+    mengganti filter ruang atau tidak mengubah isi window memakai list yang
+    sama tanpa membangun ulang. LRU kecil agar memori tetap terbatas.
+    """
+
+    def __init__(self, max_entries: int = CALENDAR_EVENT_MEMO_ENTRIES) -> None:
+        self.max_entries = max_entries
+        self._events: OrderedDict[tuple, list[dict]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_build(self, key: tuple, build) -> list[dict]:
+        with self._lock:
+            events = self._events.get(key)
+            if events is not None:
+                self._events.move_to_end(key)
+                return events
+        events = build()
+        with self._lock:
+            self._events[key] = events
+            self._events.move_to_end(key)
+            while len(self._events) > self.max_entries:
+                self._events.popitem(last=False)
+        return events
+
+@st.cache_resource(show_spinner=False)
+def get_calendar_event_memo() -> CalendarEventMemo:
+    return CalendarEventMemo()
+
+def fetch_bookings_window(
+    repo: BookingRepository, start: date, end: date
+) -> Tuple[list[BookingRecord], bool]:
+    """
+    Ambil booking dalam rentang [start, end) melalui cache booking bersama.
+    Mengembalikan (rows, changed) – changed bernilai True bila isi window
+    berbeda dari render sebelumnya di sesi ini. Sesi hanya menyimpan hash
+    isi window, record-nya tetap milik cache bersama. Hash mencakup semua
+    kolom yang ditampilkan (judul event & detail), karena signature ini juga
+    kunci CalendarEventMemo.
+    """
+    rows = repo.bookings_window(start, end)
+    rows = sorted(rows, key=lambda r: (r.day, r.start))
+    signature = (
+        (start, end),
+        len(rows),
+        hash(
+            tuple(
+                (r.id, r.room, r.day, r.start, r.end, r.nama, r.subdir, r.floor, r.keterangan)
+                for r in rows
+            )
+        ),
+    )
+    changed = st.session_state.get("booking_window") != signature
+    st.session_state.booking_window = signature
+    return rows, changed
+
+def fetch_rollup_window(
+    repo: BookingRepository, start: date, end: date
+) -> Tuple[list[dict], bool]:
+    """Seperti fetch_bookings_window, tetapi untuk rollup harian (tampilan bulan)."""
+    rows = repo.rollups_window(start, end)
+    rows = sorted(rows, key=lambda r: (r["tanggal_booking"], r["ruang_meeting"]))
+    signature = (
+        (start, end),
+        len(rows),
+        hash(
+            tuple(
+                (r["tanggal_booking"], r["ruang_meeting"], r["booking_count"], r["first_start"], r["last_end"])
+                for r in rows
+            )
+        ),
+    )
+    changed = st.session_state.get("booking_window") != signature
+    st.session_state.booking_window = signature
+    return rows, changed
+
+def build_rollup_events(
+    rollups: list[dict], colors: dict[str, str], classes: dict[str, str] | None = None
+) -> list[dict]:
+    """Satu event sepanjang hari per (ruang, tanggal) berisi ringkasan rollup."""
+    color_of = colors.get
+    class_of = (classes or {}).get
+    return [
+        {
+            "id": f"rollup-{r['tanggal_booking']}-{r['ruang_meeting']}",
+            "title": (
+                f"{r['ruang_meeting']}: {r['booking_count']} booking · "
+                f"{r['first_start'][:5]}–{r['last_end'][:5]}"
+            ),
+            "start": r["tanggal_booking"],
+            "allDay": True,
+            "color": color_of(r["ruang_meeting"], DEFAULT_ROOM_COLOR),
+            "classNames": [class_of(r["ruang_meeting"], "room-lain")],
+            "extendedProps": {
+                "rollup": True,
+                "tanggal": r["tanggal_booking"],
+                "ruang_meeting": r["ruang_meeting"],
+                "booking_count": r["booking_count"],
+                "booked_minutes": r["booked_minutes"],
+            },
+        }
+        for r in rollups
+    ]
+
 def booking_list_page() -> None:
     st.markdown(
         '<div class="main-header"><h1>📅 Kalender Booking Meeting Room</h1></div>',
@@ -283,6 +1324,10 @@ def booking_list_page() -> None:
 
     # Tombol navigasi
     col1, col2, col3 = st.columns([1, 1, 1])
+    with col1:
+        if st.button("🏢 Ketersediaan Ruang", use_container_width=True):
+            st.session_state.page = "grid"
+            st.rerun()
     with col2:
         if st.button("➕ Tambah Booking", use_container_width=True):
             st.session_state.page = "form"
@@ -290,139 +1335,839 @@ def booking_list_page() -> None:
 
     st.markdown("---")
 
-    supabase = init_supabase()
-    if not supabase:
+    repo = init_repository()
+    if not repo:
         st.stop()
+    pending_writes_panel(repo)
 
-    try:
-        result = (
-            supabase.table("bookings")
-            .select("*")
-            .order("tanggal_booking", desc=False)
-            .execute()
+    if realtime_enabled():
+        # Perubahan booking didorong listener ke cache bersama; sesi ini
+        # hanya rerun saat versi hub berubah
+        start_realtime_listener()
+    if realtime_enabled() or replica_enabled():
+        watch_booking_changes()
+
+    # ── Navigasi periode kalender ──────────────────────────────────────────
+    if "calendar_view" not in st.session_state:
+        st.session_state.calendar_view = "dayGridMonth"
+        st.session_state.calendar_anchor = date.today()
+
+    nav1, nav2, nav3, nav4 = st.columns([1, 1, 1, 3])
+    with nav1:
+        if st.button("◀ Sebelumnya", use_container_width=True):
+            st.session_state.calendar_anchor = shift_anchor(
+                st.session_state.calendar_view, st.session_state.calendar_anchor, -1
+            )
+    with nav2:
+        if st.button("Hari Ini", use_container_width=True):
+            st.session_state.calendar_anchor = date.today()
+    with nav3:
+        if st.button("Berikutnya ▶", use_container_width=True):
+            st.session_state.calendar_anchor = shift_anchor(
+                st.session_state.calendar_view, st.session_state.calendar_anchor, 1
+            )
+    with nav4:
+        view_labels = list(CALENDAR_VIEWS)
+        view_label = st.radio(
+            "Tampilan",
+            view_labels,
+            index=list(CALENDAR_VIEWS.values()).index(st.session_state.calendar_view),
+            horizontal=True,
+            label_visibility="collapsed",
         )
+        st.session_state.calendar_view = CALENDAR_VIEWS[view_label]
 
-        if not result.data:
-            st.info("Belum ada data booking")
-            return
+    view = st.session_state.calendar_view
+    window_start, window_end = calendar_window(view, st.session_state.calendar_anchor)
+
+    try:
+        # Tampilan bulan cukup membaca rollup harian; minggu/hari/list butuh
+        # booking lengkap
+        monthly = view == "dayGridMonth"
+        # Window booking/rollup dan katalog ruang dibaca bersamaan
+        repo.prefetch(
+            repo.plan_rollups_window(window_start, window_end)
+            if monthly
+            else repo.plan_bookings_window(window_start, window_end),
+            repo.plan_rooms(),
+        )
+        with stage("muat_booking"):
+            if monthly:
+                data, changed = fetch_rollup_window(repo, window_start, window_end)
+            else:
+                data, changed = fetch_bookings_window(repo, window_start, window_end)
 
-        df = pd.DataFrame(result.data)
+        if not data:
+            st.info("Belum ada data booking pada periode ini")
 
         # ── Konversi ke event kalender ──────────────────────────────────────
-        events = []
-        for _, row in df.iterrows():
-            start_dt = f"{row['tanggal_booking']}T{row['waktu_mulai']}"
-            end_dt = f"{row['tanggal_booking']}T{row['waktu_selesai']}"
-            color = "#FF6B6B" if row["ruang_meeting"] == "Breakout Traction" else "#4ECDC4"
-            events.append(
-                {
-                    "id": row["id"],
-                    "title": f"{row['nama']} - {row['ruang_meeting']}",
-                    "start": start_dt,
-                    "end": end_dt,
-                    "color": color,
-                    "extendedProps": {
-                        "nama": row["nama"],
-                        "subdir": row["subdir"],
-                        "floor": row["floor"],
-                        "ruang_meeting": row["ruang_meeting"],
-                        "keterangan": row["keterangan"],
-                    },
-                }
+        # Event dibangun dari record cache bersama sekali per isi window &
+        # katalog (CalendarEventMemo, bukan per sesi); remount hanya bila
+        # salah satunya berubah
+        catalog = get_room_catalog(repo)
+        if changed or st.session_state.get("calendar_events_catalog") is not catalog:
+            st.session_state.calendar_events_catalog = catalog
+            # Event kalender hanya dibaca saat mount → remount bila data berubah
+            st.session_state.calendar_key = str(uuid.uuid4())
+        build = build_rollup_events if monthly else build_calendar_events
+        with stage("event_kalender"):
+            events = get_calendar_event_memo().get_or_build(
+                (monthly, st.session_state.booking_window, catalog),
+                lambda: build(data, catalog.colors, catalog.css_classes),
             )
 
-        # ── PERBAIKAN FILTER DENGAN SESSION STATE ──────────────────────────
-        # Inisialisasi session state untuk filter
-        if "room_filter" not in st.session_state:
-            st.session_state.room_filter = "Semua Ruang"
-
-        # Filter ruang meeting dengan session state
-        ruang_opsi = ["Semua Ruang", "Breakout Traction", "Cozy 19.2"]
+        # ── Filter ruang (di sisi browser lewat CSS, tanpa remount) ─────────
+        ruang_opsi = [ALL_ROOMS, *catalog.names]
+        if st.session_state.get("room_filter_select") not in ruang_opsi:
+            st.session_state.room_filter_select = ALL_ROOMS
         room_filter = st.selectbox(
-            "Filter Ruang Meeting", 
+            "Filter Ruang Meeting",
             ruang_opsi,
-            index=ruang_opsi.index(st.session_state.room_filter),
-            key="room_filter_select"
+            key="room_filter_select",
         )
-        
-        # Update session state jika filter berubah
-        if room_filter != st.session_state.room_filter:
-            st.session_state.room_filter = room_filter
-            # Regenerate calendar key untuk refresh
-            st.session_state.calendar_key = str(uuid.uuid4())
-
-        # Apply filter ke events
-        filtered_events = events
-        if st.session_state.room_filter != "Semua Ruang":
-            filtered_events = [
-                e for e in events 
-                if e.get("extendedProps", {}).get("ruang_meeting") == st.session_state.room_filter
-            ]
 
         # Opsi & rendering kalender
         cal_options = {
             "editable": False,
             "selectable": True,
+            # Navigasi periode dikendalikan dari Streamlit agar data yang
+            # dimuat selalu sesuai rentang yang terlihat
             "headerToolbar": {
-                "left": "prev,next today",
+                "left": "",
                 "center": "title",
-                "right": "dayGridMonth,timeGridWeek,timeGridDay",
+                "right": "",
             },
-            "initialView": "dayGridMonth",
+            "initialView": view,
+            "initialDate": str(st.session_state.calendar_anchor),
             "height": "auto",
-            "slotMinTime": "08:00:00",
-            "slotMaxTime": "18:00:00",
+            "slotMinTime": catalog.day_start.strftime("%H:%M:%S"),
+            "slotMaxTime": catalog.day_end.strftime("%H:%M:%S"),
             "weekends": True,
             "locale": "id",
             "eventDisplay": "block",
-            "dayMaxEvents": 3,
+            # Event tersembunyi tetap dihitung "+n lainnya" → matikan saat difilter
+            "dayMaxEvents": 3 if room_filter == ALL_ROOMS else False,
             "moreLinkText": "lainnya",
         }
 
         if "calendar_key" not in st.session_state:
             st.session_state.calendar_key = str(uuid.uuid4())
 
-        # Gunakan filtered_events instead of events
-        cal_state = calendar(
-            events=filtered_events,
-            options=cal_options,
-            key=st.session_state.calendar_key,
-        )
+        record_payload("events", events)
+        with stage("render_kalender"):
+            cal_state = calendar(
+                events=events,
+                options=cal_options,
+                custom_css=room_filter_css(catalog, room_filter),
+                callbacks=["eventClick", "datesSet"],
+                key=st.session_state.calendar_key,
+            )
+
+        # Versi komponen yang melaporkan datesSet: ikuti rentang yang terlihat
+        reported = window_from_dates_set(cal_state)
+        if (
+            reported
+            and reported[0] in CALENDAR_VIEWS.values()
+            and reported != st.session_state.get("last_dates_set")
+        ):
+            st.session_state.last_dates_set = reported
+            if reported != (view, window_start, window_end):
+                st.session_state.calendar_view = reported[0]
+                st.session_state.calendar_anchor = (
+                    reported[1] + (reported[2] - reported[1]) / 2
+                )
+                st.rerun()
 
         # ── Tampilkan detail saat event diklik ──────────────────────────────
         if cal_state.get("eventClick"):
             ev = cal_state["eventClick"]["event"]
-            st.subheader("📋 Detail Booking")
-            c1, c2 = st.columns(2)
-            with c1:
-                st.write(f"**Nama:** {ev['extendedProps']['nama']}")
-                st.write(f"**Sub Direktorat:** {ev['extendedProps']['subdir']}")
-                st.write(f"**Lantai:** {ev['extendedProps']['floor']}")
-            with c2:
-                st.write(f"**Ruang Meeting:** {ev['extendedProps']['ruang_meeting']}")
-                st.write(f"**Tanggal:** {ev['start'][:10]}")
-                st.write(
-                    f"**Waktu:** {ev['start'][11:16]} - {ev['end'][11:16]}"
-                )
-            if ev["extendedProps"]["keterangan"]:
-                st.write(f"**Keterangan:** {ev['extendedProps']['keterangan']}")
+            if ev["extendedProps"].get("rollup"):
+                # Ringkasan bulan → buka tampilan hari untuk melihat detailnya
+                st.session_state.calendar_view = "timeGridDay"
+                st.session_state.calendar_anchor = date.fromisoformat(ev["extendedProps"]["tanggal"])
+                st.rerun()
+            booking = next((r for r in data if str(r.id) == str(ev["id"])), None)
+            if booking is not None:
+                st.subheader("📋 Detail Booking")
+                c1, c2 = st.columns(2)
+                with c1:
+                    st.write(f"**Nama:** {booking.nama}")
+                    st.write(f"**Sub Direktorat:** {booking.subdir}")
+                    st.write(f"**Lantai:** {booking.floor}")
+                with c2:
+                    st.write(f"**Ruang Meeting:** {booking.room}")
+                    st.write(f"**Tanggal:** {booking['tanggal_booking']}")
+                    st.write(f"**Waktu:** {CLOCK[booking.start][:5]} - {CLOCK[booking.end][:5]}")
+                if booking.keterangan:
+                    st.write(f"**Keterangan:** {booking.keterangan}")
 
         # ── Legend warna ────────────────────────────────────────────────────
         st.markdown("---")
         st.subheader("📌 Keterangan Warna")
-        colA, colB = st.columns(2)
-        with colA:
-            st.markdown("🔴 **Breakout Traction**")
-            st.markdown("🟢 **Cozy 19.2**")
-        #with colB:
-        #    st.markdown(" Cozy 19.2")
+        legend_cols = st.columns(4)
+        for i, room in enumerate(catalog.rooms):
+            with legend_cols[i % len(legend_cols)]:
+                st.markdown(
+                    f'<span style="color:{room.color}">■</span> '
+                    f"**{room.nama}** · Lt. {room.floor}",
+                    unsafe_allow_html=True,
+                )
 
     except Exception as err:
         st.error(f"Error memuat data: {err}")
 
+# ──────────────────────────────────────────────────────────────────────────────
+# 6.1 GRID KETERSEDIAAN RUANG (RUANG × JAM)
+# ──────────────────────────────────────────────────────────────────────────────
+GRID_SLOT_MINUTES = 15
+
+def room_occupancy(
+    repo: BookingRepository, catalog: RoomCatalog, day: date, slot_minutes: int = GRID_SLOT_MINUTES
+) -> dict[str, int]:
+    """Bitmap okupansi setiap ruang di katalog pada satu tanggal, dari satu query hari itu."""
+    repo.bookings_window(day, day + timedelta(days=1))
+    return {
+        name: repo.room_day_index(name, day).occupancy(slot_minutes)
+        for name in catalog.names
+    }
+
+def _grid_runs(states: list[str]) -> list[Tuple[str, int]]:
+    """Gabungkan slot berurutan yang statusnya sama → (status, panjang)."""
+    runs: list[Tuple[str, int]] = []
+    for state in states:
+        if runs and runs[-1][0] == state:
+            runs[-1] = (state, runs[-1][1] + 1)
+        else:
+            runs.append((state, 1))
+    return runs
+
+def render_availability_grid(
+    rooms: list[Room],
+    occupancy: dict[str, int],
+    day_start: time,
+    day_end: time,
+    slot_minutes: int = GRID_SLOT_MINUTES,
+) -> str:
+    """
+    HTML grid ruang × slot waktu. Slot berurutan dengan status sama digabung
+    jadi satu sel (grid-column: span n) agar DOM tetap kecil untuk ratusan ruang.
+    """
+    first = time_minutes(day_start) // slot_minutes
+    last = -(-time_minutes(day_end) // slot_minutes)
+    slots = range(first, last)
+
+    hours = _grid_runs([f"{s * slot_minutes // 60:02d}" for s in slots])
+    parts = [
+        f'<div class="room-grid" style="grid-template-columns:minmax(140px,max-content) '
+        f'repeat({len(slots)},minmax(6px,1fr))">',
+        '<div class="rg-head"></div>',
+    ]
+    parts += [f'<div class="rg-head" style="grid-column:span {n}">{h}</div>' for h, n in hours]
+
+    floor = None
+    for room in rooms:
+        if room.floor != floor:
+            floor = room.floor
+            parts.append(f'<div class="rg-floor">Lantai {html.escape(floor)}</div>')
+        bits = occupancy.get(room.nama, 0)
+        open_bits = slot_mask(room.jam_buka, room.jam_tutup, slot_minutes)
+        states = [
+            "busy" if bits >> s & 1 else "free" if open_bits >> s & 1 else "closed"
+            for s in slots
+        ]
+        free_minutes = states.count("free") * slot_minutes
+        parts.append(
+            f'<div class="rg-room" style="border-left:4px solid {html.escape(room.color)}" '
+            f'title="{free_minutes // 60} jam {free_minutes % 60} menit kosong">'
+            f"{html.escape(room.nama)}</div>"
+        )
+        parts += [
+            f'<div class="rg-cell rg-{state}" style="grid-column:span {n}"></div>'
+            for state, n in _grid_runs(states)
+        ]
+    parts.append("</div>")
+    return "".join(parts)
+
+def availability_grid_page() -> None:
+    st.markdown(
+        '<div class="main-header"><h1>🏢 Ketersediaan Ruang</h1></div>',
+        unsafe_allow_html=True,
+    )
+
+    col1, col2, col3 = st.columns([1, 1, 1])
+    with col1:
+        if st.button("📅 Kalender", use_container_width=True):
+            st.session_state.page = "list"
+            st.rerun()
+    with col2:
+        if st.button("➕ Tambah Booking", use_container_width=True):
+            st.session_state.page = "form"
+            st.rerun()
+
+    st.markdown("---")
+
+    repo = init_repository()
+    if not repo:
+        st.stop()
+
+    if realtime_enabled():
+        start_realtime_listener()
+    if realtime_enabled() or replica_enabled():
+        watch_booking_changes()
+
+    # Katalog ruang dan booking tanggal terpilih dibaca bersamaan
+    grid_day = st.session_state.get("grid_date", date.today())
+    repo.prefetch(repo.plan_rooms(), repo.plan_bookings_window(grid_day, grid_day + timedelta(days=1)))
+
+    catalog = get_room_catalog(repo)
+    f1, f2 = st.columns([1, 1])
+    with f1:
+        day = st.date_input("Tanggal", value=date.today(), key="grid_date")
+    with f2:
+        floor = st.selectbox("Lantai", ["Semua lantai"] + catalog.floors, key="grid_floor")
+    rooms = catalog.rooms if floor == "Semua lantai" else [r for r in catalog.rooms if r.floor == floor]
+
+    try:
+        occupancy = room_occupancy(repo, catalog, day)
+    except Exception as err:
+        st.error(f"Error memuat data: {err}")
+        return
+
+    free_now = None
+    if day == date.today():
+        now_slot = time_minutes(datetime.now().time()) // GRID_SLOT_MINUTES
+        free_now = sum(
+            1
+            for r in rooms
+            if not occupancy[r.nama] >> now_slot & 1
+            and slot_mask(r.jam_buka, r.jam_tutup, GRID_SLOT_MINUTES) >> now_slot & 1
+        )
+    m1, m2 = st.columns(2)
+    m1.metric("Ruang", len(rooms))
+    m2.metric("Kosong sekarang", free_now if free_now is not None else "–")
+
+    st.markdown(
+        render_availability_grid(rooms, occupancy, catalog.day_start, catalog.day_end),
+        unsafe_allow_html=True,
+    )
+    st.caption("🟩 kosong · 🟥 terisi · ⬜ di luar jam buka ruang")
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 6.2 ANALITIK UTILISASI RUANG
+# ──────────────────────────────────────────────────────────────────────────────
+ANALYTICS_TTL_SECONDS = 600
+
+@st.cache_data(ttl=ANALYTICS_TTL_SECONDS, show_spinner=False)
+def get_utilization(_repo: BookingRepository, start: date, end: date) -> dict[str, list[dict]]:
+    """Agregat utilisasi (sql/007 booking_utilization) untuk [start, end), di-cache per periode."""
+    return _repo.utilization(start, end)
+
+def utilization_frames(
+    data: dict[str, list[dict]], catalog: RoomCatalog, start: date, end: date
+) -> dict[str, pd.DataFrame]:
+    """Ubah agregat server jadi tabel siap tampil: ringkasan, mingguan, jam sibuk, subdir."""
+    weeks = pd.DataFrame(data["per_room_week"], columns=["ruang_meeting", "minggu", "booking", "menit"])
+    rooms = list(dict.fromkeys([*catalog.names, *weeks["ruang_meeting"]]))
+
+    # Ringkasan per ruang: jam terpakai dibanding jam buka selama periode
+    summary = weeks.groupby("ruang_meeting")[["booking", "menit"]].sum().reindex(rooms, fill_value=0)
+    meta = [catalog.by_name.get(name) or Room(name, "") for name in rooms]
+    open_hours = pd.Series(
+        [(time_minutes(r.jam_tutup) - time_minutes(r.jam_buka)) / 60 for r in meta], index=rooms
+    )
+    summary["jam"] = summary["menit"] / 60
+    summary["utilisasi"] = (summary["jam"] / (open_hours * (end - start).days)).fillna(0) * 100
+    summary = summary.drop(columns="menit").rename_axis("ruang")
+
+    weekly = (
+        weeks.assign(minggu=pd.to_datetime(weeks["minggu"]).dt.strftime("%d/%m"), jam=weeks["menit"] / 60)
+        .pivot_table(index="ruang_meeting", columns="minggu", values="jam", aggfunc="sum", fill_value=0)
+        .reindex(rooms, fill_value=0)
+        .rename_axis(index="ruang", columns=None)
+    )
+
+    hours = pd.DataFrame(data["per_hour"], columns=["hari", "jam", "menit"])
+    peak = (
+        hours.pivot_table(index="jam", columns="hari", values="menit", aggfunc="sum", fill_value=0)
+        .reindex(
+            # Jam kerja katalog selalu tampil, plus jam di luar itu yang terpakai
+            index=sorted(
+                set(range(catalog.day_start.hour, catalog.day_end.hour + (catalog.day_end.minute > 0)))
+                | set(hours["jam"])
+            ),
+            columns=range(1, 8),
+            fill_value=0,
+        )
+        / 60
+    )
+    peak.columns = WEEKDAY_NAMES
+    peak.index = [f"{h:02d}:00" for h in peak.index]
+
+    subdirs = pd.DataFrame(data["per_subdir"], columns=["subdir", "booking", "menit"]).set_index("subdir")
+    subdirs["jam"] = subdirs.pop("menit") / 60
+    subdirs["porsi"] = subdirs["jam"] / max(subdirs["jam"].sum(), 1e-9) * 100
+
+    return {"summary": summary, "weekly": weekly, "peak": peak, "subdirs": subdirs}
+
+def analytics_page() -> None:
+    if not admin_authenticated():
+        admin_login_page()
+        return
+
+    st.markdown(
+        '<div class="main-header"><h1>📊 Analitik Utilisasi Ruang</h1></div>',
+        unsafe_allow_html=True,
+    )
+
+    col1, _ = st.columns([1, 4])
+    with col1:
+        if st.button("⚙️ Admin Panel", use_container_width=True):
+            st.session_state.page = "admin"
+            st.rerun()
+
+    st.markdown("---")
+
+    repo = init_repository()
+    if not repo:
+        st.stop()
+
+    today = date.today()
+    period = st.date_input(
+        "Periode",
+        value=(today.replace(day=1), today),
+        max_value=today + timedelta(days=365),
+        key="analytics_period",
+    )
+    if len(period) != 2:
+        st.info("Pilih tanggal awal dan akhir periode")
+        return
+    start, end = period[0], period[1] + timedelta(days=1)
+
+    catalog = get_room_catalog(repo)
+    try:
+        frames = utilization_frames(get_utilization(repo, start, end), catalog, start, end)
+    except Exception as err:
+        st.error(f"Gagal memuat analitik: {err}")
+        return
+
+    summary = frames["summary"]
+    m1, m2, m3 = st.columns(3)
+    m1.metric("Total booking", int(summary["booking"].sum()))
+    m2.metric("Total jam terpakai", f"{summary['jam'].sum():.1f}")
+    m3.metric("Rata-rata utilisasi", f"{summary['utilisasi'].mean():.1f}%")
+
+    st.subheader("🏢 Utilisasi per Ruang")
+    st.dataframe(
+        summary,
+        column_config={
+            "booking": st.column_config.NumberColumn("Booking"),
+            "jam": st.column_config.NumberColumn("Jam terpakai", format="%.1f"),
+            "utilisasi": st.column_config.ProgressColumn(
+                "Utilisasi", format="%.1f%%", min_value=0, max_value=100
+            ),
+        },
+    )
+
+    st.subheader("📅 Jam Terpakai per Minggu")
+    st.dataframe(frames["weekly"].round(1))
+
+    st.subheader("⏰ Jam Sibuk")
+    peak = frames["peak"]
+    st.bar_chart(peak.sum(axis=1).rename("jam terpakai"))
+    st.dataframe(peak.round(1))
+
+    st.subheader("🧑‍💼 Pemakaian per Sub Direktorat")
+    subdirs = frames["subdirs"]
+    st.bar_chart(subdirs["jam"])
+    st.dataframe(
+        subdirs,
+        column_config={
+            "booking": st.column_config.NumberColumn("Booking"),
+            "jam": st.column_config.NumberColumn("Jam terpakai", format="%.1f"),
+            "porsi": st.column_config.NumberColumn("Porsi", format="%.1f%%"),
+        },
+    )
+    st.caption(f"Data di-cache {ANALYTICS_TTL_SECONDS // 60} menit per periode.")
+
 # ──────────────────────────────────────────────────────────────────────────────
 # 7. ADMIN PANEL (contoh sederhana)
 # ──────────────────────────────────────────────────────────────────────────────
+BOOKING_COLUMNS = [
+    "nama",
+    "subdir",
+    "floor",
+    "ruang_meeting",
+    "tanggal_booking",
+    "waktu_mulai",
+    "waktu_selesai",
+    "keterangan",
+]
+IMPORT_CHUNK_ROWS = 1000   # baris dibaca per chunk dari file
+IMPORT_BATCH_ROWS = 200    # baris per RPC insert
+EXPORT_PAGE_ROWS = 1000    # baris per query export
+
+def read_booking_chunks(upload, chunk_rows: int = IMPORT_CHUNK_ROWS) -> Iterator[list[dict]]:
+    """Baca file CSV/XLSX upload per chunk tanpa memuat seluruh isi sekaligus."""
+    if upload.name.lower().endswith(".csv"):
+        for chunk in pd.read_csv(upload, dtype=str, keep_default_na=False, chunksize=chunk_rows):
+            yield chunk.to_dict("records")
+        return
+
+    from openpyxl import load_workbook  # hanya dibutuhkan untuk import XLSX
+
+    workbook = load_workbook(upload, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [str(h).strip() if h is not None else "" for h in next(rows, ())]
+        batch = []
+        for values in rows:
+            batch.append(dict(zip(header, values)))
+            if len(batch) == chunk_rows:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+    finally:
+        workbook.close()
+
+def _import_date(value) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value).strip()[:10])
+
+def _import_time(value) -> time:
+    """Waktu dari sel import, dibulatkan ke menit seperti input form."""
+    if isinstance(value, datetime):
+        value = value.time()
+    elif not isinstance(value, time):
+        value = time.fromisoformat(str(value).strip())
+    return value.replace(second=0, microsecond=0)
+
+def normalize_import_row(raw: dict, catalog: RoomCatalog) -> Tuple[dict | None, str]:
+    """Validasi satu baris import; mengembalikan (booking, "") atau (None, pesan error)."""
+    missing = [col for col in BOOKING_COLUMNS if col not in raw]
+    if missing:
+        return None, f"Kolom tidak ada: {', '.join(missing)}"
+    try:
+        booking_date = _import_date(raw["tanggal_booking"])
+        start = _import_time(raw["waktu_mulai"])
+        end = _import_time(raw["waktu_selesai"])
+    except (TypeError, ValueError):
+        return None, "Format tanggal/waktu tidak valid"
+
+    nama = str(raw["nama"] or "").strip()
+    for valid, msg in (validate_name(nama), validate_time_range(start, end)):
+        if not valid:
+            return None, msg
+    room = str(raw["ruang_meeting"] or "").strip()
+    if room not in catalog.by_name:
+        return None, f"Ruang meeting tidak dikenal: {room}"
+
+    return {
+        "nama": nama,
+        "subdir": str(raw["subdir"] or "").strip(),
+        "floor": catalog.by_name[room].floor,
+        "ruang_meeting": room,
+        "tanggal_booking": str(booking_date),
+        "waktu_mulai": start.strftime("%H:%M:%S"),
+        "waktu_selesai": end.strftime("%H:%M:%S"),
+        "keterangan": str(raw["keterangan"] or "").strip(),
+    }, ""
+
+def _import_key(booking: dict) -> Tuple[str, str, str, str]:
+    """
+    Kunci (ruang, tanggal, mulai, selesai) untuk memetakan hasil RPC kembali ke
+    nomor baris file. Unik per chunk karena baris yang saling bentrok sudah
+    ditolak sebelum insert.
+    """
+    return (
+        booking["ruang_meeting"],
+        str(booking["tanggal_booking"]),
+        str(booking["waktu_mulai"]),
+        str(booking["waktu_selesai"]),
+    )
+
+def import_bookings(repo: BookingRepository, upload, on_progress=None) -> dict:
+    """
+    Import booking dari CSV/XLSX secara streaming. Per chunk: validasi baris,
+    ambil interval booking rentang tanggal chunk (satu query lewat cache),
+    cek bentrok di memori (termasuk antar baris file), lalu insert baris
+    valid per batch lewat book_many_if_free yang tetap mengecek ulang
+    di server. Mengembalikan ringkasan {"inserted", "invalid", "conflicts"}.
+    """
+    catalog = get_room_catalog(repo)
+    summary = {"inserted": 0, "invalid": [], "conflicts": []}
+    line = 1  # baris 1 = header
+
+    for chunk in read_booking_chunks(upload):
+        accepted: list[Tuple[int, dict]] = []
+        for raw in chunk:
+            line += 1
+            booking, msg = normalize_import_row(raw, catalog)
+            if booking is None:
+                summary["invalid"].append((line, msg))
+            else:
+                accepted.append((line, booking))
+        if not accepted:
+            continue
+
+        days = [date.fromisoformat(b["tanggal_booking"]) for _, b in accepted]
+        repo.bookings_window(min(days), max(days) + timedelta(days=1))
+
+        pending: dict[Tuple[str, date], RoomDayIndex] = {}
+        to_insert: list[dict] = []
+        line_of: dict[Tuple[str, str, str, str], int] = {}
+        for (row_line, booking), day in zip(accepted, days):
+            key = (booking["ruang_meeting"], day)
+            if key not in pending:
+                pending[key] = repo.room_day_index(*key)
+            conflict = pending[key].find_overlap(
+                parse_time(booking["waktu_mulai"]), parse_time(booking["waktu_selesai"])
+            )
+            if conflict:
+                summary["conflicts"].append((row_line, conflict_message(conflict[2])))
+                continue
+            # Tandai id negatif agar bentrok antar baris file ikut terdeteksi
+            pending[key] = pending[key].with_booking({**booking, "id": -row_line})
+            to_insert.append(booking)
+            line_of[_import_key(booking)] = row_line
+
+        for i in range(0, len(to_insert), IMPORT_BATCH_ROWS):
+            outcome = repo.book_many_if_free(to_insert[i : i + IMPORT_BATCH_ROWS])
+            for item in outcome["conflicts"]:
+                summary["conflicts"].append(
+                    (line_of.get(_import_key(item["booking"])), conflict_message(item["conflict"]))
+                )
+            for item in outcome.get("invalid", []):
+                summary["invalid"].append(
+                    (line_of.get(_import_key(item["booking"])), item.get("message", "Data tidak valid"))
+                )
+            summary["inserted"] += len(outcome["booked"])
+
+        if on_progress:
+            on_progress(line - 1, summary)
+    return summary
+
+def iter_bookings_csv(repo: BookingRepository) -> Iterator[bytes]:
+    """CSV seluruh booking sebagai potongan bytes, satu potongan per halaman query."""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=["id", *BOOKING_COLUMNS])
+    writer.writeheader()
+    for page in repo.iter_all(["id", *BOOKING_COLUMNS], EXPORT_PAGE_ROWS):
+        writer.writerows(page)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue().encode("utf-8")
+
+def export_bookings_csv(repo: BookingRepository) -> BinaryIO:
+    """
+    Tulis CSV export ke file sementara per halaman dan kembalikan file yang
+    sudah di-rewind; memori hanya menampung satu halaman sekaligus.
+    """
+    handle = tempfile.TemporaryFile()
+    for chunk in iter_bookings_csv(repo):
+        handle.write(chunk)
+    handle.seek(0)
+    return handle
+
+ADMIN_PAGE_ROWS = 50
+ADMIN_COLUMNS = ["id", "nama", "ruang_meeting", "tanggal_booking", "waktu_mulai", "waktu_selesai"]
+ADMIN_SORTS = {"Tanggal": "tanggal_booking", "ID": "id", "Nama": "nama", "Ruang": "ruang_meeting"}
+
+def fetch_admin_page(
+    repo: BookingRepository,
+    filters: dict,
+    sort_col: str,
+    desc: bool,
+    cursor: Tuple[object, int] | None,
+    page_rows: int = ADMIN_PAGE_ROWS,
+) -> Tuple[list[dict], bool, int | None]:
+    """
+    Satu halaman tabel admin: filter, urutan dan limit dikerjakan di server,
+    hanya kolom yang ditampilkan yang diambil. Pagination memakai keyset
+    (nilai kolom urut, id) sehingga halaman stabil walau ada insert/delete.
+    Mengembalikan (rows, ada_halaman_berikutnya, perkiraan_total).
+    """
+    data, count = repo.page(ADMIN_COLUMNS, filters, sort_col, desc, cursor, page_rows + 1)
+    return data[:page_rows], len(data) > page_rows, count
+
+def admin_table_controls(catalog: RoomCatalog) -> Tuple[dict, str, bool]:
+    """Widget filter & urutan tabel admin; reset halaman bila kriteria berubah."""
+    c1, c2, c3, c4, c5 = st.columns([2, 3, 2, 2, 1])
+    with c1:
+        st.selectbox("Ruang", ["Semua Ruang", *catalog.names], key="admin_room")
+    with c2:
+        st.date_input("Rentang tanggal", value=(), key="admin_dates")
+    with c3:
+        st.text_input("Cari nama", key="admin_name")
+    with c4:
+        st.selectbox("Urutkan", list(ADMIN_SORTS), key="admin_sort")
+    with c5:
+        st.toggle("Turun", key="admin_desc")
+
+    filters, sort_col, desc = admin_query_from_state()
+    signature = (tuple(filters.items()), sort_col, desc)
+    if st.session_state.get("admin_query") != signature:
+        st.session_state.admin_query = signature
+        st.session_state.admin_cursors = [None]  # cursor awal tiap halaman
+    return filters, sort_col, desc
+
+def admin_query_from_state() -> Tuple[dict, str, bool]:
+    """Filter & urutan tabel admin dari nilai widget di session_state."""
+    state = st.session_state
+    room = state.get("admin_room", "Semua Ruang")
+    date_range = state.get("admin_dates", ())
+    filters = {
+        "room": None if room == "Semua Ruang" else room,
+        "start": date_range[0] if len(date_range) > 0 else None,
+        "end": date_range[1] if len(date_range) > 1 else None,
+        "name": state.get("admin_name", "").strip(),
+    }
+    return filters, ADMIN_SORTS[state.get("admin_sort", next(iter(ADMIN_SORTS)))], state.get("admin_desc", False)
+
+def admin_page_read() -> tuple:
+    """
+    Baca halaman tabel admin yang akan dibutuhkan rerun ini (untuk
+    prefetch), dihitung dari widget sebelum widget dirender.
+    """
+    filters, sort_col, desc = admin_query_from_state()
+    cursor = None
+    if st.session_state.get("admin_query") == (tuple(filters.items()), sort_col, desc):
+        cursor = st.session_state.admin_cursors[-1]
+    return ("select_page", ADMIN_COLUMNS, filters, sort_col, desc, cursor, ADMIN_PAGE_ROWS + 1)
+
+def admin_batch_actions(repo: BookingRepository, selected: list[dict]) -> None:
+    """Hapus / pindah ruang / geser tanggal untuk baris yang dipilih di tabel."""
+    st.caption(f"{len(selected)} booking dipilih")
+    if not selected:
+        return
+    ids = [row["id"] for row in selected]
+
+    c1, c2, c3, c4 = st.columns([2, 2, 2, 2])
+    with c1:
+        target_room = st.selectbox(
+            "Pindah ke ruang",
+            ["(tetap)", *get_room_catalog(repo).names],
+            key="admin_move_room",
+        )
+    with c2:
+        shift_days = st.number_input("Geser tanggal (hari)", value=0, step=1, key="admin_shift")
+    with c3:
+        st.write("")
+        move = st.button("🔀 Pindahkan Terpilih", use_container_width=True)
+    with c4:
+        st.write("")
+        delete = st.button("🗑️ Hapus Terpilih", use_container_width=True)
+
+    if delete:
+        deleted = repo.delete(ids)
+        st.session_state.admin_flash = ("success", f"{len(deleted)} booking dihapus")
+    elif move:
+        room = None if target_room == "(tetap)" else target_room
+        if room is None and not shift_days:
+            st.warning("Pilih ruang tujuan atau jumlah hari pergeseran")
+            return
+        outcome = repo.move(ids, room, int(shift_days))
+        message = f"{len(outcome['moved'])} booking dipindahkan"
+        if outcome["conflicts"]:
+            skipped = "; ".join(
+                f"#{item['booking']['id']}: {conflict_message(item['conflict'])}"
+                for item in outcome["conflicts"]
+            )
+            st.session_state.admin_flash = ("warning", f"{message}. Tidak dipindahkan – {skipped}")
+        else:
+            st.session_state.admin_flash = ("success", message)
+    else:
+        return
+
+    # Reset pilihan tabel; hanya halaman aktif yang di-query ulang
+    st.session_state.admin_table_nonce = st.session_state.get("admin_table_nonce", 0) + 1
+    st.rerun()
+
+def admin_import_export(repo: BookingRepository) -> None:
+    with st.expander("📥 Import / 📤 Export Booking"):
+        upload = st.file_uploader(
+            f"Import CSV/XLSX (kolom: {', '.join(BOOKING_COLUMNS)})",
+            type=["csv", "xlsx"],
+        )
+        if upload is not None and st.button("📥 Import"):
+            with st.status("Mengimpor booking...") as status:
+                summary = import_bookings(
+                    repo,
+                    upload,
+                    on_progress=lambda n, s: status.update(
+                        label=f"{n} baris diproses, {s['inserted']} tersimpan"
+                    ),
+                )
+                status.update(label="Import selesai", state="complete")
+            st.success(f"{summary['inserted']} booking berhasil diimpor")
+            problems = [
+                {"baris": line, "status": "tidak valid", "pesan": msg}
+                for line, msg in summary["invalid"]
+            ] + [
+                {"baris": line, "status": "bentrok", "pesan": msg}
+                for line, msg in summary["conflicts"]
+            ]
+            if problems:
+                st.warning(f"{len(problems)} baris tidak diimpor")
+                st.dataframe(pd.DataFrame(problems), hide_index=True)
+
+        # Export dibuat saat tombol diklik (bukan di setiap rerun), tidak disimpan di session
+        st.download_button(
+            "📤 Export bookings.csv",
+            lambda: export_bookings_csv(repo),
+            file_name="bookings.csv",
+            mime="text/csv",
+            on_click="ignore",
+        )
+
+def latency_summary(records: list[dict]) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """p50/p95 per halaman (total rerun) dan per (halaman, tahap) dari rekaman metrics."""
+    df = pd.json_normalize(records)
+    pages = df.groupby("page").agg(
+        rerun=("total_ms", "size"),
+        p50_ms=("total_ms", "median"),
+        p95_ms=("total_ms", lambda x: x.quantile(0.95)),
+        query=("queries", "mean"),
+        query_ms=("query_ms", "mean"),
+        rows=("rows", "mean"),
+        # bytes hanya terisi di rerun sampel (METRICS_BYTES_SAMPLE_EVERY)
+        kb=("bytes", lambda x: pd.to_numeric(x).mean() / 1024),
+    )
+    stage_cols = [c for c in df.columns if c.startswith("stages.")]
+    stages = (
+        df.melt(id_vars="page", value_vars=stage_cols, var_name="tahap", value_name="ms")
+        .dropna()
+        .assign(tahap=lambda d: d["tahap"].str.removeprefix("stages."))
+        .groupby(["page", "tahap"])["ms"]
+        .quantile([0.5, 0.95])
+        .unstack()
+        .rename(columns={0.5: "p50_ms", 0.95: "p95_ms"})
+    ) if stage_cols else pd.DataFrame(columns=["p50_ms", "p95_ms"])
+    return pages, stages
+
+def admin_debug_panel() -> None:
+    """Ringkasan latensi rerun semua sesi di proses ini (hanya admin)."""
+    with st.expander("🛠️ Debug Performa"):
+        records = get_metrics_store().records()
+        if not records:
+            st.info("Belum ada rerun yang tercatat")
+            return
+        pages, stages = latency_summary(records)
+        st.caption(f"{len(records)} rerun terakhir di proses ini")
+        st.dataframe(pages.round(1))
+        st.dataframe(stages.round(1))
+        st.dataframe(pd.json_normalize(records[-20:][::-1]), hide_index=True)
+        st.download_button(
+            "⬇️ Export metrics.jsonl",
+            "\n".join(json.dumps(r, default=str) for r in records),
+            file_name="metrics.jsonl",
+            mime="application/x-ndjson",
+        )
+
 def admin_page() -> None:
     if not admin_authenticated():
         admin_login_page()
@@ -433,7 +2178,7 @@ def admin_page() -> None:
         unsafe_allow_html=True,
     )
 
-    col1, col2, _ = st.columns([1, 1, 8])
+    col1, col2, col3, _, col4 = st.columns([1, 1, 1, 6, 1])
     with col1:
         if st.button("📋 Daftar Booking", use_container_width=True):
             st.session_state.page = "list"
@@ -442,47 +2187,75 @@ def admin_page() -> None:
         if st.button("➕ Form Booking", use_container_width=True):
             st.session_state.page = "form"
             st.rerun()
+    with col3:
+        if st.button("📊 Analitik", use_container_width=True):
+            st.session_state.page = "analytics"
+            st.rerun()
+    with col4:
+        if st.button("🚪 Logout", use_container_width=True):
+            admin_logout()
+            st.rerun()
 
     st.markdown("---")
 
-    supabase = init_supabase()
-    if not supabase:
+    repo = init_repository()
+    if not repo:
         st.stop()
 
+    # Katalog ruang dan halaman tabel dibaca bersamaan
+    repo.prefetch(repo.plan_rooms(), admin_page_read())
+
+    admin_import_export(repo)
+    admin_debug_panel()
+
+    flash = st.session_state.pop("admin_flash", None)
+    if flash:
+        getattr(st, flash[0])(flash[1])
+
+    catalog = get_room_catalog(repo)
+    filters, sort_col, desc = admin_table_controls(catalog)
+    cursors = st.session_state.admin_cursors
+
     try:
-        df = pd.DataFrame(
-            supabase.table("bookings").select("*").execute().data
-        )
+        with stage("muat_tabel_admin"):
+            rows, has_next, total = fetch_admin_page(
+                repo, filters, sort_col, desc, cursors[-1]
+            )
+        with stage("dataframe_admin"):
+            df = pd.DataFrame(rows, columns=ADMIN_COLUMNS)
+
+        # Tabel dengan pilihan banyak baris untuk operasi batch
+        table_key = f"admin_table_{len(cursors)}_{st.session_state.get('admin_table_nonce', 0)}"
+        record_payload("admin_table", rows)
+        with stage("render_tabel_admin"):
+            event = st.dataframe(
+                df,
+                hide_index=True,
+                on_select="rerun",
+                selection_mode="multi-row",
+                key=table_key,
+            )
+        selected = [rows[i] for i in event.selection.rows if i < len(rows)]
+
+        nav1, nav2, nav3 = st.columns([1, 2, 1])
+        with nav1:
+            if st.button("◀ Sebelumnya", disabled=len(cursors) == 1):
+                cursors.pop()
+                st.rerun()
+        with nav2:
+            total_text = f" dari ±{total} booking" if total is not None else ""
+            st.caption(f"Halaman {len(cursors)}{total_text}")
+        with nav3:
+            if st.button("Berikutnya ▶", disabled=not has_next):
+                last = rows[-1]
+                cursors.append((last[sort_col], last["id"]))
+                st.rerun()
+
         if df.empty:
             st.info("Belum ada data booking")
             return
 
-        # Tampilkan tabel edit/delete sederhana
-        st.dataframe(
-            df[
-                [
-                    "id",
-                    "nama",
-                    "ruang_meeting",
-                    "tanggal_booking",
-                    "waktu_mulai",
-                    "waktu_selesai",
-                ]
-            ],
-            hide_index=True,
-        )
-
-        # Hapus booking
-        del_id = st.number_input(
-            "Masukkan ID untuk dihapus",
-            step=1,
-            min_value=1,
-            format="%d",
-        )
-        if st.button("🗑️ Hapus Booking"):
-            supabase.table("bookings").delete().eq("id", del_id).execute()
-            st.success("Booking dihapus")
-            st.rerun()
+        admin_batch_actions(repo, selected)
     except Exception as err:
         st.error(f"Gagal memuat data: {err}")
 
@@ -493,12 +2266,18 @@ def main() -> None:
     if "page" not in st.session_state:
         st.session_state.page = "form"
 
-    if st.session_state.page == "form":
-        booking_form_page()
-    elif st.session_state.page == "list":
-        booking_list_page()
-    elif st.session_state.page == "admin":
-        admin_page()
+    with track_rerun(st.session_state.page, get_metrics_store()):
+        store_admin_token()
+        if st.session_state.page == "form":
+            booking_form_page()
+        elif st.session_state.page == "list":
+            booking_list_page()
+        elif st.session_state.page == "grid":
+            availability_grid_page()
+        elif st.session_state.page == "admin":
+            admin_page()
+        elif st.session_state.page == "analytics":
+            analytics_page()
 
 # Jalankan aplikasi
 if __name__ == "__main__":
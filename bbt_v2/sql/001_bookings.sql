@@ -0,0 +1,20 @@
+-- ─────────────────────────────────────────────────────────────────────────────
+-- Tabel bookings (skema yang dipakai main_v4.py)
+-- Di Supabase tabel ini sudah ada; file ini untuk Postgres lokal pengganti:
+--     for f in sql/*.sql; do psql "$DATABASE_URL" -f "$f"; done
+-- ─────────────────────────────────────────────────────────────────────────────
+create table if not exists bookings (
+    id              bigint generated by default as identity primary key,
+    created_at      timestamptz not null default now(),
+    nama            text not null,
+    subdir          text,
+    floor           text,
+    ruang_meeting   text not null,
+    tanggal_booking date not null,
+    waktu_mulai     time not null,
+    waktu_selesai   time not null,
+    keterangan      text
+);
+
+create index if not exists bookings_ruang_tanggal_idx
+    on bookings (ruang_meeting, tanggal_booking);
@@ -0,0 +1,96 @@
+-- ─────────────────────────────────────────────────────────────────────────────
+-- Insert booking atomik: cek bentrok + insert dalam satu panggilan server.
+--
+-- Di dalam fungsi, advisory lock per (ruang, tanggal) menserialkan pemesan
+-- bersamaan sehingga cek + insert tidak bisa disela. Exclusion constraint
+-- (butuh btree_gist, tersedia di Supabase) menjadi pengaman tambahan untuk
+-- insert langsung ke tabel; di Postgres lokal tanpa btree_gist langkah ini
+-- dilewati. Fungsi book_if_free dipanggil via supabase.rpc() dan
+-- mengembalikan jsonb terstruktur:
+--     {"status": "booked",   "booking":  {...baris baru...}}
+--     {"status": "conflict", "conflict": {"id", "nama", "waktu_mulai", "waktu_selesai"}}
+--     {"status": "invalid",  "message":  "..."}
+--
+-- Bila data lama sudah mengandung bentrok, constraint gagal dibuat. Cari dulu:
+--     select a.id, b.id from bookings a join bookings b
+--       on a.id < b.id and a.ruang_meeting = b.ruang_meeting
+--      and a.tanggal_booking = b.tanggal_booking
+--      and a.waktu_mulai < b.waktu_selesai and b.waktu_mulai < a.waktu_selesai;
+-- ─────────────────────────────────────────────────────────────────────────────
+do $$
+begin
+    create extension if not exists btree_gist;
+    if not exists (
+        select 1 from pg_constraint where conname = 'bookings_no_overlap'
+    ) then
+        alter table bookings add constraint bookings_no_overlap exclude using gist (
+            ruang_meeting with =,
+            tsrange(tanggal_booking + waktu_mulai, tanggal_booking + waktu_selesai, '[)') with &&
+        );
+    end if;
+exception
+    when feature_not_supported or undefined_file then
+        raise notice 'btree_gist tidak tersedia, bookings_no_overlap dilewati';
+end
+$$;
+
+create or replace function book_if_free(
+    p_nama            text,
+    p_subdir          text,
+    p_floor           text,
+    p_ruang_meeting   text,
+    p_tanggal_booking date,
+    p_waktu_mulai     time,
+    p_waktu_selesai   time,
+    p_keterangan      text
+) returns jsonb
+language plpgsql
+as $$
+declare
+    v_booking  bookings;
+    v_conflict bookings;
+begin
+    if p_waktu_mulai >= p_waktu_selesai then
+        return jsonb_build_object(
+            'status', 'invalid',
+            'message', 'Waktu selesai harus lebih besar dari waktu mulai'
+        );
+    end if;
+
+    perform pg_advisory_xact_lock(
+        hashtextextended(p_ruang_meeting || '|' || p_tanggal_booking::text, 0)
+    );
+
+    select * into v_conflict
+      from bookings
+     where ruang_meeting = p_ruang_meeting
+       and tanggal_booking = p_tanggal_booking
+       and waktu_mulai < p_waktu_selesai
+       and waktu_selesai > p_waktu_mulai
+     order by waktu_mulai
+     limit 1;
+    if found then
+        return jsonb_build_object('status', 'conflict', 'conflict', jsonb_build_object(
+            'id', v_conflict.id,
+            'nama', v_conflict.nama,
+            'waktu_mulai', v_conflict.waktu_mulai,
+            'waktu_selesai', v_conflict.waktu_selesai
+        ));
+    end if;
+
+    insert into bookings (
+        nama, subdir, floor, ruang_meeting,
+        tanggal_booking, waktu_mulai, waktu_selesai, keterangan
+    ) values (
+        p_nama, p_subdir, p_floor, p_ruang_meeting,
+        p_tanggal_booking, p_waktu_mulai, p_waktu_selesai, p_keterangan
+    )
+    returning * into v_booking;
+
+    return jsonb_build_object('status', 'booked', 'booking', to_jsonb(v_booking));
+exception
+    when exclusion_violation then
+        -- Insert langsung ke tabel lolos di antara cek dan insert kita
+        return jsonb_build_object('status', 'conflict', 'conflict', null);
+end;
+$$;
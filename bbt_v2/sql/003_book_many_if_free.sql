@@ -0,0 +1,94 @@
+-- ─────────────────────────────────────────────────────────────────────────────
+-- Insert banyak booking (booking berulang) dalam satu panggilan server.
+--
+-- Semua (ruang, tanggal) yang terlibat dikunci sekaligus (urutan tetap agar
+-- tidak deadlock, kunci sama dengan book_if_free), lalu tiap occurrence dicek
+-- dan di-insert berurutan. Occurrence yang bentrok atau tidak valid dilewati,
+-- sisanya tetap tersimpan. Validasi waktu & penanganan exclusion_violation
+-- sama dengan book_if_free (002), per occurrence. Hasil:
+--     {"booked":    [{...baris baru...}, ...],
+--      "conflicts": [{"booking": {...occurrence...}, "conflict": {...} | null}, ...],
+--      "invalid":   [{"booking": {...occurrence...}, "message": "..."}, ...]}
+-- Parameter p_bookings: array jsonb berisi kolom yang sama dengan book_if_free
+-- (tanpa prefix p_).
+-- ─────────────────────────────────────────────────────────────────────────────
+create or replace function book_many_if_free(p_bookings jsonb)
+returns jsonb
+language plpgsql
+as $$
+declare
+    v_key       text;
+    v_item      jsonb;
+    v_new       bookings;
+    v_booking   bookings;
+    v_conflict  bookings;
+    v_booked    jsonb := '[]'::jsonb;
+    v_conflicts jsonb := '[]'::jsonb;
+    v_invalid   jsonb := '[]'::jsonb;
+begin
+    for v_key in
+        select distinct (e ->> 'ruang_meeting') || '|' || ((e ->> 'tanggal_booking')::date)::text
+          from jsonb_array_elements(p_bookings) as e
+         order by 1
+    loop
+        perform pg_advisory_xact_lock(hashtextextended(v_key, 0));
+    end loop;
+
+    for v_item in select * from jsonb_array_elements(p_bookings)
+    loop
+        v_new := jsonb_populate_record(null::bookings, v_item);
+
+        if v_new.waktu_mulai >= v_new.waktu_selesai then
+            v_invalid := v_invalid || jsonb_build_array(jsonb_build_object(
+                'booking', v_item,
+                'message', 'Waktu selesai harus lebih besar dari waktu mulai'
+            ));
+            continue;
+        end if;
+
+        select * into v_conflict
+          from bookings
+         where ruang_meeting = v_new.ruang_meeting
+           and tanggal_booking = v_new.tanggal_booking
+           and waktu_mulai < v_new.waktu_selesai
+           and waktu_selesai > v_new.waktu_mulai
+         order by waktu_mulai
+         limit 1;
+
+        if found then
+            v_conflicts := v_conflicts || jsonb_build_array(jsonb_build_object(
+                'booking', v_item,
+                'conflict', jsonb_build_object(
+                    'id', v_conflict.id,
+                    'nama', v_conflict.nama,
+                    'waktu_mulai', v_conflict.waktu_mulai,
+                    'waktu_selesai', v_conflict.waktu_selesai
+                )
+            ));
+            continue;
+        end if;
+
+        begin
+            insert into bookings (
+                nama, subdir, floor, ruang_meeting,
+                tanggal_booking, waktu_mulai, waktu_selesai, keterangan
+            ) values (
+                v_new.nama, v_new.subdir, v_new.floor, v_new.ruang_meeting,
+                v_new.tanggal_booking, v_new.waktu_mulai, v_new.waktu_selesai, v_new.keterangan
+            )
+            returning * into v_booking;
+        exception
+            when exclusion_violation then
+                -- Insert langsung ke tabel lolos di antara cek dan insert kita
+                v_conflicts := v_conflicts || jsonb_build_array(jsonb_build_object(
+                    'booking', v_item, 'conflict', null
+                ));
+                continue;
+        end;
+
+        v_booked := v_booked || jsonb_build_array(to_jsonb(v_booking));
+    end loop;
+
+    return jsonb_build_object('booked', v_booked, 'conflicts', v_conflicts, 'invalid', v_invalid);
+end;
+$$;
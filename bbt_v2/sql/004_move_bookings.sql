@@ -0,0 +1,84 @@
+-- ─────────────────────────────────────────────────────────────────────────────
+-- Pindah ruang / geser tanggal banyak booking sekaligus (admin).
+--
+-- Semua (ruang, tanggal) tujuan dikunci dengan kunci yang sama seperti
+-- book_if_free. Booking diproses berurutan searah pergeseran (geser maju:
+-- tanggal terakhir dulu) agar satu seri bisa digeser tanpa bentrok dengan
+-- dirinya sendiri. Booking yang bentrok di tujuan dibiarkan di tempat. Hasil:
+--     {"moved":     [{"from": {...lama...}, "to": {...baru...}}, ...],
+--      "conflicts": [{"booking": {...}, "conflict": {...}}, ...]}
+-- ─────────────────────────────────────────────────────────────────────────────
+create or replace function move_bookings(
+    p_ids        bigint[],
+    p_room       text default null,
+    p_shift_days integer default 0
+) returns jsonb
+language plpgsql
+as $$
+declare
+    v_key       text;
+    v_row       bookings;
+    v_moved     bookings;
+    v_conflict  bookings;
+    v_room      text;
+    v_date      date;
+    v_done      jsonb := '[]'::jsonb;
+    v_conflicts jsonb := '[]'::jsonb;
+begin
+    for v_key in
+        select distinct coalesce(p_room, ruang_meeting) || '|' || (tanggal_booking + p_shift_days)::text
+          from bookings
+         where id = any(p_ids)
+         order by 1
+    loop
+        perform pg_advisory_xact_lock(hashtextextended(v_key, 0));
+    end loop;
+
+    for v_row in
+        select * from bookings
+         where id = any(p_ids)
+         order by case when p_shift_days > 0
+                       then date '2000-01-01' - tanggal_booking
+                       else tanggal_booking - date '2000-01-01' end,
+                  waktu_mulai
+           for update
+    loop
+        v_room := coalesce(p_room, v_row.ruang_meeting);
+        v_date := v_row.tanggal_booking + p_shift_days;
+
+        select * into v_conflict
+          from bookings
+         where ruang_meeting = v_room
+           and tanggal_booking = v_date
+           and waktu_mulai < v_row.waktu_selesai
+           and waktu_selesai > v_row.waktu_mulai
+           and id <> v_row.id
+         order by waktu_mulai
+         limit 1;
+
+        if found then
+            v_conflicts := v_conflicts || jsonb_build_array(jsonb_build_object(
+                'booking', to_jsonb(v_row),
+                'conflict', jsonb_build_object(
+                    'id', v_conflict.id,
+                    'nama', v_conflict.nama,
+                    'waktu_mulai', v_conflict.waktu_mulai,
+                    'waktu_selesai', v_conflict.waktu_selesai
+                )
+            ));
+            continue;
+        end if;
+
+        update bookings
+           set ruang_meeting = v_room, tanggal_booking = v_date
+         where id = v_row.id
+        returning * into v_moved;
+
+        v_done := v_done || jsonb_build_array(
+            jsonb_build_object('from', to_jsonb(v_row), 'to', to_jsonb(v_moved))
+        );
+    end loop;
+
+    return jsonb_build_object('moved', v_done, 'conflicts', v_conflicts);
+end;
+$$;
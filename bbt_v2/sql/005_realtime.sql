@@ -0,0 +1,22 @@
+-- ─────────────────────────────────────────────────────────────────────────────
+-- Realtime: kirim perubahan tabel bookings ke listener aplikasi.
+--
+-- REPLICA IDENTITY FULL membuat event DELETE/UPDATE membawa baris lama
+-- lengkap (ruang & tanggal), sehingga listener cukup memperbarui satu
+-- partisi cache. Tanpa ini, event hanya membawa id dan cache dikosongkan.
+-- Publication supabase_realtime hanya ada di Supabase; di Postgres lokal
+-- langkah ini dilewati.
+-- ─────────────────────────────────────────────────────────────────────────────
+alter table bookings replica identity full;
+
+do $$
+begin
+    if exists (select 1 from pg_publication where pubname = 'supabase_realtime')
+       and not exists (
+           select 1 from pg_publication_tables
+            where pubname = 'supabase_realtime' and tablename = 'bookings'
+       ) then
+        alter publication supabase_realtime add table bookings;
+    end if;
+end
+$$;
@@ -0,0 +1,39 @@
+-- ─────────────────────────────────────────────────────────────────────────────
+-- Katalog ruang meeting: lantai, kapasitas, warna kalender dan jam buka.
+-- Aplikasi memuat tabel ini sekali (cache) untuk semua halaman; menambah
+-- ruang/lantai cukup dengan insert baris baru.
+-- ─────────────────────────────────────────────────────────────────────────────
+create table if not exists rooms (
+    id        bigint generated by default as identity primary key,
+    nama      text not null unique,
+    floor     text not null,
+    capacity  integer,
+    color     text not null default '#4ECDC4',
+    jam_buka  time not null default '08:00',
+    jam_tutup time not null default '18:00',
+    aktif     boolean not null default true,
+    check (jam_buka < jam_tutup)
+);
+
+insert into rooms (nama, floor, color) values
+    ('Breakout Traction', '19', '#FF6B6B'),
+    ('Cozy 19.2',         '19', '#4ECDC4')
+on conflict (nama) do nothing;
+
+-- Lantai booking selalu mengikuti katalog, termasuk saat pindah ruang
+create or replace function bookings_floor_from_room() returns trigger
+language plpgsql
+as $$
+begin
+    new.floor := coalesce(
+        (select r.floor from rooms r where r.nama = new.ruang_meeting),
+        new.floor
+    );
+    return new;
+end;
+$$;
+
+drop trigger if exists bookings_floor_from_room on bookings;
+create trigger bookings_floor_from_room
+    before insert or update of ruang_meeting on bookings
+    for each row execute function bookings_floor_from_room();
@@ -0,0 +1,64 @@
+-- ─────────────────────────────────────────────────────────────────────────────
+-- Agregat utilisasi ruang untuk halaman analitik (group-by di server).
+--
+-- Hanya booking dalam [p_start, p_end) yang dibaca (index tanggal di bawah).
+-- Hasil:
+--     {"per_room_week": [{"ruang_meeting", "minggu", "booking", "menit"}, ...],
+--      "per_hour":      [{"hari", "jam", "menit"}, ...],   -- hari: 1=Senin
+--      "per_subdir":    [{"subdir", "booking", "menit"}, ...]}
+-- per_hour berisi menit terpakai yang jatuh di tiap jam (booking 09:30–11:00
+-- menyumbang 30 menit ke jam 9 dan 60 menit ke jam 10).
+-- ─────────────────────────────────────────────────────────────────────────────
+create index if not exists bookings_tanggal_idx
+    on bookings (tanggal_booking);
+
+create or replace function booking_utilization(
+    p_start date,
+    p_end   date
+) returns jsonb
+language sql
+stable
+as $$
+    with periode as (
+        select ruang_meeting,
+               coalesce(nullif(subdir, ''), '(tanpa subdir)') as subdir,
+               tanggal_booking,
+               extract(epoch from waktu_mulai)::int / 60   as mulai,
+               extract(epoch from waktu_selesai)::int / 60 as selesai
+          from bookings
+         where tanggal_booking >= p_start
+           and tanggal_booking < p_end
+           and waktu_selesai > waktu_mulai
+    )
+    select jsonb_build_object(
+        'per_room_week', coalesce((
+            select jsonb_agg(r order by r.ruang_meeting, r.minggu)
+              from (select ruang_meeting,
+                           date_trunc('week', tanggal_booking)::date as minggu,
+                           count(*)              as booking,
+                           sum(selesai - mulai)  as menit
+                      from periode
+                     group by 1, 2) r
+        ), '[]'::jsonb),
+        'per_hour', coalesce((
+            select jsonb_agg(h order by h.hari, h.jam)
+              from (select extract(isodow from p.tanggal_booking)::int as hari,
+                           j.jam,
+                           sum(least(p.selesai, j.jam * 60 + 60)
+                               - greatest(p.mulai, j.jam * 60)) as menit
+                      from periode p
+                      join generate_series(0, 23) as j(jam)
+                        on j.jam * 60 < p.selesai
+                       and j.jam * 60 + 60 > p.mulai
+                     group by 1, 2) h
+        ), '[]'::jsonb),
+        'per_subdir', coalesce((
+            select jsonb_agg(s order by s.menit desc)
+              from (select subdir,
+                           count(*)             as booking,
+                           sum(selesai - mulai) as menit
+                      from periode
+                     group by 1) s
+        ), '[]'::jsonb)
+    );
+$$;
@@ -0,0 +1,106 @@
+-- ─────────────────────────────────────────────────────────────────────────────
+-- Rollup harian per (ruang, tanggal): jumlah booking, menit terpakai, slot
+-- pertama & terakhir. Dipakai tampilan bulan kalender agar cukup membaca
+-- beberapa ratus agregat, bukan semua booking.
+--
+-- Dipelihara inkremental oleh trigger di bookings: INSERT menambah, DELETE
+-- mengurangi, UPDATE = DELETE baris lama + INSERT baris baru. first_start /
+-- last_end hanya dihitung ulang (dari index ruang+tanggal) bila booking yang
+-- dihapus berada di batas hari itu. Menjalankan ulang file ini membangun
+-- ulang isi rollup dari bookings.
+-- ─────────────────────────────────────────────────────────────────────────────
+create table if not exists booking_daily_rollup (
+    tanggal_booking date    not null,
+    ruang_meeting   text    not null,
+    booking_count   integer not null,
+    booked_minutes  integer not null,
+    first_start     time    not null,
+    last_end        time    not null,
+    primary key (tanggal_booking, ruang_meeting)
+);
+
+create or replace function booking_rollup_add(
+    p_room text, p_date date, p_start time, p_end time
+) returns void
+language sql
+as $$
+    insert into booking_daily_rollup as r
+           (tanggal_booking, ruang_meeting, booking_count, booked_minutes, first_start, last_end)
+    values (p_date, p_room, 1, extract(epoch from p_end - p_start)::int / 60, p_start, p_end)
+    on conflict (tanggal_booking, ruang_meeting) do update
+       set booking_count  = r.booking_count + 1,
+           booked_minutes = r.booked_minutes + excluded.booked_minutes,
+           first_start    = least(r.first_start, excluded.first_start),
+           last_end       = greatest(r.last_end, excluded.last_end);
+$$;
+
+create or replace function booking_rollup_remove(
+    p_room text, p_date date, p_start time, p_end time
+) returns void
+language plpgsql
+as $$
+declare
+    v_rollup booking_daily_rollup;
+begin
+    update booking_daily_rollup
+       set booking_count  = booking_count - 1,
+           booked_minutes = booked_minutes - extract(epoch from p_end - p_start)::int / 60
+     where tanggal_booking = p_date and ruang_meeting = p_room
+    returning * into v_rollup;
+
+    if not found then
+        return;
+    elsif v_rollup.booking_count <= 0 then
+        delete from booking_daily_rollup
+         where tanggal_booking = p_date and ruang_meeting = p_room;
+    elsif p_start <= v_rollup.first_start or p_end >= v_rollup.last_end then
+        update booking_daily_rollup r
+           set first_start = b.first_start,
+               last_end    = b.last_end
+          from (select min(waktu_mulai) as first_start, max(waktu_selesai) as last_end
+                  from bookings
+                 where ruang_meeting = p_room and tanggal_booking = p_date) b
+         where r.tanggal_booking = p_date and r.ruang_meeting = p_room;
+    end if;
+end;
+$$;
+
+create or replace function bookings_rollup_trigger() returns trigger
+language plpgsql
+as $$
+begin
+    if tg_op in ('UPDATE', 'DELETE') then
+        perform booking_rollup_remove(
+            old.ruang_meeting, old.tanggal_booking, old.waktu_mulai, old.waktu_selesai
+        );
+    end if;
+    if tg_op in ('INSERT', 'UPDATE') then
+        perform booking_rollup_add(
+            new.ruang_meeting, new.tanggal_booking, new.waktu_mulai, new.waktu_selesai
+        );
+    end if;
+    return null;
+end;
+$$;
+
+drop trigger if exists bookings_rollup on bookings;
+create trigger bookings_rollup
+    after insert or delete on bookings
+    for each row execute function bookings_rollup_trigger();
+
+drop trigger if exists bookings_rollup_update on bookings;
+create trigger bookings_rollup_update
+    after update of ruang_meeting, tanggal_booking, waktu_mulai, waktu_selesai on bookings
+    for each row execute function bookings_rollup_trigger();
+
+-- Bangun ulang dari data yang sudah ada
+truncate booking_daily_rollup;
+insert into booking_daily_rollup
+select tanggal_booking,
+       ruang_meeting,
+       count(*),
+       sum(extract(epoch from waktu_selesai - waktu_mulai)::int / 60),
+       min(waktu_mulai),
+       max(waktu_selesai)
+  from bookings
+ group by tanggal_booking, ruang_meeting;
@@ -0,0 +1,97 @@
+-- ─────────────────────────────────────────────────────────────────────────────
+-- Idempotency key untuk book_if_free (antrean tulis di booking_data.py).
+--
+-- Setiap booking dari form membawa idempotency_key (uuid dari klien) yang
+-- sama di setiap percobaan ulang. Bila key sudah pernah tersimpan, fungsi
+-- mengembalikan baris yang sudah ada dengan "replayed": true alih-alih
+-- insert kedua, sehingga retry setelah timeout tidak menghasilkan booking
+-- ganda. Cek key dilakukan setelah advisory lock (ruang, tanggal) sehingga
+-- dua percobaan bersamaan dengan key sama tetap berurutan; unique index
+-- menjadi pengaman terakhir.
+--
+-- Menggantikan book_if_free dari 002 (signature lama di-drop agar panggilan
+-- tanpa p_idempotency_key tidak ambigu).
+-- ─────────────────────────────────────────────────────────────────────────────
+alter table bookings add column if not exists idempotency_key uuid;
+
+create unique index if not exists bookings_idempotency_key_idx
+    on bookings (idempotency_key);
+
+drop function if exists book_if_free(text, text, text, text, date, time, time, text);
+
+create or replace function book_if_free(
+    p_nama            text,
+    p_subdir          text,
+    p_floor           text,
+    p_ruang_meeting   text,
+    p_tanggal_booking date,
+    p_waktu_mulai     time,
+    p_waktu_selesai   time,
+    p_keterangan      text,
+    p_idempotency_key uuid default null
+) returns jsonb
+language plpgsql
+as $$
+declare
+    v_booking  bookings;
+    v_conflict bookings;
+begin
+    if p_waktu_mulai >= p_waktu_selesai then
+        return jsonb_build_object(
+            'status', 'invalid',
+            'message', 'Waktu selesai harus lebih besar dari waktu mulai'
+        );
+    end if;
+
+    perform pg_advisory_xact_lock(
+        hashtextextended(p_ruang_meeting || '|' || p_tanggal_booking::text, 0)
+    );
+
+    if p_idempotency_key is not null then
+        select * into v_booking from bookings where idempotency_key = p_idempotency_key;
+        if found then
+            return jsonb_build_object(
+                'status', 'booked', 'booking', to_jsonb(v_booking), 'replayed', true
+            );
+        end if;
+    end if;
+
+    select * into v_conflict
+      from bookings
+     where ruang_meeting = p_ruang_meeting
+       and tanggal_booking = p_tanggal_booking
+       and waktu_mulai < p_waktu_selesai
+       and waktu_selesai > p_waktu_mulai
+     order by waktu_mulai
+     limit 1;
+    if found then
+        return jsonb_build_object('status', 'conflict', 'conflict', jsonb_build_object(
+            'id', v_conflict.id,
+            'nama', v_conflict.nama,
+            'waktu_mulai', v_conflict.waktu_mulai,
+            'waktu_selesai', v_conflict.waktu_selesai
+        ));
+    end if;
+
+    insert into bookings (
+        nama, subdir, floor, ruang_meeting,
+        tanggal_booking, waktu_mulai, waktu_selesai, keterangan, idempotency_key
+    ) values (
+        p_nama, p_subdir, p_floor, p_ruang_meeting,
+        p_tanggal_booking, p_waktu_mulai, p_waktu_selesai, p_keterangan, p_idempotency_key
+    )
+    returning * into v_booking;
+
+    return jsonb_build_object('status', 'booked', 'booking', to_jsonb(v_booking));
+exception
+    when exclusion_violation then
+        -- Insert langsung ke tabel lolos di antara cek dan insert kita
+        return jsonb_build_object('status', 'conflict', 'conflict', null);
+    when unique_violation then
+        -- Key yang sama tersimpan lewat jalur lain (mis. ruang/tanggal payload berbeda)
+        select * into v_booking from bookings where idempotency_key = p_idempotency_key;
+        return jsonb_build_object(
+            'status', 'booked', 'booking', to_jsonb(v_booking), 'replayed', true
+        );
+end;
+$$;
@@ -0,0 +1,70 @@
+-- ─────────────────────────────────────────────────────────────────────────────
+-- Sinkron inkremental untuk replika baca SQLite (mode [database] replica,
+-- lihat ReplicaBackend di booking_data.py).
+--
+-- updated_at diisi saat insert dan diperbarui trigger di setiap UPDATE
+-- (termasuk move_bookings), sehingga replika cukup menarik baris dengan
+-- (updated_at, id) setelah cursor terakhirnya. Baris yang dihapus tidak bisa
+-- ditarik dari bookings, jadi trigger DELETE mencatat id-nya di
+-- booking_deletions (tombstone) yang ditarik dengan cara yang sama.
+--
+-- Tombstone disimpan 30 hari; replika yang tertinggal lebih lama dari itu
+-- melakukan sinkron penuh (REPLICA_TOMBSTONE_DAYS di aplikasi).
+-- ─────────────────────────────────────────────────────────────────────────────
+alter table bookings add column if not exists updated_at timestamptz not null default now();
+
+create index if not exists bookings_updated_at_idx
+    on bookings (updated_at, id);
+
+create or replace function bookings_touch_updated_at() returns trigger
+language plpgsql
+as $$
+begin
+    new.updated_at := now();
+    return new;
+end;
+$$;
+
+drop trigger if exists bookings_touch_updated_at on bookings;
+create trigger bookings_touch_updated_at
+    before update on bookings
+    for each row execute function bookings_touch_updated_at();
+
+create table if not exists booking_deletions (
+    id              bigint primary key,
+    ruang_meeting   text not null,
+    tanggal_booking date not null,
+    deleted_at      timestamptz not null default now()
+);
+
+create index if not exists booking_deletions_deleted_at_idx
+    on booking_deletions (deleted_at, id);
+
+create or replace function bookings_record_deletion() returns trigger
+language plpgsql
+as $$
+begin
+    insert into booking_deletions (id, ruang_meeting, tanggal_booking)
+    values (old.id, old.ruang_meeting, old.tanggal_booking)
+    on conflict (id) do update set deleted_at = now();
+    return null;
+end;
+$$;
+
+drop trigger if exists bookings_record_deletion on bookings;
+create trigger bookings_record_deletion
+    after delete on bookings
+    for each row execute function bookings_record_deletion();
+
+-- Pembersihan tombstone lama; pg_cron hanya ada di Supabase / bila dipasang
+do $$
+begin
+    if exists (select 1 from pg_extension where extname = 'pg_cron') then
+        perform cron.schedule(
+            'booking-deletions-prune',
+            '17 3 * * *',
+            $cron$delete from booking_deletions where deleted_at < now() - interval '30 days'$cron$
+        );
+    end if;
+end
+$$;
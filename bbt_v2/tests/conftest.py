@@ -0,0 +1,15 @@
+"""
+Konfigurasi pytest: modul aplikasi (main_v4 dkk.) diimpor dari bbt_v2/.
+
+Jalankan dari folder bbt_v2:
+    python -m pytest -q
+"""
+
+import logging
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# Streamlit bare mode mencatat warning di setiap pemanggilan st.*
+logging.disable(logging.WARNING)
@@ -0,0 +1,103 @@
+from pathlib import Path
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+import main_v4 as app
+
+APP_PATH = str(Path(__file__).resolve().parent.parent / "main_v4.py")
+CONFIG = {"username": "admin", "session_secret": "rahasia-sesi-tes"}
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+    fake = FakeClock()
+    monkeypatch.setattr(app, "monotonic", fake)
+    return fake
+
+def test_lockout_starts_after_free_attempts_and_doubles(clock):
+    throttle = app.LoginThrottle()
+    for _ in range(app.LOGIN_FREE_ATTEMPTS - 1):
+        assert throttle.attempt("10.0.0.1") == (0.0, 0.0)
+
+    lockouts = []
+    for _ in range(4):
+        wait, lockout = throttle.attempt("10.0.0.1")
+        assert wait == 0.0
+        lockouts.append(lockout)
+        # Selama terkunci percobaan ditolak tanpa menambah hitungan
+        assert throttle.attempt("10.0.0.1") == (lockout, 0.0)
+        clock.now += lockout
+    base = app.LOGIN_LOCKOUT_BASE_SECONDS
+    assert lockouts == [base, base * 2, base * 4, base * 8]
+    assert throttle.retry_after("10.0.0.2") == 0.0
+
+def test_lockout_is_capped_and_reset_by_success(clock):
+    throttle = app.LoginThrottle()
+    for _ in range(30):
+        _, lockout = throttle.attempt("10.0.0.1")
+        clock.now += lockout
+    assert lockout == app.LOGIN_LOCKOUT_MAX_SECONDS
+
+    throttle.success("10.0.0.1")
+    assert throttle.retry_after("10.0.0.1") == 0.0
+    assert throttle.attempt("10.0.0.1") == (0.0, 0.0)
+
+def test_admin_token_round_trip():
+    token = app.sign_admin_token(CONFIG, "admin")
+    assert app.verify_admin_token(CONFIG, token) == "admin"
+
+def test_admin_token_rejects_tampering():
+    token = app.sign_admin_token(CONFIG, "admin")
+    payload, signature = token.rsplit(".", 1)
+    forged_payload = app.sign_admin_token(CONFIG, "admin", ttl=10**9).rsplit(".", 1)[0]
+    flipped = signature[:-1] + ("0" if signature[-1] != "0" else "1")
+    for bad in (f"{forged_payload}.{signature}", f"{payload}.{flipped}", payload, "", None):
+        assert app.verify_admin_token(CONFIG, bad) is None
+    assert app.verify_admin_token({**CONFIG, "session_secret": "lain"}, token) is None
+    assert app.verify_admin_token({**CONFIG, "username": "root"}, token) is None
+
+def test_admin_token_expires():
+    assert app.verify_admin_token(CONFIG, app.sign_admin_token(CONFIG, "admin", ttl=-1)) is None
+
+def test_admin_token_requires_session_secret():
+    config = {"username": "admin", "password_hash": "$2b$12$abcdefghijklmnopqrstuv"}
+    assert app.sign_admin_token(config, "admin") is None
+    assert app.verify_admin_token(config, app.sign_admin_token(CONFIG, "admin")) is None
+
+def test_revoked_token_is_rejected_but_other_tokens_are_not():
+    revoked = app.AdminTokenRevocations()
+    token, other = app.sign_admin_token(CONFIG, "admin"), app.sign_admin_token(CONFIG, "admin")
+    revoked.revoke(CONFIG, token)
+    assert app.verify_admin_token(CONFIG, token, revoked) is None
+    assert app.verify_admin_token(CONFIG, other, revoked) == "admin"
+    revoked.revoke(CONFIG, "bukan-token")  # diabaikan
+
+def test_logout_revokes_the_token_for_other_sessions():
+    token = app.sign_admin_token(CONFIG, "admin")
+
+    def admin_session() -> AppTest:
+        at = AppTest.from_file(APP_PATH)
+        at.secrets["admin"] = CONFIG
+        at.session_state["page"] = "admin"
+        at.session_state["admin_authenticated"] = True
+        at.session_state["admin_token"] = token
+        return at
+
+    # Tab kedua memakai token yang sama (mis. cookie yang disalin)
+    other = admin_session()
+    other.session_state["page"] = "analytics"
+    app.st.cache_resource.clear()
+    at = admin_session().run()
+    next(b for b in at.button if b.label == "🚪 Logout").click().run()
+    assert at.session_state["admin_authenticated"] is False
+
+    other.run()
+    assert other.session_state["admin_authenticated"] is False
+    assert [s.value for s in other.subheader] == ["🔐 Admin Login"]
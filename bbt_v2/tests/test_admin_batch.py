@@ -0,0 +1,64 @@
+from datetime import date, timedelta
+
+from streamlit.testing.v1 import AppTest
+
+import booking_data as data
+import main_v4 as app
+
+DAY = date(2026, 3, 2)
+
+def rows(n: int) -> list[dict]:
+    """n booking di DAY, bergantian di dua ruang bawaan dan tiga jam."""
+    return [
+        {
+            "nama": "Budi",
+            "subdir": "Teknologi",
+            "floor": "19",
+            "ruang_meeting": app.DEFAULT_ROOMS[i % 2].nama,
+            "tanggal_booking": str(DAY),
+            "waktu_mulai": f"{8 + i % 3:02d}:00:00",
+            "waktu_selesai": f"{9 + i % 3:02d}:00:00",
+            "keterangan": "",
+        }
+        for i in range(n)
+    ]
+
+def batch_script(path: str) -> None:
+    import streamlit as st
+
+    import booking_data as data
+    import main_v4 as app
+
+    repo = data.BookingRepository(data.SqliteBackend(path))
+    app.admin_batch_actions(repo, st.session_state.selected)
+
+def batch_app(path: str, selected: list[dict]) -> AppTest:
+    at = AppTest.from_function(batch_script, args=(path,))
+    at.session_state["selected"] = selected
+    return at.run()
+
+def test_batch_delete_removes_only_the_selected_ids(tmp_path):
+    path = str(tmp_path / "bookings.db")
+    backend = data.SqliteBackend(path)
+    backend.book_many_if_free(rows(6))
+    at = batch_app(path, [{"id": 2}, {"id": 5}])
+    next(b for b in at.button if b.label == "🗑️ Hapus Terpilih").click().run()
+    assert at.session_state["admin_flash"] == ("success", "2 booking dihapus")
+    assert sorted(r["id"] for r in backend.select_range(DAY, DAY + timedelta(days=7))) == [1, 3, 4, 6]
+
+def test_batch_move_shifts_the_selected_ids_and_reports_conflicts(tmp_path):
+    path = str(tmp_path / "bookings.db")
+    backend = data.SqliteBackend(path)
+    backend.book_many_if_free(rows(6))
+    # Sudah ada booking sehari kemudian di ruang & jam yang sama dengan id 3
+    blocker = {**rows(3)[2], "tanggal_booking": str(DAY + timedelta(days=1))}
+    assert backend.book_if_free(blocker)["status"] == "booked"
+
+    at = batch_app(path, [{"id": 1}, {"id": 3}])
+    at.number_input(key="admin_shift").set_value(1)
+    next(b for b in at.button if b.label == "🔀 Pindahkan Terpilih").click().run()
+    level, message = at.session_state["admin_flash"]
+    assert level == "warning" and message.startswith("1 booking dipindahkan") and "#3" in message
+    days = {r["id"]: r["tanggal_booking"] for r in backend.select_range(DAY, DAY + timedelta(days=7))}
+    assert days[1] == str(DAY + timedelta(days=1)) and days[3] == str(DAY)
+    assert days[2] == str(DAY)  # tidak dipilih
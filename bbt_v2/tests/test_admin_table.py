@@ -0,0 +1,82 @@
+from datetime import date, timedelta
+
+import pytest
+
+import benchmark as bench
+import booking_data as data
+import main_v4 as app
+
+DAY = date(2026, 3, 2)
+NAMES = ["Budi", "Sari", "Budi", "Andi"]
+
+def rows(n: int) -> list[dict]:
+    """Banyak booking dengan tanggal, waktu dan nama yang sama: urutan ditentukan id."""
+    return [
+        {
+            "nama": NAMES[i % len(NAMES)],
+            "subdir": "Teknologi",
+            "floor": "19",
+            "ruang_meeting": app.DEFAULT_ROOMS[i % 2].nama,
+            "tanggal_booking": str(DAY + timedelta(days=i // 6)),
+            "waktu_mulai": f"{8 + i % 3:02d}:00:00",
+            "waktu_selesai": f"{9 + i % 3:02d}:00:00",
+            "keterangan": "",
+        }
+        for i in range(n)
+    ]
+
+@pytest.fixture(params=["sqlite", "supabase"])
+def repo(request, tmp_path) -> data.BookingRepository:
+    if request.param == "sqlite":
+        backend = data.SqliteBackend(str(tmp_path / "bookings.db"))
+    else:
+        backend = data.SupabaseBackend(bench.FakeSupabase())
+    result = backend.book_many_if_free(rows(23))
+    assert len(result["booked"]) == 23
+    return data.BookingRepository(backend)
+
+def walk(repo, sort_col: str, desc: bool, filters: dict | None = None) -> list[list[int]]:
+    """Halaman berturut-turut seperti tombol "Berikutnya", dengan tumpukan cursor yang sama."""
+    filters = filters or {}
+    cursors, pages = [None], []
+    while True:
+        page, has_next, _ = app.fetch_admin_page(repo, filters, sort_col, desc, cursors[-1], page_rows=5)
+        pages.append([row["id"] for row in page])
+        if not has_next:
+            return pages
+        cursors.append((page[-1][sort_col], page[-1]["id"]))
+
+@pytest.mark.parametrize("sort_col", ["tanggal_booking", "nama", "ruang_meeting", "id"])
+@pytest.mark.parametrize("desc", [False, True])
+def test_keyset_pages_cover_every_row_once_with_ties_broken_on_id(repo, sort_col, desc):
+    everything, _ = repo.page(app.ADMIN_COLUMNS, {}, "id", False, None, 100)
+    expected = [
+        row["id"]
+        for row in sorted(
+            sorted(everything, key=lambda r: r["id"], reverse=desc), key=lambda r: r[sort_col], reverse=desc
+        )
+    ]
+    pages = walk(repo, sort_col, desc)
+    assert [len(p) for p in pages] == [5, 5, 5, 5, 3]
+    assert [i for page in pages for i in page] == expected
+
+def test_going_back_returns_the_same_pages(repo):
+    cursors, forward = [None], []
+    while True:
+        page, has_next, _ = app.fetch_admin_page(repo, {}, "nama", True, cursors[-1], page_rows=5)
+        forward.append(page)
+        if not has_next:
+            break
+        cursors.append((page[-1]["nama"], page[-1]["id"]))
+    # "◀ Sebelumnya": buang cursor terakhir lalu query ulang dengan cursor sebelumnya
+    while len(cursors) > 1:
+        cursors.pop()
+        page, has_next, _ = app.fetch_admin_page(repo, {}, "nama", True, cursors[-1], page_rows=5)
+        assert page == forward[len(cursors) - 1] and has_next
+
+def test_filters_apply_before_paging(repo):
+    room = app.DEFAULT_ROOMS[0].nama
+    pages = walk(repo, "tanggal_booking", False, {"room": room, "name": "bud"})
+    ids = [i for page in pages for i in page]
+    everything, _ = repo.page(app.ADMIN_COLUMNS, {}, "id", False, None, 100)
+    assert ids == [r["id"] for r in everything if r["ruang_meeting"] == room and r["nama"] == "Budi"]
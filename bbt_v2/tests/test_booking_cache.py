@@ -0,0 +1,115 @@
+from datetime import date, time, timedelta
+
+import pytest
+
+import booking_data as data
+
+DAY = date(2026, 3, 2)
+
+def booking(booking_id: int, room: str, day: date, start: str = "09:00:00", end: str = "10:00:00") -> dict:
+    return {
+        "id": booking_id,
+        "nama": f"Pemesan {booking_id}",
+        "subdir": "Teknologi",
+        "floor": "1",
+        "ruang_meeting": room,
+        "tanggal_booking": str(day),
+        "waktu_mulai": start,
+        "waktu_selesai": end,
+        "keterangan": "Rapat mingguan tim",
+    }
+
+class FakeClock:
+    """Pengganti monotonic() yang bisa dimajukan manual."""
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+    fake = FakeClock()
+    monkeypatch.setattr(data, "monotonic", fake)
+    return fake
+
+def test_partitions_and_full_days_expire_after_ttl(clock):
+    cache = data.BookingCache(ttl=60)
+    cache.put_days(DAY, DAY + timedelta(days=1), [booking(1, "Ruang A", DAY)])
+    cache.put_room_day("Ruang B", DAY + timedelta(days=1), [booking(2, "Ruang B", DAY + timedelta(days=1))])
+
+    clock.now += 59
+    assert [r.id for r in cache.get_window(DAY, DAY + timedelta(days=1))] == [1]
+    assert cache.get_index("Ruang C", DAY) is data.EMPTY_ROOM_DAY
+    assert [r.id for r in cache.get_room_day("Ruang B", DAY + timedelta(days=1))] == [2]
+
+    clock.now += 1
+    assert cache.get_window(DAY, DAY + timedelta(days=1)) is None
+    assert cache.get_index("Ruang A", DAY) is None
+    assert cache.get_index("Ruang C", DAY) is None
+    assert cache.get_room_day("Ruang B", DAY + timedelta(days=1)) is None
+    assert cache.missing_days(DAY, DAY + timedelta(days=2)) == [DAY, DAY + timedelta(days=1)]
+
+def test_lru_eviction_keeps_recently_read_partitions():
+    cache = data.BookingCache(ttl=3600, max_partitions=2)
+    cache.put_room_day("Ruang A", DAY, [booking(1, "Ruang A", DAY)])
+    cache.put_room_day("Ruang B", DAY, [booking(2, "Ruang B", DAY)])
+    assert cache.get_index("Ruang A", DAY) is not None  # A jadi paling baru dipakai
+
+    cache.put_room_day("Ruang C", DAY, [booking(3, "Ruang C", DAY)])
+    assert cache.get_index("Ruang B", DAY) is None
+    assert [r.id for r in cache.get_room_day("Ruang A", DAY)] == [1]
+    assert [r.id for r in cache.get_room_day("Ruang C", DAY)] == [3]
+
+def test_apply_insert_and_delete_update_loaded_days_only():
+    cache = data.BookingCache(ttl=3600)
+    cache.put_days(DAY, DAY + timedelta(days=1), [booking(1, "Ruang A", DAY)])
+
+    cache.apply_insert(booking(2, "Ruang B", DAY, "13:00:00", "14:00:00"))
+    cache.apply_insert(booking(2, "Ruang B", DAY, "13:00:00", "14:00:00"))  # idempoten
+    cache.apply_insert(booking(3, "Ruang A", DAY + timedelta(days=5)))  # tanggal belum dimuat
+    assert sorted(r.id for r in cache.get_window(DAY, DAY + timedelta(days=1))) == [1, 2]
+    assert cache.get_index("Ruang A", DAY + timedelta(days=5)) is None
+
+    cache.apply_delete("Ruang A", DAY, 1)
+    assert [r.id for r in cache.get_window(DAY, DAY + timedelta(days=1))] == [2]
+    assert cache.get_index("Ruang A", DAY) is not None and len(cache.get_index("Ruang A", DAY)) == 0
+
+def test_invalidate_and_clear_force_a_reload():
+    cache = data.BookingCache(ttl=3600)
+    rows = [booking(1, "Ruang A", DAY), booking(2, "Ruang A", DAY + timedelta(days=1))]
+    cache.put_days(DAY, DAY + timedelta(days=2), rows)
+    cache.rollups.put_days(DAY, DAY + timedelta(days=2), [])
+
+    cache.invalidate("Ruang A", DAY)
+    assert cache.get_index("Ruang A", DAY) is None
+    assert cache.missing_days(DAY, DAY + timedelta(days=2)) == [DAY]
+    assert cache.rollups.missing_days(DAY, DAY + timedelta(days=2)) == [DAY]
+
+    cache.clear()
+    assert cache.missing_days(DAY, DAY + timedelta(days=2)) == [DAY, DAY + timedelta(days=1)]
+    assert cache.get_index("Ruang A", DAY + timedelta(days=1)) is None
+
+def test_put_days_beyond_capacity_never_reports_evicted_partitions_as_empty():
+    cache = data.BookingCache(ttl=3600, max_partitions=10)
+    rows = [booking(i, f"Ruang {i % 7}", DAY + timedelta(days=i // 7)) for i in range(21)]
+    cache.put_days(DAY, DAY + timedelta(days=3), rows)
+
+    window = cache.get_window(DAY, DAY + timedelta(days=3))
+    assert window is None or len(window) == 21
+    for row in rows:
+        index = cache.get_index(row["ruang_meeting"], date.fromisoformat(row["tanggal_booking"]))
+        assert index is None or [r.id for r in index.bookings] == [row["id"]]
+
+def test_repository_window_and_conflicts_survive_cache_eviction(tmp_path):
+    backend = data.SqliteBackend(str(tmp_path / "bookings.db"))
+    rows = [booking(i, f"Ruang {i % 7}", DAY + timedelta(days=i // 7)) for i in range(21)]
+    for row in rows:
+        assert backend.book_if_free({k: v for k, v in row.items() if k != "id"})["status"] == "booked"
+    repo = data.BookingRepository(backend, data.BookingCache(ttl=3600, max_partitions=10))
+
+    assert len(repo.bookings_window(DAY, DAY + timedelta(days=3))) == 21
+    for row in rows:
+        day = date.fromisoformat(row["tanggal_booking"])
+        assert repo.find_conflict(row["ruang_meeting"], day, time(9, 30), time(9, 45)) is not None
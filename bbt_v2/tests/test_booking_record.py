@@ -0,0 +1,27 @@
+import booking_data as data
+
+ROW = {
+    "id": 7,
+    "nama": "Budi Santoso",
+    "subdir": "Teknologi",
+    "floor": "3",
+    "ruang_meeting": "Ruang A",
+    "tanggal_booking": "2026-03-02",
+    "waktu_mulai": "09:15:00",
+    "waktu_selesai": "10:45:30",
+    "keterangan": None,
+}
+
+def test_record_round_trips_the_result_data_shape():
+    record = data.BookingRecord.from_row(ROW)
+    assert (record.day, record.start, record.end) == (data.date(2026, 3, 2).toordinal(), 555, 645)
+    assert record.to_dict() == {**ROW, "waktu_selesai": "10:45:00", "keterangan": ""}
+    assert record["ruang_meeting"] == "Ruang A" and record.get("tidak_ada", "-") == "-"
+    assert data.BookingRecord.from_row(record) is record
+    assert not hasattr(record, "__dict__")
+
+def test_category_values_are_shared_between_records():
+    # String baru (bukan literal) agar tidak kebetulan sama objeknya
+    first = data.BookingRecord.from_row({**ROW, "ruang_meeting": "".join(["Ruang ", "A"])})
+    second = data.BookingRecord.from_row({**ROW, "id": 8, "ruang_meeting": "".join(["Ruang ", "A"])})
+    assert first.room is second.room
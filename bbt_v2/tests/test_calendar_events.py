@@ -0,0 +1,56 @@
+from datetime import date, timedelta
+
+import booking_data as data
+import main_v4 as app
+
+DAY = date(2026, 3, 2)
+
+class WindowRepo:
+    """bookings_window dari daftar baris yang bisa diganti."""
+
+    def __init__(self, rows: list[dict]) -> None:
+        self.rows = rows
+
+    def bookings_window(self, start: date, end: date) -> list[data.BookingRecord]:
+        return [data.BookingRecord.from_row(row) for row in self.rows]
+
+def row(**values) -> dict:
+    return {
+        "id": 1,
+        "nama": "Budi Santoso",
+        "subdir": "Teknologi",
+        "floor": "3",
+        "ruang_meeting": "Ruang A",
+        "tanggal_booking": str(DAY),
+        "waktu_mulai": "09:00:00",
+        "waktu_selesai": "10:00:00",
+        "keterangan": "Rapat mingguan tim",
+        **values,
+    }
+
+def test_window_signature_changes_when_any_rendered_field_changes():
+    app.st.session_state.clear()
+    repo = WindowRepo([row()])
+    end = DAY + timedelta(days=7)
+    assert app.fetch_bookings_window(repo, DAY, end)[1] is True
+    assert app.fetch_bookings_window(repo, DAY, end)[1] is False
+
+    signatures = {app.st.session_state.booking_window}
+    for change in ({"nama": "Sari Dewi"}, {"subdir": "SDM"}, {"floor": "5"}, {"keterangan": "Rapat anggaran"}):
+        repo.rows = [row(**change)]
+        assert app.fetch_bookings_window(repo, DAY, end)[1] is True, change
+        signatures.add(app.st.session_state.booking_window)
+    assert len(signatures) == 5
+
+def test_event_memo_rebuilds_after_a_title_only_edit():
+    app.st.session_state.clear()
+    memo = app.CalendarEventMemo()
+    end = DAY + timedelta(days=7)
+    titles = []
+    for name in ("Budi Santoso", "Sari Dewi"):
+        rows, _ = app.fetch_bookings_window(WindowRepo([row(nama=name)]), DAY, end)
+        events = memo.get_or_build(
+            (False, app.st.session_state.booking_window), lambda: app.build_calendar_events(rows, {})
+        )
+        titles.append(events[0]["title"])
+    assert titles == ["Budi Santoso - Ruang A", "Sari Dewi - Ruang A"]
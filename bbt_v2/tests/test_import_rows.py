@@ -0,0 +1,81 @@
+import io
+from datetime import datetime, time
+
+import main_v4 as app
+
+def raw_row(**values) -> dict:
+    row = {
+        "nama": "Budi Santoso",
+        "subdir": " Teknologi ",
+        "floor": "",
+        "ruang_meeting": "Ruang A",
+        "tanggal_booking": "2026-03-02",
+        "waktu_mulai": "09:00",
+        "waktu_selesai": "10:30:45",
+        "keterangan": None,
+    }
+    row.update(values)
+    return row
+
+CATALOG = app.RoomCatalog([app.Room("Ruang A", "3"), app.Room("Ruang B", "5")])
+
+def test_normalize_import_row_cleans_values_and_takes_floor_from_catalog():
+    booking, message = app.normalize_import_row(raw_row(), CATALOG)
+    assert message == ""
+    assert booking == {
+        "nama": "Budi Santoso",
+        "subdir": "Teknologi",
+        "floor": "3",
+        "ruang_meeting": "Ruang A",
+        "tanggal_booking": "2026-03-02",
+        "waktu_mulai": "09:00:00",
+        "waktu_selesai": "10:30:00",
+        "keterangan": "",
+    }
+
+def test_normalize_import_row_accepts_excel_cell_types():
+    booking, _ = app.normalize_import_row(
+        raw_row(tanggal_booking=datetime(2026, 3, 2, 0, 0), waktu_mulai=time(13, 15), waktu_selesai=time(14, 0)),
+        CATALOG,
+    )
+    assert (booking["tanggal_booking"], booking["waktu_mulai"], booking["waktu_selesai"]) == (
+        "2026-03-02",
+        "13:15:00",
+        "14:00:00",
+    )
+
+def test_normalize_import_row_rejects_invalid_rows():
+    cases = {
+        "Kolom tidak ada": {k: v for k, v in raw_row().items() if k != "keterangan"},
+        "Format tanggal/waktu tidak valid": raw_row(tanggal_booking="02/03/2026"),
+        "Nama hanya boleh": raw_row(nama="Budi123"),
+        "Waktu selesai harus lebih besar": raw_row(waktu_mulai="10:00", waktu_selesai="10:00"),
+        "Ruang meeting tidak dikenal": raw_row(ruang_meeting="Ruang Z"),
+    }
+    for expected, row in cases.items():
+        booking, message = app.normalize_import_row(row, CATALOG)
+        assert booking is None
+        assert message.startswith(expected), (expected, message)
+
+def test_import_bookings_reports_file_line_numbers(tmp_path):
+    room = app.DEFAULT_ROOMS[0].nama
+    repo = app.BookingRepository(app.SqliteBackend(str(tmp_path / "bookings.db")))
+    existing, _ = app.normalize_import_row(
+        raw_row(ruang_meeting=room, waktu_mulai="13:00", waktu_selesai="14:00"), app.RoomCatalog(app.DEFAULT_ROOMS)
+    )
+    assert repo.book_if_free(existing)["status"] == "booked"
+
+    lines = [
+        ",".join(app.BOOKING_COLUMNS),
+        f"Budi Santoso,Teknologi,,{room},2026-03-02,09:00,10:00,",    # 2: masuk
+        f"Budi Santoso,Teknologi,,{room},2026-03-02,09:30,10:30,",    # 3: bentrok baris 2
+        f"Budi123,Teknologi,,{room},2026-03-03,09:00,10:00,",         # 4: nama tidak valid
+        f"Sari Dewi,SDM,,{room},2026-03-02,13:30,14:30,",             # 5: bentrok booking lama
+        f"Sari Dewi,SDM,,{room},2026-03-03,09:00,10:00,",             # 6: masuk
+    ]
+    upload = io.BytesIO("\n".join(lines).encode())
+    upload.name = "bookings.csv"
+    summary = app.import_bookings(repo, upload)
+    assert summary["inserted"] == 2
+    assert [line for line, _ in summary["invalid"]] == [4]
+    assert [line for line, _ in summary["conflicts"]] == [3, 5]
@@ -0,0 +1,36 @@
+import logging
+
+import pytest
+
+import booking_data as data
+import main_v4 as app
+
+@pytest.fixture(autouse=True)
+def fresh_counter(monkeypatch):
+    monkeypatch.setattr(data, "_rerun_counter", iter(range(1000)))
+
+def run_reruns(count: int) -> list[dict]:
+    store = data.MetricsStore()
+    for _ in range(count):
+        with data.track_rerun("tes", store):
+            data.record_query("sqlite:select_range", 2.0, [{"id": 1}, {"id": 2}])
+            data.record_payload("events", [{"id": 1}])
+    return store.records()
+
+def test_counts_every_rerun_and_sizes_only_sampled_ones():
+    records = run_reruns(data.METRICS_BYTES_SAMPLE_EVERY + 1)
+    assert all(r["rows"] == 2 and r["payload"] == {"events": 1} for r in records)
+    sampled = [i for i, r in enumerate(records) if r["bytes"] is not None]
+    assert sampled == [0, data.METRICS_BYTES_SAMPLE_EVERY]
+    assert records[0]["bytes"] == len('[{"id": 1}, {"id": 2}]')
+    assert records[0]["payload_bytes"] == {"events": len('[{"id": 1}]')}
+    assert records[1]["payload_bytes"] is None
+
+def test_debug_logging_sizes_every_rerun(monkeypatch):
+    monkeypatch.setattr(data.metrics_log, "isEnabledFor", lambda level: level == logging.DEBUG)
+    assert all(r["bytes"] is not None for r in run_reruns(3))
+
+def test_latency_summary_ignores_unsampled_sizes():
+    pages, _ = app.latency_summary(run_reruns(4))
+    assert pages.loc["tes", "rerun"] == 4
+    assert pages.loc["tes", "kb"] == pytest.approx(len('[{"id": 1}, {"id": 2}]') / 1024)
@@ -0,0 +1,46 @@
+from datetime import date, timedelta
+from unittest.mock import patch
+
+import pytest
+
+import booking_data as data
+
+DAY = date(2026, 3, 2)
+
+class StuckRunner:
+    def run(self, coro, timeout: float):
+        coro.close()
+        raise TimeoutError("runner macet")
+
+@pytest.fixture
+def repo(tmp_path) -> data.BookingRepository:
+    backend = data.SqliteBackend(str(tmp_path / "bookings.db"))
+    backend.book_if_free(
+        {
+            "nama": "Budi Santoso",
+            "subdir": "Teknologi",
+            "floor": "3",
+            "ruang_meeting": "Ruang A",
+            "tanggal_booking": str(DAY),
+            "waktu_mulai": "09:00:00",
+            "waktu_selesai": "10:00:00",
+            "keterangan": "",
+        }
+    )
+    return data.BookingRepository(backend)
+
+def test_prefetch_fills_the_rerun_memo(repo):
+    with data.track_rerun("tes", data.MetricsStore()) as record:
+        repo.prefetch(repo.plan_bookings_window(DAY, DAY + timedelta(days=1)), repo.plan_rooms())
+        assert record["queries"] == 2
+        assert len(repo.bookings_window(DAY, DAY + timedelta(days=1))) == 1
+        assert record["queries"] == 2
+
+def test_prefetch_runner_failure_falls_back_to_sync_reads(repo):
+    with data.track_rerun("tes", data.MetricsStore()) as record, patch.object(
+        data, "get_async_runner", StuckRunner
+    ):
+        repo.prefetch(repo.plan_bookings_window(DAY, DAY + timedelta(days=1)))
+        assert record["queries"] == 0
+        assert len(repo.bookings_window(DAY, DAY + timedelta(days=1))) == 1
+        assert record["queries"] == 1
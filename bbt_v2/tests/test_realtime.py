@@ -0,0 +1,72 @@
+from datetime import date, timedelta
+
+import pytest
+
+import booking_data as data
+
+DAY = date(2026, 3, 2)
+
+def booking(booking_id: int, room: str = "Ruang A", day: date = DAY, start: str = "09:00:00") -> dict:
+    return {
+        "id": booking_id,
+        "nama": f"Pemesan {booking_id}",
+        "subdir": "Teknologi",
+        "floor": "3",
+        "ruang_meeting": room,
+        "tanggal_booking": str(day),
+        "waktu_mulai": start,
+        "waktu_selesai": f"{int(start[:2]) + 1:02d}:00:00",
+        "keterangan": "",
+    }
+
+@pytest.fixture
+def feed():
+    hub = data.BookingChangeHub(data.BookingCache(ttl=3600))
+    hub.cache.put_days(DAY, DAY + timedelta(days=2), [booking(1), booking(2, "Ruang B")])
+    hub.cache.rollups.put_days(DAY, DAY + timedelta(days=3), [])
+    feed = data.LocalChangeFeed()
+    listener = data.RealtimeListener(hub, feed).start()
+    yield hub, feed
+    listener.stop()
+    assert not hub.connected
+
+def ids(hub: data.BookingChangeHub, room: str, day: date = DAY) -> list[int]:
+    return sorted(r.id for r in hub.cache.get_room_day(room, day))
+
+def test_insert_update_and_delete_patch_the_cache_and_bump_the_version(feed):
+    hub, feed = feed
+    assert hub.connected
+    version = hub.version
+
+    feed.publish({"type": "INSERT", "record": booking(3, start="13:00:00")})
+    feed.join()
+    assert ids(hub, "Ruang A") == [1, 3]
+    assert hub.version == version + 1  # sesi yang menyimpan versi lama tahu harus render ulang
+
+    moved = booking(1, "Ruang B", DAY + timedelta(days=1))
+    feed.publish({"type": "UPDATE", "record": moved, "old_record": booking(1)})
+    feed.publish({"type": "DELETE", "old_record": booking(2, "Ruang B")})
+    feed.join()
+    assert ids(hub, "Ruang A") == [3]
+    assert ids(hub, "Ruang B") == []
+    assert ids(hub, "Ruang B", DAY + timedelta(days=1)) == [1]
+    assert hub.version == version + 3
+    # Rollup tanggal yang berubah ikut dibuang agar dimuat ulang
+    assert hub.cache.rollups.missing_days(DAY, DAY + timedelta(days=3)) == [DAY, DAY + timedelta(days=1)]
+
+def test_changes_outside_loaded_days_are_not_cached(feed):
+    hub, feed = feed
+    later = DAY + timedelta(days=30)
+    feed.publish({"type": "INSERT", "record": booking(9, day=later)})
+    feed.join()
+    assert hub.cache.get_index("Ruang A", later) is None
+    assert ids(hub, "Ruang A") == [1]
+
+def test_delete_without_old_row_clears_the_cache(feed):
+    hub, feed = feed
+    version = hub.version
+    # Tanpa REPLICA IDENTITY FULL Supabase hanya mengirim id
+    feed.publish({"type": "DELETE", "old_record": {"id": 1}})
+    feed.join()
+    assert hub.cache.missing_days(DAY, DAY + timedelta(days=2)) == [DAY, DAY + timedelta(days=1)]
+    assert hub.version == version + 1
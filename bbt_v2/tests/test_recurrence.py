@@ -0,0 +1,51 @@
+from datetime import date, timedelta
+
+import main_v4 as app
+
+MONDAY = date(2026, 3, 2)
+
+def test_daily_recurrence_respects_interval_and_until():
+    dates = app.expand_recurrence(MONDAY, MONDAY + timedelta(days=6), "DAILY", interval=2)
+    assert dates == [MONDAY + timedelta(days=d) for d in (0, 2, 4, 6)]
+
+def test_weekly_recurrence_uses_weekdays_or_the_first_day():
+    two_weeks = MONDAY + timedelta(days=13)
+    assert app.expand_recurrence(MONDAY, two_weeks, "WEEKLY", weekdays=[0, 2]) == [
+        MONDAY,
+        MONDAY + timedelta(days=2),
+        MONDAY + timedelta(days=7),
+        MONDAY + timedelta(days=9),
+    ]
+    assert app.expand_recurrence(MONDAY, two_weeks, "WEEKLY") == [MONDAY, MONDAY + timedelta(days=7)]
+    # INTERVAL=2 dihitung dari minggu tanggal pertama
+    assert app.expand_recurrence(MONDAY, MONDAY + timedelta(days=27), "WEEKLY", interval=2) == [
+        MONDAY,
+        MONDAY + timedelta(days=14),
+    ]
+
+def test_recurrence_stops_one_past_the_occurrence_cap():
+    until = MONDAY + timedelta(days=365 * 5)
+    dates = app.expand_recurrence(MONDAY, until, "DAILY")
+    assert len(dates) == app.MAX_OCCURRENCES + 1  # seri terpotong → ditolak pemanggil
+    exact = app.expand_recurrence(MONDAY, MONDAY + timedelta(days=app.MAX_OCCURRENCES - 1), "DAILY")
+    assert len(exact) == app.MAX_OCCURRENCES
+
+def test_book_recurring_books_free_dates_and_reports_the_rest(tmp_path):
+    repo = app.BookingRepository(app.SqliteBackend(str(tmp_path / "bookings.db")))
+    base = {
+        "nama": "Budi Santoso",
+        "subdir": "Teknologi",
+        "floor": "3",
+        "ruang_meeting": "Ruang A",
+        "waktu_mulai": "09:00:00",
+        "waktu_selesai": "10:00:00",
+        "keterangan": "",
+    }
+    taken = MONDAY + timedelta(days=7)
+    assert repo.book_if_free({**base, "tanggal_booking": str(taken)})["status"] == "booked"
+
+    dates = app.expand_recurrence(MONDAY, MONDAY + timedelta(days=20), "WEEKLY")
+    outcome = app.book_recurring(repo, base, dates)
+    assert [row["tanggal_booking"] for row in outcome["booked"]] == [str(MONDAY), str(MONDAY + timedelta(days=14))]
+    assert [item["booking"]["tanggal_booking"] for item in outcome["conflicts"]] == [str(taken)]
+    assert outcome["invalid"] == []
@@ -0,0 +1,110 @@
+from datetime import date, timedelta
+
+import pytest
+
+import benchmark as bench
+import booking_data as data
+
+def test_only_upstream_backends_can_feed_a_replica(tmp_path):
+    local = data.SqliteReplica(str(tmp_path / "replica.db"))
+    sqlite = data.SqliteBackend(str(tmp_path / "bookings.db"))
+    assert not isinstance(sqlite, data.UpstreamBackend)
+    with pytest.raises(TypeError):
+        data.ReplicaSyncFeed(sqlite, local)
+    with pytest.raises(TypeError):
+        data.ReplicaBackend(sqlite, local)
+
+    upstream = data.SupabaseBackend(bench.FakeSupabase())
+    data.ReplicaSyncFeed(upstream, local)
+    data.ReplicaBackend(upstream, local)
+
+DAY = date(2026, 3, 2)
+
+def seed(n: int) -> list[dict]:
+    return [
+        {
+            "id": i,
+            "nama": f"Pemesan {i}",
+            "subdir": "Teknologi",
+            "floor": "3",
+            "ruang_meeting": "Ruang A",
+            "tanggal_booking": str(DAY + timedelta(days=i)),
+            "waktu_mulai": "09:00:00",
+            "waktu_selesai": "10:00:00",
+            "keterangan": "",
+        }
+        for i in range(1, n + 1)
+    ]
+
+@pytest.fixture
+def replica(tmp_path):
+    fake = bench.FakeSupabase(seed(5))
+    local = data.SqliteReplica(str(tmp_path / "replica.db"))
+    hub = data.BookingChangeHub(data.BookingCache(ttl=3600))
+    return fake, local, hub, data.ReplicaSyncFeed(data.SupabaseBackend(fake), local)
+
+def local_rows(local: data.SqliteReplica) -> dict[int, dict]:
+    return {row["id"]: row for row in local.select_range(DAY, DAY + timedelta(days=365))}
+
+def test_first_pull_is_a_full_sync(replica):
+    fake, local, hub, feed = replica
+    assert not local.ready
+    feed.pull(hub)
+    assert local.ready
+    assert sorted(local_rows(local)) == [1, 2, 3, 4, 5]
+    assert local.cursor("bookings") == (bench.SEED_UPDATED_AT, 5)
+    assert hub.version == 1  # satu reset, bukan satu event per baris
+
+def test_incremental_pulls_apply_insert_update_and_delete_once(replica):
+    fake, local, hub, feed = replica
+    feed.pull(hub)
+    hub.cache.put_days(DAY, DAY + timedelta(days=10), list(local_rows(local).values()))
+
+    booking = {**seed(1)[0], "waktu_mulai": "13:00:00", "waktu_selesai": "14:00:00"}
+    del booking["id"]
+    inserted = fake.rpc_book_if_free(**{f"p_{k}": v for k, v in booking.items()})["booking"]
+    fake.rpc_move_bookings([2], p_room="Ruang B")
+    fake.delete_rows("bookings", [row for row in fake.rows if row["id"] == 3])
+    version = hub.version
+    feed.pull(hub)
+
+    rows = local_rows(local)
+    assert sorted(rows) == [1, 2, 4, 5, inserted["id"]]
+    assert rows[2]["ruang_meeting"] == "Ruang B"
+    assert hub.version - version == 3
+    day2, day3 = DAY + timedelta(days=2), DAY + timedelta(days=3)
+    assert [r.id for r in hub.cache.get_room_day("Ruang B", day2)] == [2]
+    assert len(hub.cache.get_room_day("Ruang A", day2)) == 0
+    assert len(hub.cache.get_room_day("Ruang A", day3)) == 0
+    assert sorted(r.id for r in hub.cache.get_room_day("Ruang A", DAY + timedelta(days=1))) == [1, inserted["id"]]
+
+    # Baris baru masih di dalam jendela overlap: dibaca ulang, tapi tidak jadi event lagi
+    assert local.cursor("bookings") == (bench.SEED_UPDATED_AT, 5)
+    version = hub.version
+    feed.pull(hub)
+    assert hub.version == version
+    assert sorted(local_rows(local)) == [1, 2, 4, 5, inserted["id"]]
+
+def test_catch_up_after_a_gap_pages_through_all_changes(replica, monkeypatch):
+    fake, local, hub, feed = replica
+    feed.pull(hub)
+    monkeypatch.setattr(data, "REPLICA_PAGE_ROWS", 2)
+    for i in range(6, 13):
+        fake.insert_row("bookings", seed(i)[-1])
+    fake.delete_rows("bookings", [row for row in fake.rows if row["id"] in (1, 4, 7)])
+    feed.pull(hub)
+    assert sorted(local_rows(local)) == [2, 3, 5, 6, 8, 9, 10, 11, 12]
+
+def test_replica_older_than_tombstone_retention_resyncs_fully(replica, monkeypatch):
+    fake, local, hub, feed = replica
+    feed.pull(hub)
+    # Tombstone sudah dibersihkan upstream: hapus ini hanya terlihat lewat sinkron penuh
+    fake.delete_rows("bookings", [row for row in fake.rows if row["id"] == 1], tombstone=False)
+    feed.pull(hub)
+    assert 1 in local_rows(local)
+
+    monkeypatch.setattr(local, "stale", lambda max_age: max_age == timedelta(days=data.REPLICA_TOMBSTONE_DAYS))
+    version = hub.version
+    feed.pull(hub)
+    assert sorted(local_rows(local)) == [2, 3, 4, 5]
+    assert hub.version == version + 1
@@ -0,0 +1,47 @@
+from datetime import date, time
+
+import booking_data as data
+
+DAY = date(2026, 3, 2)
+
+def record(booking_id: int, start: str, end: str) -> data.BookingRecord:
+    return data.BookingRecord.from_row(
+        {
+            "id": booking_id,
+            "nama": f"Pemesan {booking_id}",
+            "subdir": "Teknologi",
+            "floor": "1",
+            "ruang_meeting": "Ruang A",
+            "tanggal_booking": str(DAY),
+            "waktu_mulai": start,
+            "waktu_selesai": end,
+            "keterangan": "",
+        }
+    )
+
+def test_room_day_index_overlap_is_half_open():
+    index = data.RoomDayIndex([record(1, "09:00:00", "10:00:00"), record(2, "13:00:00", "15:00:00")])
+    assert index.find_overlap(time(8, 0), time(9, 0)) is None
+    assert index.find_overlap(time(10, 0), time(13, 0)) is None
+    assert index.find_overlap(time(15, 0), time(16, 0)) is None
+    assert index.find_overlap(time(9, 59), time(10, 30))[2].id == 1
+    assert index.find_overlap(time(14, 0), time(14, 30))[2].id == 2
+    start, end, found = index.find_overlap(time(8, 0), time(18, 0))
+    assert found.id in (1, 2) and (start, end) in ((time(9, 0), time(10, 0)), (time(13, 0), time(15, 0)))
+
+def test_room_day_index_exclude_id_skips_only_the_edited_booking():
+    index = data.RoomDayIndex([record(1, "08:00:00", "12:00:00"), record(2, "09:00:00", "09:30:00")])
+    # Booking 1 adalah interval terpanjang; saat diedit, bentrok dengan 2 tetap terdeteksi
+    assert index.find_overlap(time(9, 0), time(10, 0), exclude_id=1)[2].id == 2
+    assert index.find_overlap(time(10, 0), time(11, 0), exclude_id=1) is None
+    assert index.find_overlap(time(10, 0), time(11, 0), exclude_id=2)[2].id == 1
+    assert index.with_booking(record(3, "10:00:00", "11:00:00")).find_overlap(
+        time(10, 0), time(11, 0), exclude_id=1
+    )[2].id == 3
+
+def test_room_day_index_free_intervals_and_occupancy():
+    index = data.RoomDayIndex([record(1, "09:00:00", "10:00:00"), record(2, "09:30:00", "11:15:00")])
+    assert index.free_intervals(time(8, 0), time(12, 0)) == [(time(8, 0), time(9, 0)), (time(11, 15), time(12, 0))]
+    # Slot 60 menit: 09, 10 dan 11 (terpotong) terisi
+    assert index.occupancy(60) == (1 << 9) | (1 << 10) | (1 << 11)
+    assert index.without_booking(2).free_intervals(time(8, 0), time(12, 0))[-1] == (time(10, 0), time(12, 0))
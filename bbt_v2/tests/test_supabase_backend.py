@@ -0,0 +1,42 @@
+from datetime import date, timedelta
+from unittest.mock import patch
+
+import benchmark as bench
+import booking_data as data
+
+START = date(2026, 3, 2)
+
+def busy_week(n: int) -> list[dict]:
+    """n booking dalam satu minggu: lebih dari satu halaman max-rows."""
+    return [
+        {**row, "tanggal_booking": str(START + timedelta(days=row["id"] % 7))}
+        for row in bench.synthetic_bookings(n, start=START)
+    ]
+
+def test_fake_enforces_postgrest_max_rows():
+    fake = bench.FakeSupabase(busy_week(2500))
+    assert len(fake.table("bookings").select("*").execute().data) == bench.FAKE_MAX_ROWS
+
+def test_select_range_pages_past_max_rows():
+    fake = bench.FakeSupabase(busy_week(2500))
+    rows = data.SupabaseBackend(fake).select_range(START, START + timedelta(days=7))
+    assert sorted(row["id"] for row in rows) == list(range(1, 2501))
+    assert fake.queries == 3
+
+def test_async_select_range_pages_past_max_rows():
+    fake = bench.FakeSupabase(busy_week(2500))
+    backend = data.SupabaseBackend(fake, "https://lokal.supabase.co", "k")
+    with patch.object(data, "acreate_client", bench.fake_acreate_client(fake)):
+        rows = data.get_async_runner().run(
+            backend.aread("select_range", START, START + timedelta(days=7)), 10
+        )
+    assert len({row["id"] for row in rows}) == 2500
+
+def test_bookings_window_caches_every_row_of_a_busy_range():
+    fake = bench.FakeSupabase(busy_week(2500))
+    repo = data.BookingRepository(data.SupabaseBackend(fake))
+    assert len(repo.bookings_window(START, START + timedelta(days=7))) == 2500
+    # Tanggal yang ditandai dimuat penuh benar-benar berisi semua booking-nya
+    day = START + timedelta(days=3)
+    cached = repo.bookings_window(day, day + timedelta(days=1))
+    assert len(cached) == sum(row["tanggal_booking"] == str(day) for row in fake.rows)
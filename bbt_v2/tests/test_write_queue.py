@@ -0,0 +1,126 @@
+import threading
+from datetime import datetime
+from time import perf_counter, sleep
+
+import httpx
+from postgrest.exceptions import APIError
+
+import booking_data as data
+
+class ScriptedRepo:
+    """book_if_free yang melempar error sesuai nama pemesan."""
+
+    def __init__(self, errors: dict[str, Exception], latency: float = 0.0) -> None:
+        self.errors = errors
+        self.latency = latency
+        self.calls = 0
+
+    def book_if_free(self, booking: dict) -> dict:
+        self.calls += 1
+        sleep(self.latency)
+        if booking["nama"] in self.errors:
+            raise self.errors[booking["nama"]]
+        return {"status": "booked", "booking": booking}
+
+def test_transient_errors_are_retried_and_permanent_ones_are_not():
+    request = httpx.Request("POST", "https://example.supabase.co/rest/v1/rpc/book_if_free")
+    transient = [
+        TimeoutError(),
+        ConnectionError(),
+        httpx.ConnectError("down", request=request),
+        APIError({"code": 503, "message": "JSON could not be generated"}),
+        APIError({"code": "PGRST001", "message": "Database client error"}),
+        APIError({"code": "57014", "message": "canceling statement due to statement timeout"}),
+    ]
+    permanent = [
+        APIError({"code": "23514", "message": "check constraint"}),
+        APIError({"code": "42501", "message": "permission denied"}),
+        APIError({"code": 400, "message": "JSON could not be generated"}),
+        KeyError("waktu_mulai"),
+    ]
+    assert all(data.is_transient_write_error(err) for err in transient)
+    assert not any(data.is_transient_write_error(err) for err in permanent)
+
+def test_permanent_error_fails_entry_without_pausing_the_queue(tmp_path):
+    repo = ScriptedRepo({"ditolak": APIError({"code": "23514", "message": "check constraint"})})
+    queue = data.WriteQueue(repo, str(tmp_path / "queue.db")).start()
+    try:
+        queue.enqueue("k1", {"nama": "ditolak"})
+        queue.enqueue("k2", {"nama": "diterima"})
+        assert queue.wait("k1", 5)["status"] == "failed"
+        assert queue.wait("k2", 5)["status"] == "booked"
+        assert queue._resume_at == 0.0
+    finally:
+        queue.stop()
+
+def test_transient_error_keeps_entry_pending_and_backs_off(tmp_path):
+    repo = ScriptedRepo({"putus": ConnectionError("upstream tidak terjangkau")})
+    queue = data.WriteQueue(repo, str(tmp_path / "queue.db")).start()
+    try:
+        queue.enqueue("k1", {"nama": "putus"})
+        entry = queue.wait("k1", 0.5)
+        assert entry["status"] == "pending" and entry["attempts"] == 1
+        assert queue._resume_at > 0
+    finally:
+        queue.stop()
+
+def test_submit_sends_inline_from_each_caller_in_parallel(tmp_path):
+    repo = ScriptedRepo({}, latency=0.3)
+    queue = data.WriteQueue(repo, str(tmp_path / "queue.db"))  # tanpa worker
+    results = {}
+
+    def submit(i: int) -> None:
+        results[i] = queue.submit(f"k{i}", {"nama": f"sesi{i}"}, 5)["status"]
+
+    threads = [threading.Thread(target=submit, args=(i,)) for i in range(8)]
+    t0 = perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert list(results.values()) == ["booked"] * 8
+    assert perf_counter() - t0 < 8 * repo.latency / 2
+
+def test_submit_during_backoff_leaves_entry_to_the_worker(tmp_path):
+    repo = ScriptedRepo({})
+    queue = data.WriteQueue(repo, str(tmp_path / "queue.db"))
+    queue._resume_at = datetime.now().timestamp() + 60
+    entry = queue.submit("k1", {"nama": "antre"}, 0.1)
+    assert entry["status"] == "pending" and repo.calls == 0
+
+def test_worker_survives_unexpected_errors(tmp_path, monkeypatch):
+    monkeypatch.setattr(data, "WRITE_QUEUE_RETRY_BASE_SECONDS", 0.05)
+    queue = data.WriteQueue(ScriptedRepo({}), str(tmp_path / "queue.db"))
+    run_once, claim = queue._run_once, queue._claim
+    failures = {"run": 1, "claim": 1}
+
+    def flaky(name, fn):
+        def call(*args):
+            if failures[name]:
+                failures[name] -= 1
+                raise OSError("database is locked")
+            return fn(*args)
+        return call
+
+    monkeypatch.setattr(queue, "_run_once", flaky("run", run_once))
+    monkeypatch.setattr(queue, "_claim", flaky("claim", claim))
+    queue.start()
+    try:
+        queue.enqueue("k1", {"nama": "tetap"})
+        entry = queue.wait("k1", 5)
+        assert entry["status"] == "booked" and entry["attempts"] == 2
+        assert queue._thread.is_alive() and failures == {"run": 0, "claim": 0}
+    finally:
+        queue.stop()
+
+def test_start_restarts_a_dead_worker(tmp_path):
+    queue = data.WriteQueue(ScriptedRepo({}), str(tmp_path / "queue.db")).start()
+    queue.stop()
+    assert not queue._thread.is_alive()
+    queue.start()
+    try:
+        assert queue._thread.is_alive()
+        queue.enqueue("k1", {"nama": "hidup lagi"})
+        assert queue.wait("k1", 5)["status"] == "booked"
+    finally:
+        queue.stop()